@@ -1,4 +1,13 @@
 import os
+import mmap
+import pickle
+import hashlib
+import datetime
+import itertools
+import collections
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 
 from openbatlib import model
@@ -14,6 +23,360 @@ class InputError(Error):
         self.expression = expression
 
 
+def _simulate(parameter, ppv, pl, dt, esums=False, skip=False, soc0=0, outputs='all'):
+    """Runs the simulation, the energy sums and the SPI calculation of an AC or DC coupled system
+
+    :param parameter: PV battery system parameters
+    :type parameter: dict
+    :param ppv: normalized DC power output of the PV generator
+    :type ppv: numpy array
+    :param pl: AC load power
+    :type pl: numpy array
+    :param dt: time step width in seconds
+    :type dt: integer
+    :param esums: Accumulate the energy sums in the kernel without keeping the power series
+    :type esums: bool
+    :param skip: Fill the runs of time steps in standby mode in discharged state in bulk
+    :type skip: bool
+    :param soc0: State of charge of the battery in the first time step
+    :type soc0: float
+    :param outputs: Series that are kept, see model.OUTPUTS
+    :type outputs: string
+    :return: simulated model
+    :rtype: BatModAC or BatModDC
+    """
+    d = model.transform_dict_to_array(parameter)
+
+    if parameter['Top'] == 'AC':
+        m = model.BatModAC(parameter, d, ppv, pl, dt, soc0, outputs)
+    elif parameter['Top'] == 'DC':
+        m = model.BatModDC(parameter, d, ppv, pl, dt, soc0, outputs)
+
+    m.simulation(esums=esums, skip=skip)
+    m.bat_mod_res()
+    m.calculate_spi()
+
+    return m
+
+
+# Time step widths in seconds tried by the automatic time step selection, coarsest first
+AUTO_RESOLUTIONS = (3600, 900, 300, 60, 15, 5, 1)
+
+# Number and length in seconds of the periods of the input series that are simulated at every
+# resolution to estimate the error of the automatic time step selection
+AUTO_PILOT_PERIODS = 4
+AUTO_PILOT = 86400
+
+
+def _pilot(x, n):
+    """Joins AUTO_PILOT_PERIODS evenly spaced periods of n time steps of a time series"""
+    starts = np.linspace(0, x.size - n, AUTO_PILOT_PERIODS).astype(np.int64)
+    return np.concatenate([x[i:i + n] for i in starts])
+
+
+def _error(m, ref):
+    """Largest difference of the SPI and of the energy sums (relative to the load energy) of two models"""
+    E, E_ref = dict(m.get_E()[0]), dict(ref.get_E()[0])
+    El = max(abs(E_ref['El']), np.finfo(float).tiny)
+
+    return max(abs(m.spi - ref.spi), max(abs(E[key] - E_ref[key]) for key in E_ref) / El)
+
+
+def _simulate_auto(parameter, ppv, pl, dt, tol, skip=False, soc0=0, outputs='all'):
+    """Runs the simulation of an AC or DC coupled system at the coarsest sufficient resolution
+
+    The error of a resolution of AUTO_RESOLUTIONS is estimated against the resolution of the
+    input series by the largest difference of the SPI and of the energy sums (relative to the
+    load energy). Both are simulated on a pilot sample of AUTO_PILOT_PERIODS evenly spaced
+    periods of AUTO_PILOT seconds, or on the whole input series if it is not much longer. The
+    coarsest resolution whose estimated error is at most tol is kept, even if its time step
+    is too coarse for the dead time and the settling time of the system.
+
+    :param parameter: PV battery system parameters
+    :type parameter: dict
+    :param ppv: normalized DC power output of the PV generator
+    :type ppv: numpy array
+    :param pl: AC load power
+    :type pl: numpy array
+    :param dt: time step width of the input series in seconds
+    :type dt: integer
+    :param tol: tolerance of the SPI and of the energy sums relative to the load energy
+    :type tol: float
+    :param skip: Fill the runs of time steps in standby mode in discharged state in bulk
+    :type skip: bool
+    :param soc0: State of charge of the battery in the first time step
+    :type soc0: float
+    :param outputs: Series that are kept, see model.OUTPUTS
+    :type outputs: string
+    :return: model simulated at the selected resolution and its estimated error
+    :rtype: tuple
+    """
+    ks = [r // dt for r in AUTO_RESOLUTIONS if r > dt and r % dt == 0]
+
+    # The pilot periods are whole multiples of the coarsest time step
+    n = AUTO_PILOT // dt // max(ks, default=1) * max(ks, default=1)
+    sample = n > 0 and ppv.size > 2 * AUTO_PILOT_PERIODS * n
+    ppv_s, pl_s = (_pilot(ppv, n), _pilot(pl, n)) if sample else (ppv, pl)
+
+    ref = _simulate(parameter, ppv_s, pl_s, dt, skip=skip, soc0=soc0, outputs='none' if sample else outputs)
+
+    for k in ks:
+        m = _simulate(parameter, model.resample_series(ppv_s, k), model.resample_series(pl_s, k), dt * k, skip=skip,
+                      soc0=soc0, outputs='none' if sample else outputs)
+        err = _error(m, ref)
+        if err <= tol:
+            if sample:
+                m = _simulate(parameter, model.resample_series(ppv, k), model.resample_series(pl, k), dt * k, skip=skip,
+                              soc0=soc0, outputs=outputs)
+            return m, err
+
+    if sample:
+        ref = _simulate(parameter, ppv, pl, dt, skip=skip, soc0=soc0, outputs=outputs)
+
+    return ref, 0.0
+
+
+# Length in seconds of the simulated period before a time window that estimates the state of
+# charge at its start
+SOC0_PREROLL = 86400
+
+# Upper limit of the size of the simulated models kept in memory in bytes, see Controller.sim
+RESULT_CACHE_BYTES = 1 << 30
+
+# Directory of the on-disk tier of the simulation result cache, None keeps the results in memory only
+RESULT_CACHE_DIR = os.environ.get('OPENBATLIB_RESULT_CACHE')
+
+# Upper limit of the size of RESULT_CACHE_DIR in bytes, the least recently used files are deleted first
+RESULT_CACHE_DIR_BYTES = 4 << 30
+
+# Simulated models and estimated errors of this process by content key, least recently used first
+_result_cache = collections.OrderedDict()
+
+# Content keys by call of Controller.sim, valid as long as the input files are unchanged
+_result_keys = dict()
+
+# Version of the simulation results, bump it when a change of the models changes the results
+_RESULT_CACHE_VERSION = 1
+
+# Version and source hash of the simulation code, see _result_version
+_result_version_key = None
+
+
+def _window_steps(window, dt):
+    """Converts a time window of dates or time step indices to time step indices
+
+    Dates are counted from the 1st of January of the year of the first date, the reference
+    cases cover one year.
+
+    :param window: First and last (excluded) date or time step, None for an open end
+    :type window: tuple
+    :param dt: time step width in seconds
+    :type dt: integer
+    :return: First and last (excluded) time step
+    :rtype: tuple
+    """
+    t0 = None
+    steps = list()
+    for t in window:
+        if t is None or isinstance(t, (int, np.integer)):
+            steps.append(t)
+            continue
+        t = pd.Timestamp(t)
+        if t0 is None:
+            t0 = pd.Timestamp(t.year, 1, 1)
+        steps.append(int((t - t0).total_seconds()) // dt)
+
+    if steps[0] is not None and steps[0] < 0 or None not in steps and steps[1] <= steps[0]:
+        raise InputError('Empty or negative time window!')
+
+    return tuple(steps)
+
+
+def _final_soc(parameter, ppv, pl, dt):
+    """Simulates a system starting with an empty battery and returns the final state of charge
+
+    :param parameter: PV battery system parameters
+    :type parameter: dict
+    :param ppv: normalized DC power output of the PV generator
+    :type ppv: numpy array
+    :param pl: AC load power
+    :type pl: numpy array
+    :param dt: time step width in seconds
+    :type dt: integer
+    :return: State of charge of the battery in the last time step
+    :rtype: float
+    """
+    if parameter['Top'] == 'AC' or parameter['Top'] == 'DC':
+        return _simulate(parameter, ppv, pl, dt, skip=True, outputs='none').Real.soc0
+
+    Pac, Ppv, Pperi = model.max_self_consumption(parameter, ppv, pl, pvmod=True)
+    d = model.transform_dict_to_array(parameter)
+
+    return model.BatModPV(parameter, d, ppv, pl, Pac, Ppv, Pperi, dt, outputs='none').soc0
+
+
+# Input series shared by all grid points simulated in a worker process
+_sweep_inputs = None
+
+
+def _file_state(fname):
+    # Path, size and modification time of a file or of the files of a store directory
+    path = os.path.abspath(fname)
+    if os.path.isdir(path):
+        return [_file_state(os.path.join(path, x)) for x in sorted(os.listdir(path))]
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime_ns
+
+
+def _result_version():
+    """Version of the simulation results that is part of every content key
+
+    Combines _RESULT_CACHE_VERSION with a hash of the source files of the model and the
+    controller, so that cached results of an edited library are not reused.
+
+    :return: version and source hash
+    :rtype: tuple
+    """
+    global _result_version_key
+    if _result_version_key is None:
+        h = hashlib.sha256()
+        for fname in (model.__file__, __file__):
+            with open(fname, 'rb') as f:
+                h.update(f.read())
+        _result_version_key = (_RESULT_CACHE_VERSION, h.hexdigest())
+    return _result_version_key
+
+
+def _result_key(*args):
+    """Content key of a simulation
+
+    :param args: processed system parameters (dict), input series (numpy arrays) and further
+        values that determine the results, e.g. the time step width and _result_version()
+    :return: SHA-256 hash of the arguments
+    :rtype: string
+    """
+    h = hashlib.sha256()
+    for x in args:
+        if isinstance(x, np.ndarray):
+            x = np.ascontiguousarray(x)
+            h.update(repr((x.dtype.str, x.shape)).encode())
+            h.update(x.data)
+        elif isinstance(x, dict):
+            h.update(repr(sorted(x.items())).encode())
+        else:
+            h.update(repr(x).encode())
+    return h.hexdigest()
+
+
+def _cache_get(key):
+    """Looks up a simulated model in memory and then in RESULT_CACHE_DIR
+
+    :param key: content key, see _result_key
+    :type key: string
+    :return: simulated model and estimated error, None if there is no entry
+    :rtype: tuple
+    """
+    if key in _result_cache:
+        _result_cache.move_to_end(key)
+        return _result_cache[key][0]
+
+    if RESULT_CACHE_DIR is None:
+        return None
+
+    cache_file = os.path.join(RESULT_CACHE_DIR, key + '.pkl')
+    try:
+        with open(cache_file, 'rb') as f:
+            entry = pickle.load(f)
+        os.utime(cache_file)
+    except Exception:  # Missing, evicted or unreadable cache file
+        return None
+
+    _cache_put(key, entry, disk=False)
+    return entry
+
+
+def _cache_put(key, entry, disk=True):
+    """Keeps a simulated model in memory and in RESULT_CACHE_DIR and evicts the least recently
+    used entries beyond RESULT_CACHE_BYTES and RESULT_CACHE_DIR_BYTES. A model that alone
+    exceeds one of the limits is not kept in that tier.
+
+    :param key: content key, see _result_key
+    :type key: string
+    :param entry: simulated model and estimated error
+    :type entry: tuple
+    :param disk: Write the entry to RESULT_CACHE_DIR
+    :type disk: bool
+    """
+    nbytes = sum(x.nbytes for x in model.results_series(entry[0]).values())
+    if nbytes <= RESULT_CACHE_BYTES:
+        _result_cache[key] = entry, nbytes
+        while sum(size for _, size in _result_cache.values()) > RESULT_CACHE_BYTES:
+            _result_cache.popitem(last=False)
+
+    if RESULT_CACHE_DIR is None or not disk or nbytes > RESULT_CACHE_DIR_BYTES:
+        return
+
+    try:
+        os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+        cache_file = os.path.join(RESULT_CACHE_DIR, key + '.pkl')
+        tmp = '%s.%d.tmp' % (cache_file, os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+        _cache_evict()
+    except OSError:
+        pass
+
+
+def _cache_evict():
+    # Deletes the least recently used files of RESULT_CACHE_DIR beyond RESULT_CACHE_DIR_BYTES
+    files = list()
+    for entry in os.scandir(RESULT_CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(('.pkl', '.key')):
+            st = entry.stat()
+            files.append((st.st_mtime_ns, st.st_size, entry.path))
+
+    size = sum(x[1] for x in files)
+    for _, nbytes, path in sorted(files):
+        if size <= RESULT_CACHE_DIR_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        size -= nbytes
+
+
+def _share(x):
+    """Replaces a memory-mapped series by its file position, the worker processes map it again
+    instead of receiving a copy
+    """
+    if isinstance(x, np.memmap) and isinstance(x.base, mmap.mmap):
+        return (x.filename, x.dtype.str, x.shape, x.offset)
+    return x
+
+
+def _unshare(x):
+    if isinstance(x, tuple):
+        filename, dtype, shape, offset = x
+        return np.memmap(filename, dtype=dtype, mode='c', offset=offset, shape=shape)
+    return x
+
+
+def _init_sweep_worker(ppv, pl, dt):
+    global _sweep_inputs
+    _sweep_inputs = (_unshare(ppv), _unshare(pl), dt)
+    model.warmup(('simulation',))
+
+
+def _sweep_point(parameter):
+    ppv, pl, dt = _sweep_inputs
+    m = _simulate(parameter, ppv, pl, dt, skip=True, outputs='none')
+    E_real, E_ideal = m.get_E()
+
+    return dict(E_real), dict(E_ideal), m.spi
+
+
 class Controller:
     """Class to manage the models and view components
     """
@@ -23,7 +386,8 @@ class Controller:
         self.view = view.View()
         self.cwd = os.getcwd()
 
-    def sim(self, fparameter=None, freference=None, system=None, ref_case=None, dt=1, spi=False):
+    def sim(self, fparameter=None, freference=None, system=None, ref_case=None, dt=1, spi=False, dtype=np.float64, skip=False, tol=None,
+            window=None, soc0=None, cache=False, outputs='all'):
         """Method for managing the simulation
 
         :param fparameter: File path to the system parameters
@@ -37,8 +401,144 @@ class Controller:
 
         :param dt: time step width in seconds
         :type dt: integer
+
+        :param dtype: Data type of the time series, np.float32 halves memory and bandwidth. The
+            energy sums are accumulated in double precision and stay within 1e-4 MWh, the SPI
+            within 1e-4 of the double precision simulation.
+        :type dtype: numpy dtype
+
+        :param skip: Fill the runs of time steps in which the battery system stays in standby
+            mode in discharged state (e.g. at night) in bulk instead of simulating them step
+            by step. The results are identical. Only the loop of the battery model is
+            shortened, the PV inverter, the lossless reference and the energy sums still pass
+            over every time step. With half of the time steps in discharged standby the loop
+            takes about a quarter less time, a whole simulation a few percent.
+        :type skip: bool
+
+        :param tol: Select the time step width of AC and DC coupled systems automatically, see
+            AUTO_RESOLUTIONS. The coarsest resolution whose error of the SPI and of the energy sums
+            (relative to the load energy), estimated against dt on a pilot sample of the input
+            series, is below tol is kept, the estimated error is stored in self.error. None simulates the input series at dt.
+        :type tol: float
+
+        :param window: First and last (excluded) time step or date of the simulated period,
+            e.g. ('2021-01-08', '2021-01-15'). Dates are counted from the 1st of January of the
+            year of the first date. Only this period of the input series is read from the file.
+            None simulates the whole input series.
+        :type window: tuple
+
+        :param soc0: State of charge of the battery at the start of the simulated period. None
+            starts the whole input series with an empty battery and estimates the state of
+            charge at the start of a window by simulating the SOC0_PREROLL seconds before it.
+        :type soc0: float
+
+        :param cache: Reuse the results of an earlier simulation of the same processed parameters,
+            input series, time step width, options and version of the simulation code, see
+            _result_version. The simulated models are kept in memory (RESULT_CACHE_BYTES) and in
+            RESULT_CACHE_DIR (if set, RESULT_CACHE_DIR_BYTES) unless a single model exceeds the
+            limit of the tier, and the inputs are not even loaded again as long as the
+            files are unchanged. A cached model is shared by all calls that hit it and must not
+            be modified.
+        :type cache: bool
+
+        :param outputs: Series of the simulated model that are kept: 'all', 'soc' (state of
+            charge of the battery) or 'none' (only the energy sums and the SPI). The series that
+            are not kept are not allocated for AC and DC coupled systems, which saves most of
+            the memory of a run.
+        :type outputs: string
         """
+        if outputs not in model.OUTPUTS:
+            raise InputError('Unknown outputs %s, expected one of %s!' % (outputs, ', '.join(model.OUTPUTS)))
+
+        fparameter, freference = self._input_files(fparameter, freference)
+        options = (np.dtype(dtype).str, skip, tol, outputs)
+
+        entry = None
+        if cache:
+            call = _result_key(_result_version(), _file_state(fparameter), _file_state(freference), system, ref_case,
+                               dt, options, window, soc0)
+            key = _result_keys.get(call) or self._read_result_key(call)
+            entry = _cache_get(key) if key is not None else None
+
+        if entry is None:
+            steps = _window_steps(window, dt) if window is not None else None
+
+            parameter, ppv, pl = self._load_inputs(fparameter, freference, system, ref_case, steps)
+            ppv = ppv.astype(dtype, copy=False)
+            pl = pl.astype(dtype, copy=False)
+
+            if soc0 is None and steps is not None and steps[0]:
+                _, ppv0, pl0 = self._load_inputs(fparameter, freference, system, ref_case,
+                                                 (max(steps[0] - SOC0_PREROLL // dt, 0), steps[0]))
+                soc0 = _final_soc(parameter, ppv0, pl0, dt)
+            elif soc0 is None:
+                soc0 = 0
+
+            if cache:
+                key = _result_key(_result_version(), parameter, ppv, pl, dt, options, float(soc0))
+                self._write_result_key(call, key)
+                entry = _cache_get(key)
+
+            if entry is None:
+                entry = self._run(parameter, ppv, pl, dt, skip, tol, soc0, outputs)
+                if cache:
+                    _cache_put(key, entry)
+
+        self.model, self.error = entry
+
+        # Load the view class
+        self.view = view.View()
+
+    def _run(self, parameter, ppv, pl, dt, skip, tol, soc0, outputs):
+        """Simulates an AC, DC or PV coupled system
+
+        :return: simulated model and estimated error of the automatic time step selection
+        :rtype: tuple
+        """
+        # Call model for AC or DC coupled systems
+        if (parameter['Top'] == 'AC' or parameter['Top'] == 'DC') and tol is not None:
+            return _simulate_auto(parameter, ppv, pl, dt, tol, skip=skip, soc0=soc0, outputs=outputs)
+
+        elif parameter['Top'] == 'AC' or parameter['Top'] == 'DC':
+            return _simulate(parameter, ppv, pl, dt, skip=skip, soc0=soc0, outputs=outputs), None
+        
+        # Call model for PV-coupled systems
+        elif parameter['Top'] == 'PV':
+            Pac, Ppv, Pperi = model.max_self_consumption(parameter, ppv, pl, pvmod=True)
+            d = model.transform_dict_to_array(parameter)
+            return model.BatModPV(parameter, d, ppv, pl, Pac, Ppv, Pperi, dt, soc0, outputs), None
 
+    def _read_result_key(self, call):
+        # Content key of a call of sim from RESULT_CACHE_DIR, None if unknown
+        if RESULT_CACHE_DIR is None:
+            return None
+        try:
+            with open(os.path.join(RESULT_CACHE_DIR, call + '.key')) as f:
+                key = f.read().strip()
+        except OSError:
+            return None
+        _result_keys[call] = key
+        return key
+
+    def _write_result_key(self, call, key):
+        # Remembers the content key of a call of sim in memory and in RESULT_CACHE_DIR
+        _result_keys[call] = key
+        if RESULT_CACHE_DIR is None:
+            return
+        try:
+            os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+            with open(os.path.join(RESULT_CACHE_DIR, call + '.key'), 'w') as f:
+                f.write(key)
+        except OSError:
+            pass
+
+    def _input_files(self, fparameter, freference):
+        """Paths to the system parameters and to the reference cases, by default the files in
+        the working directory
+
+        :return: paths to the system parameters and to the reference cases
+        :rtype: tuple
+        """
         if fparameter is None:
             # set path to the reference case file
             fparameter = os.path.join(self.cwd, 'parameter/PerModPAR.xlsx')
@@ -47,6 +547,97 @@ class Controller:
             # set path to the reference case file
             freference = os.path.join(self.cwd, 'reference_case/ref_case_data.npz')
 
+        return fparameter, freference
+
+    def sweep(self, grid, fparameter=None, freference=None, system=None, ref_case=None, dt=1, processes=None):
+        """Method for simulating a system on the cartesian grid of several parameter ranges
+
+        The parameters and the input series are loaded only once and shared by all
+        grid points, the grid points are simulated in a pool of worker processes.
+        The workers are spawned, since forking a process that has loaded the threading
+        layer of the parallel kernels hangs at exit, so scripts calling this method with
+        more than one process need an ``if __name__ == '__main__':`` guard.
+
+        :param grid: Values of each varied parameter, e.g. {'E_BAT': [5, 10], 'P_PV': [5, 10]}
+        :type grid: dict
+
+        :param fparameter: File path to the system parameters
+        :type fparameter: string
+
+        :param freference: File path to the reference cases
+        :type freference: string
+
+        :param system: Identifier for the system under simulation in the file
+        :type system: string
+
+        :param ref_case: Identifier for to chose one of the two reference cases
+        :type ref_case: string
+
+        :param dt: time step width in seconds
+        :type dt: integer
+
+        :param processes: Number of worker processes, None uses all cores and 1 runs in this process
+        :type processes: integer
+
+        :return: One row per grid point with the varied parameters, the SPI and the
+            real and ideal energy sums in MWh
+        :rtype: pandas data frame
+        """
+        parameter, ppv, pl = self._load_inputs(fparameter, freference, system, ref_case)
+
+        if parameter['Top'] != 'AC' and parameter['Top'] != 'DC':
+            raise InputError('Parameter sweeps are only available for AC and DC coupled systems!')
+
+        for name in grid:
+            if name not in parameter:
+                raise InputError('Unknown parameter ' + str(name) + '!')
+
+        names = list(grid)
+        points = list(itertools.product(*(grid[name] for name in names)))
+
+        parameters = list()
+        for point in points:
+            p = dict(parameter)
+            p.update(zip(names, point))
+            parameters.append(p)
+
+        if processes == 1:
+            _init_sweep_worker(ppv, pl, dt)
+            results = [_sweep_point(p) for p in parameters]
+        else:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_sweep_worker,
+                                     initargs=(_share(ppv), _share(pl), dt)) as executor:
+                results = list(executor.map(_sweep_point, parameters))
+
+        rows = list()
+        for point, (E_real, E_ideal, spi) in zip(points, results):
+            row = dict(zip(names, point))
+            row['SPI'] = spi
+            row.update(E_real)
+            row.update({key + '_ideal': value for key, value in E_ideal.items()})
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    def _load_inputs(self, fparameter, freference, system, ref_case, window=None):
+        """Loads the system parameters, the PV generator input and the load of the reference case
+
+        :param fparameter: File path to the system parameters
+        :type fparameter: string
+        :param freference: File path to the reference cases
+        :type freference: string
+        :param system: Identifier for the system under simulation in the file
+        :type system: string
+        :param ref_case: Identifier for to chose one of the two reference cases
+        :type ref_case: string
+        :param window: First and last (excluded) time step of the loaded part of the input series
+        :type window: tuple
+        :return: system parameters, normalized PV power and load power
+        :rtype: tuple
+        """
+        fparameter, freference = self._input_files(fparameter, freference)
+
         try:
             # Load system parameters
             parameter = self._load_parameter(fparameter, system)
@@ -58,35 +649,12 @@ class Controller:
         except InputError as err:
             raise err
         # Load PV generator input
-        ppv = self._load_pv_input(freference, 'ppv')
+        ppv = self._load_pv_input(freference, 'ppv', window)
 
         # Load data from reference cases (load and inverter parameters)
-        parameter, pl = self._load_ref_case(parameter, freference, fparameter, ref_case)
-
-        # Call model for AC coupled systems
-        if parameter['Top'] == 'AC':
-            d = model.transform_dict_to_array(parameter)
-            self.model = model.BatModAC(parameter, d, ppv, pl, dt)
-            self.model.simulation()
-            self.model.bat_mod_res()
-            self.model.calculate_spi()
-        
-        # Call model for DC coupled systems
-        elif parameter['Top'] == 'DC':
-            d = model.transform_dict_to_array(parameter)
-            self.model = model.BatModDC(parameter, d, ppv, pl, dt)
-            self.model.simulation()
-            self.model.bat_mod_res()
-            self.model.calculate_spi()
-        
-        # Call model for PV-coupled systems
-        elif parameter['Top'] == 'PV':
-            Pac, Ppv, Pperi = model.max_self_consumption(parameter, ppv, pl, pvmod=True)
-            d = model.transform_dict_to_array(parameter)
-            self.model = model.BatModPV(parameter, d, ppv, pl, Pac, Ppv, Pperi, dt)
+        parameter, pl = self._load_ref_case(parameter, freference, fparameter, ref_case, window)
 
-        # Load the view class
-        self.view = view.View()
+        return parameter, ppv, pl
     
     def modbus(self, host, port, unit_id, data_frame, ref_case, dt, fname, fparameter, fref, system):
         """Function to establish a connection to a battery system via ModBus protocol
@@ -162,10 +730,7 @@ class Controller:
         :param system: Indicator for the system
         :type system: string
         """
-        parameter = model.load_parameter(fparameter, system)
-        parameter = model.eta2abc(parameter)
-
-        return parameter
+        return model.load_parameter_cached(fparameter, system)
 
     def get_residual_power_AC(self, parameter, ppv, pl):
         Pr, _, _, _ = model.max_self_consumption(parameter, ppv, pl, pvmod=True)
@@ -177,40 +742,53 @@ class Controller:
     def get_parameter(self, fparameter, system):
         return self._load_parameter(fparameter, system)
 
-    def _load_pv_input(self, fname, name):
+    def get_parameter_table(self, fparameter=None):
+        """Loads the parameters of all systems in the file at once
+
+        :param fparameter: File path to the system parameters
+        :type fparameter: string
+        :return: One row per system, indexed by the identifier of the system in the file
+        :rtype: pandas data frame
+        """
+        if fparameter is None:
+            fparameter = os.path.join(self.cwd, 'parameter/PerModPAR.xlsx')
+
+        return model.load_parameter_table(fparameter)
+
+    def _load_pv_input(self, fname, name, window=None):
         """Loads PV input data
 
         :param fref: Path to file
         :type fref: string
         :param name: Name of the input series
         :type name: string
+        :param window: First and last (excluded) time step of the loaded part of the series
+        :type window: tuple
         """
-        return model.load_ref_case(fname, name)
+        return model.load_ref_case(fname, name, window)
 
     def _load_set_values(self, fname):
         return fname
 
-    def _load_ref_case(self, parameter, fname, fparameter, ref_case):
+    def _load_ref_case(self, parameter, fname, fparameter, ref_case, window=None):
             
         if ref_case == '1':
             # Load parameters of first inverter
             if parameter['Top'] == 'AC' or parameter['Top'] == 'PV':
-                inverter_parameter = model.load_parameter(fparameter, 'L')            
+                inverter_parameter = model.load_parameter_cached(fparameter, 'L')
             parameter['P_PV'] = 5.0
-            pl = model.load_ref_case(fname, 'pl1')
+            pl = model.load_ref_case(fname, 'pl1', window)
                                         
         elif ref_case == '2':
             # Load paramertes of second inverter
             if parameter['Top'] == 'AC' or parameter['Top'] == 'PV':
-                inverter_parameter = model.load_parameter(fparameter, 'M')            
+                inverter_parameter = model.load_parameter_cached(fparameter, 'M')
             parameter['P_PV'] = 10
-            pl = model.load_ref_case(fname, 'pl2')
+            pl = model.load_ref_case(fname, 'pl2', window)
 
         # Load inverter parameters for AC or PV coupled systems
         if parameter['Top'] == 'AC' or parameter['Top'] == 'PV':
 
-            inverter_parameter = model.eta2abc(inverter_parameter)
-
             parameter['P_PV2AC_in'] = inverter_parameter['P_PV2AC_in']
             parameter['P_PV2AC_out']= inverter_parameter['P_PV2AC_out']
             parameter['P_PVINV_AC'] = inverter_parameter['P_PVINV_AC']
@@ -242,21 +820,75 @@ class Controller:
         E = self.model.get_E()
         self.view.E_to_csv(name, E)
 
-    def plot(self):
-        soc = self.model.get_soc()
-        Pbat = self.model.get_Pbat()
-        self.view.plot(soc)
-        self.view.plot(Pbat)
+    def plot(self, fname=None, columns=None):
+        """Plots time series of the last simulation or of a result file, decimated to the
+        resolution of the figure
 
-    def to_csv(self, name):
-        soc = self.model.get_soc()
-        e = self.model.get_E()
-        self.view.store_to_csv(name=name, data=e)
+        :param fname: Path to a result file (see to_store), its series are memory-mapped
+        :type fname: string
+        :param columns: Names of the time series (see model.results_series), by default the
+            state of charge and the DC power of the battery
+        :type columns: list
+        """
+        if fname is not None:
+            series, attrs = model.read_results(fname)
+            dt = attrs['dt']
+        else:
+            series = model.results_series(self.model)
+            dt = self.model.dt
+
+        if columns is None:
+            columns = [key for key in ('Real.soc', 'Real.Pbat', 'soc', 'Pbat') if key in series]
+
+        for key in columns:
+            self.view.plot(series[key], dt=dt, label=key)
+
+    def to_csv(self, name, columns=None, start=None, decimals=6):
+        """Writes time series of the last simulation to a CSV file in bulk, see model.write_csv
+
+        :param name: Path to the CSV file, compressed if it ends with .gz, .bz2 or .xz
+        :type name: string
+        :param columns: Names of the time series (see model.results_series), None writes all
+        :type columns: list
+        :param start: Time of the first time step, None writes no timestamp column
+        :type start: string
+        :param decimals: Number of decimal places
+        :type decimals: integer
+        """
+        series = model.results_series(self.model)
+        if columns is not None:
+            series = {key: series[key] for key in columns}
+
+        model.write_csv(name, series, dt=self.model.dt, start=start, decimals=decimals)
 
     def dict_to_csv(self, name):
         E = self.model.get_E()
         self.view.store_dict_to_csv(name=name, data=E)
 
+    def to_store(self, fname, **attrs):
+        """Writes all time series of the last simulation to one columnar result file
+
+        The energy sums, the SPI, the system parameters and the time step width are stored
+        as attributes of the run, see model.write_results and model.read_results.
+
+        :param fname: Path to the result file
+        :type fname: string
+        :param attrs: Additional attributes of the run, e.g. an identifier
+        :type attrs: dict
+        """
+        E = self.model.get_E()
+        meta = {'version': self._version, 'created': datetime.datetime.now().isoformat(),
+                'parameter': self.model.parameter, 'dt': self.model.dt, 'error': getattr(self, 'error', None)}
+
+        if isinstance(E, tuple):
+            meta['E_real'], meta['E_ideal'] = E
+            meta['SPI'] = self.model.get_SPI()
+        else:
+            meta['E'] = E
+
+        meta.update(attrs)
+        model.write_results(fname, model.results_series(self.model), meta)
+
     def to_pickle(self, fname , name):
         if name == 'soc':
             soc = self.model.get_soc()
@@ -1,5 +1,17 @@
+import os
 import datetime
 import csv
+import hashlib
+import pickle
+import json
+import functools
+import zipfile
+import gzip
+import bz2
+import lzma
+import collections
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import numpy as np
 import numba as nb
@@ -8,6 +20,12 @@ from openpyxl import load_workbook
 from pyModbusTCP.client import ModbusClient
 from pyModbusTCP import utils
 
+try:
+    # Ahead-of-time compiled kernels, see build_aot
+    from openbatlib import _batmod_aot
+except ImportError:
+    _batmod_aot = None
+
 
 @dataclass
 class Data:
@@ -52,10 +70,16 @@ class BatModDC:
 
     :param dt: time step width in seconds
     :type dt: integer
+
+    :param soc0: State of charge of the battery in the first time step
+    :type soc0: float
+
+    :param outputs: Series that are kept, see OUTPUTS
+    :type outputs: string
     """
     _version = 0.1
 
-    def __init__(self, parameter, d, ppv, pl, dt):
+    def __init__(self, parameter, d, ppv, pl, dt, soc0=0, outputs='all'):
         """Constructor method
         """
         self.parameter = parameter
@@ -63,43 +87,58 @@ class BatModDC:
         self.ppv = ppv
         self.pl = pl
         self.dt = dt
+        self.outputs = _check_outputs(outputs)
         self.th = False  # Start threshold for the recharging of the battery
         self.spi = float()
 
-        # Initialization and preallocation
-        self.Real.Pr, self.Real.Prpv, self.Real.Ppv, self.Real.ppv2ac, self.Real.Ppv2ac_out = max_self_consumption(parameter, ppv, pl, pvmod=True)
+        # Parameters of the PV2AC conversion pathway, the residual powers are computed
+        # together with the battery dispatch in the fused kernel
+        self.p = transform_dict_to_pvinv_array(parameter)
+        self.S = np.zeros((2, 0))  # Accumulators of the energy sums, see simulation
+
+        # Series of the real and the ideal system of this instance, not shared with other instances
+        self.Real = self.Real.__new__(self.Real)
+        self.Ideal = self.Ideal.__new__(self.Ideal)
 
+        # Initialization and preallocation, series that are not kept are empty
+        keep = self.outputs == 'all'
+        self.Real.Ppv = _output(self.ppv, keep)  # DC power output of the PV generator in W
+        # Output power of the PV2AC conversion pathway in W
+        self.Real.Ppv2ac_out = _output(self.ppv, keep)
         self.Real.Ppv2ac_out0 = 0
         self.Real.Ppv2bat_in0 = 0
 
-        self.Real.Pbat = np.zeros_like(self.ppv)  # DC power of the battery in W
-        self.Real.soc = np.zeros_like(self.ppv)  # State of charge of the battery
-        self.Real.soc0 = 0  # State of charge of the battery in the first time step
+        self.Real.Pbat = _output(self.ppv, keep)  # DC power of the battery in W
+        self.Real.soc = _output(self.ppv, self.outputs != 'none', soc0)  # State of charge of the battery
+        self.Real.soc0 = soc0  # State of charge of the battery in the first time step
         # Input power of the PV2BAT conversion pathway in W
-        self.Real.Ppv2bat_in = np.zeros_like(self.ppv)
+        self.Real.Ppv2bat_in = _output(self.ppv, keep)
         # Output power of the BAT2AC conversion pathway in W
-        self.Real.Pbat2ac_out = np.zeros_like(self.ppv)
+        self.Real.Pbat2ac_out = _output(self.ppv, keep)
         self.Real.Pbat2ac_out0 = 0
         # AC power of the PV-battery system in W
-        self.Real.Ppvbs = np.zeros_like(self.ppv)
+        self.Real.Ppvbs = _output(self.ppv, keep)
 
         # Additional power consumption of other system components (e.g. AC power meter) in W
-        self.Real.Pperi = np.ones(self.ppv.size) * self.parameter['P_PERI_AC']
-
-        self.Ideal.Ppv = np.maximum(0, self.ppv) * self.parameter['P_PV'] * 1000
-        self.Ideal.Pr = self.Ideal.Ppv - self.pl
-        self.Ideal.Pbat = np.zeros_like(self.ppv)
-        self.Ideal.soc = np.zeros_like(self.ppv)
-        self.Ideal.Ppv2bat_in = np.zeros_like(self.ppv)
-        self.Ideal.Ppv2bat_in = np.zeros_like(self.ppv)
-        self.Ideal.Pbat2ac_out = np.zeros_like(self.ppv)
-        self.Ideal.Ppvbs = np.zeros_like(self.ppv)
+        self.Real.Pperi = _output(self.ppv, keep, self.parameter['P_PERI_AC'])
+
+        # The lossless reference starts from the same state of charge as the real system, not
+        # from the final state of charge of the real system after its simulation
+        self.Ideal.soc0 = soc0
+        self.Ideal.Pbat = _output(self.ppv, keep)
+        self.Ideal.soc = _output(self.ppv, keep)
+        self.Ideal.S = np.zeros((2, len(E_KEYS_DC)))  # Accumulators of the ideal energy sums
+        if keep:
+            self.Ideal.Ppv = np.maximum(0, self.ppv) * self.parameter['P_PV'] * 1000
+            self.Ideal.Pr = self.Ideal.Ppv - self.pl
+            self.Ideal.Ppv2bat_in = np.zeros_like(self.ppv)
+            self.Ideal.Pbat2ac_out = np.zeros_like(self.ppv)
+            self.Ideal.Ppvbs = np.zeros_like(self.ppv)
+            self.Ideal.Pperi = self.Real.Pperi
 
     @dataclass
     class Real(Data):
         Pr : np.array
-        Prpv : np.array
-        ppv2ac : np.array
         Ppv2ac_out : np.array
         Ppv2ac_out0 : int
         Ppv2bat_in : np.array
@@ -111,20 +150,40 @@ class BatModDC:
         def __init__(self):
             super().__init__()
 
-    def simulation(self, pvmod=True):
+    def simulation(self, pvmod=True, esums=False, skip=False):
         """Manages the Performance Simulation Model for AC-coupled PV-Battery Systems
+
+        :param esums: Accumulate the energy sums of the real system in the kernel, its power
+            series are then not kept. Enough if only the energy sums and the SPI are needed.
+        :type esums: bool
+        :param skip: Fill the runs of time steps in standby mode in discharged state in bulk,
+            the results are identical to the stepwise simulation. The energy sums are still
+            accumulated over every time step, see Controller.sim.
+        :type skip: bool
         """
-                                                                                                                                                                            
-        self.Real.Ppv2ac_out, self.Real.Ppv2bat_in, self.Real.Ppv2bat_in0, self.Real.Pbat2ac_out, self.Real.Pbat2ac_out0, self.Real.Ppvbs, self.Real.Pbat, self.Real.soc, self.Real.soc0 = batmod_dc(
-            self.d, self.dt, self.Real.soc0, self.Real.soc, self.Real.Pr, self.Real.Prpv,  self.Real.Ppv, self.Real.Ppv2bat_in0, self.Real.Ppv2bat_in,
-            self.Real.Pbat2ac_out0, self.Real.Pbat2ac_out, self.Real.Ppv2ac_out, self.Real.Ppvbs, self.Real.Pbat)
+        if esums:
+            self.S = energy_accumulators(self.parameter)
+            self.Real.Ppv = self.Real.Ppv2bat_in = self.Real.Pbat2ac_out = self.Real.Ppv2ac_out = self.Real.Ppvbs = self.Real.Pbat = self.Real.soc = np.zeros(0, self.ppv.dtype)
+        elif self.outputs != 'all':
+            self.S = energy_accumulators(self.parameter)
 
-        self.Ideal.Pbat, self.Ideal.soc, self.Ideal.soc0 = batmod_dc_ideal(self.d, self.dt, self.Ideal.soc0, self.Ideal.soc, self.Ideal.Pr, self.Ideal.Pbat)
+        self.Real.Ppv, self.Real.Ppv2ac_out, self.Real.Ppv2bat_in, self.Real.Ppv2bat_in0, self.Real.Pbat2ac_out, self.Real.Pbat2ac_out0, self.Real.Ppvbs, self.Real.Pbat, self.Real.soc, self.Real.soc0 = _kernel('batmod_dc_fused', self.Real.soc.dtype)(
+            self.d, self.p, self.dt, self.Real.soc0, self.ppv, self.pl, pvmod, self.Real.Ppv, self.Real.Ppv2bat_in0, self.Real.Ppv2bat_in,
+            self.Real.Pbat2ac_out0, self.Real.Pbat2ac_out, self.Real.Ppv2ac_out, self.Real.Ppvbs, self.Real.Pbat, self.Real.soc,
+            self.S, self.parameter['p_ac2g_max'] * self.parameter['P_PV'] * 1000, skip)
 
         # Define missing parameters
         self.Real.Ppv2ac = self.Real.Ppv2ac_out  # AC output power of the PV2AC conversion pathway
         self.Real.Ppv2bat = self.Real.Ppv2bat_in  # DC input power of the PV2BAT conversion pathway
 
+        if self.outputs != 'all':
+            self.Ideal.Pbat, self.Ideal.soc, self.Ideal.soc0 = _kernel('batmod_ideal_fused', self.ppv.dtype)(
+                self.parameter['E_BAT'], self.parameter['P_PV'], self.dt, self.Ideal.soc0, self.ppv, self.pl, False, self.Ideal.Pbat,
+                self.Ideal.soc, self.Ideal.S)
+            return
+
+        self.Ideal.Pbat, self.Ideal.soc, self.Ideal.soc0 = _kernel('batmod_dc_ideal', self.Ideal.soc.dtype)(self.d, self.dt, self.Ideal.soc0, self.Ideal.soc, self.Ideal.Pr, self.Ideal.Pbat)
+
         self.Ideal.Ppvbs = self.Ideal.Ppv - np.maximum(0, self.Ideal.Pbat) - (np.minimum(0, self.Ideal.Pbat))  # Realized AC power of the PV-battery system
         self.Ideal.Ppv2ac = self.Ideal.Ppv - np.maximum(0, self.Ideal.Pbat)  # AC output power of the PV2AC conversion pathway
         self.Ideal.Ppv2bat = np.maximum(0, self.Ideal.Pbat)  # DC input power of the PV2BAT conversion pathway
@@ -134,8 +193,15 @@ class BatModDC:
     def bat_mod_res(self):
         """Function to calculate the power flows and energy sums including curtailment of PV power
         """
-        self.Real.E = bat_res_mod(self.parameter, self.pl, self.Real.Ppv, self.Real.Pbat,
-                                  self.dt, self.Real.Ppv2ac, self.Real.Ppv2bat, self.Real.Ppvbs, self.Real.Pperi)
+        if self.S.size > 0:  # Energy sums accumulated in the kernel
+            self.Real.E = energy_sums(self.parameter, self.S, self.dt)
+        else:
+            self.Real.E = bat_res_mod(self.parameter, self.pl, self.Real.Ppv, self.Real.Pbat,
+                                      self.dt, self.Real.Ppv2ac, self.Real.Ppv2bat, self.Real.Ppvbs, self.Real.Pperi)
+
+        if self.outputs != 'all':  # Energy sums of the ideal system accumulated in the kernel
+            self.Ideal.E = energy_dict(self.Ideal.S, E_KEYS_DC, self.dt)
+            return
 
         self.Ideal.E = bat_res_mod_ideal(self.parameter, self.pl, self.Ideal.Ppv, self.Ideal.Pbat,
                                          self.dt, self.Ideal.Ppv2ac, self.Ideal.Ppv2bat, self.Ideal.Ppvbs, self.Ideal.Pperi)
@@ -201,10 +267,16 @@ class BatModAC:
     :param dt: time step width in seconds
     :type dt: integer
 
+    :param soc0: State of charge of the battery in the first time step
+    :type soc0: float
+
+    :param outputs: Series that are kept, see OUTPUTS
+    :type outputs: string
+
     """
     _version = '0.1'
 
-    def __init__(self, parameter, d, ppv, pl, dt):
+    def __init__(self, parameter, d, ppv, pl, dt, soc0=0, outputs='all'):
         """Constructor method
         """
         self.parameter = parameter
@@ -212,27 +284,43 @@ class BatModAC:
         self.ppv = ppv
         self.pl = pl
         self.dt = dt
+        self.outputs = _check_outputs(outputs)
         self.spi = float()
         self.th = False  # Start threshold for the recharging of the battery
 
-        # Initialization and preallocation
+        # Parameters of the PV inverter, the residual power is computed together with
+        # the battery dispatch in the fused kernel
+        self.p = transform_dict_to_pvinv_array(parameter)
+        self.S = np.zeros((2, 0))  # Accumulators of the energy sums, see simulation
+
+        # Series of the real and the ideal system of this instance, not shared with other instances
+        self.Real = self.Real.__new__(self.Real)
+        self.Ideal = self.Ideal.__new__(self.Ideal)
+
+        # Initialization and preallocation, series that are not kept are empty
+        keep = self.outputs == 'all'
 
-        self.Real.Pr, self.Real.Ppv, self.Real.Ppvs, self.Real.Pperi = max_self_consumption(parameter, ppv, pl, pvmod=True)
-        self.Real.Pbat = np.zeros_like(self.ppv)  # DC power of the battery in W
-        self.Real.Pbs = np.zeros_like(self.ppv)  # AC power of the battery system in W
-        self.Real.soc = np.zeros_like(self.ppv)  # State of charge of the battery
-        self.Real.soc0 = 0  # State of charge of the battery in the first time step
+        self.Real.Ppv = _output(self.ppv, keep)  # DC power output of the PV generator in W
+        self.Real.Ppvs = _output(self.ppv, keep)  # AC power output of the PV inverter in W
+        # Additional power consumption of other system components (e.g. AC power meter) in W
+        self.Real.Pperi = _output(self.ppv, keep)
+        self.Real.Pbat = _output(self.ppv, keep)  # DC power of the battery in W
+        self.Real.Pbs = _output(self.ppv, keep)  # AC power of the battery system in W
+        self.Real.soc = _output(self.ppv, self.outputs != 'none', soc0)  # State of charge of the battery
+        self.Real.soc0 = soc0  # State of charge of the battery in the first time step
         self.Real.Pbs0 = 0  # State of the battery storage in the previous time step
 
-        self.Ideal.Ppv = np.maximum(0, ppv) * parameter['P_PV'] * 1000
-        self.Ideal.Pr = self.Ideal.Ppv - pl
-        self.Ideal.Pbat = np.zeros_like(self.ppv)
-        self.Ideal.Pbs = np.zeros_like(self.ppv)
+        self.Ideal.Pbat = _output(self.ppv, keep)
         self.Ideal.Pbs0 = 0
-        self.Ideal.soc = np.zeros_like(self.ppv)
-        self.Ideal.soc0 = 0
-        self.Ideal.Ppvs = self.Ideal.Ppv
-        self.Ideal.Pperi = np.zeros_like(self.ppv)
+        self.Ideal.soc = _output(self.ppv, keep)
+        self.Ideal.soc0 = soc0
+        self.Ideal.S = np.zeros((2, len(E_KEYS_AC)))  # Accumulators of the ideal energy sums
+        if keep:
+            self.Ideal.Ppv = np.maximum(0, ppv) * parameter['P_PV'] * 1000
+            self.Ideal.Pr = self.Ideal.Ppv - pl
+            self.Ideal.Pbs = np.zeros_like(self.ppv)
+            self.Ideal.Ppvs = self.Ideal.Ppv
+            self.Ideal.Pperi = np.zeros_like(self.ppv)
 
     @dataclass
     class Real(Data):
@@ -245,22 +333,51 @@ class BatModAC:
         def __init__(self):
             super().__init__()
 
-    def simulation(self):
+    def simulation(self, esums=False, skip=False):
 
         """Manages the Performance Simulation Model for AC-coupled PV-Battery Systems
+
+        :param esums: Accumulate the energy sums of the real system in the kernel, its power
+            series are then not kept. Enough if only the energy sums and the SPI are needed.
+        :type esums: bool
+        :param skip: Fill the runs of time steps in standby mode in discharged state in bulk,
+            the results are identical to the stepwise simulation. The energy sums are still
+            accumulated over every time step, see Controller.sim.
+        :type skip: bool
         """
-        
-        self.Real.Pbat, self.Real.Pbs, self.Real.soc, self.Real.soc0, self.Real.Pbs0 = batmod_ac(
-            self.d, self.dt, self.Real.soc0, self.Real.soc, self.Real.Pr, self.Real.Pbs0, self.Real.Pbs, self.Real.Pbat)
-        
-        self.Ideal.Pbs, self.Ideal.Pbat, self.Ideal.soc0, self.Ideal.soc = batmod_ac_ideal(
+
+        if esums:
+            self.S = energy_accumulators(self.parameter)
+            self.Real.Ppv = self.Real.Ppvs = self.Real.Pperi = self.Real.Pbs = self.Real.Pbat = self.Real.soc = np.zeros(0, self.ppv.dtype)
+        elif self.outputs != 'all':
+            self.S = energy_accumulators(self.parameter)
+
+        self.Real.Ppv, self.Real.Ppvs, self.Real.Pperi, self.Real.Pbat, self.Real.Pbs, self.Real.soc, self.Real.soc0, self.Real.Pbs0 = _kernel('batmod_ac_fused', self.Real.soc.dtype)(
+            self.d, self.p, self.dt, self.Real.soc0, self.ppv, self.pl, True, self.Real.Ppv, self.Real.Ppvs, self.Real.Pperi,
+            self.Real.Pbs, self.Real.Pbat, self.Real.soc, self.S, self.parameter['p_ac2g_max'] * self.parameter['P_PV'] * 1000, skip)
+
+        if self.outputs != 'all':
+            self.Ideal.Pbat, self.Ideal.soc, self.Ideal.soc0 = _kernel('batmod_ideal_fused', self.ppv.dtype)(
+                self.parameter['E_BAT'], self.parameter['P_PV'], self.dt, self.Ideal.soc0, self.ppv, self.pl, True, self.Ideal.Pbat,
+                self.Ideal.soc, self.Ideal.S)
+            self.Ideal.Pbs = self.Ideal.Pbat
+            return
+
+        self.Ideal.Pbs, self.Ideal.Pbat, self.Ideal.soc0, self.Ideal.soc = _kernel('batmod_ac_ideal', self.Ideal.soc.dtype)(
                 self.d, self.dt, self.Ideal.soc0, self.Ideal.soc, self.Ideal.Pr, self.Ideal.Pbat)
 
     def bat_mod_res(self):
         """Function to calculate the power flows and energy sums including curtailment of PV power
         """
-        self.Real.E = bat_res_mod(
-            self.parameter, self.pl, self.Real.Ppv, self.Real.Pbat, self.dt, self.Real.Ppvs, self.Real.Pbs, self.Real.Pperi)
+        if self.S.size > 0:  # Energy sums accumulated in the kernel
+            self.Real.E = energy_sums(self.parameter, self.S, self.dt)
+        else:
+            self.Real.E = bat_res_mod(
+                self.parameter, self.pl, self.Real.Ppv, self.Real.Pbat, self.dt, self.Real.Ppvs, self.Real.Pbs, self.Real.Pperi)
+
+        if self.outputs != 'all':  # Energy sums of the ideal system accumulated in the kernel
+            self.Ideal.E = energy_dict(self.Ideal.S, E_KEYS_AC, self.dt)
+            return
 
         self.Ideal.E = bat_res_mod_ideal(
             self.parameter, self.pl, self.Ideal.Ppv, self.Ideal.Pbat, self.dt, self.Ideal.Ppvs, self.Ideal.Pbs, self.Ideal.Pperi)
@@ -330,10 +447,17 @@ class BatModPV:
 
     :param dt: time step width in seconds
     :type dt: integer
+
+    :param soc0: State of charge of the battery in the first time step
+    :type soc0: float
+
+    :param outputs: Series that are kept, see OUTPUTS. The kernel of PV-coupled systems needs
+        all series, the others are released after the energy sums are calculated.
+    :type outputs: string
     """
     _version = '0.1'
 
-    def __init__(self, parameter, d, ppv, pl, Pac, Ppv, Pperi, dt):
+    def __init__(self, parameter, d, ppv, pl, Pac, Ppv, Pperi, dt, soc0=0, outputs='all'):
         """Constructor method
         """
         self.parameter = parameter
@@ -344,10 +468,12 @@ class BatModPV:
         self.Ppv = Ppv
         self.Pperi = Pperi
         self.dt = dt
+        self.soc0 = soc0  # Initial state of charge of the battery in the first time step
+        self.outputs = _check_outputs(outputs)
 
         # Initialization and preallocation
         self.Pbat = np.zeros_like(self.ppv)  # DC power of the battery in W
-        self.soc = np.zeros_like(self.ppv)  # State of charge of the battery
+        self.soc = np.full_like(self.ppv, soc0)  # State of charge of the battery
         # Output power of the PV2AC conversion pathway in W
         self.Ppv2ac_out = np.zeros_like(self.ppv)
         # Input power of the PV2BAT conversion pathway in W
@@ -363,15 +489,20 @@ class BatModPV:
 
         self.bat_mod_res()
 
+        if self.outputs != 'all':
+            for name in ('Pac', 'Ppv', 'Pperi', 'Pbat', 'Ppv2ac_out', 'Ppv2bat_in', 'Pbat2pv_out', 'Ppvbs', 'Ppv2ac', 'Ppv2bat'):
+                setattr(self, name, np.zeros(0, self.ppv.dtype))
+            if self.outputs == 'none':
+                self.soc = np.zeros(0, self.ppv.dtype)
+
     def simulation(self, pvmod=True):
         """Manages the Performance Simulation Model for AC-coupled PV-Battery Systems
         """
         self.th = 0  # Start threshold for the recharging of the battery
-        self.soc0 = 0  # Initial state of charge of the battery in the first time step
 
         # Simulation of the battery system
         #start = time.process_time()
-        self.soc, self.soc0, self.Ppv, self.Ppvbs, self.Pbat, self.Ppv2ac_out, self.Pbat2pv_out, self.Ppv2bat_in = batmod_pv(self.d, self.dt, self.soc0, self.soc, self.Ppv, self.Pac, self.Ppv2bat_in0, self.Ppv2bat_in, self.Ppv2ac_out, self.Pbat2pv_out0, self.Pbat2pv_out, self.Ppvbs, self.Pbat)
+        self.soc, self.soc0, self.Ppv, self.Ppvbs, self.Pbat, self.Ppv2ac_out, self.Pbat2pv_out, self.Ppv2bat_in = _kernel('batmod_pv', self.soc.dtype)(self.d, self.dt, self.soc0, self.soc, self.Ppv, self.Pac, self.Ppv2bat_in0, self.Ppv2bat_in, self.Ppv2ac_out, self.Pbat2pv_out0, self.Pbat2pv_out, self.Ppvbs, self.Pbat)
         #print(time.process_time()-start)
         # Define missing parameters
         self.Ppv2ac = self.Ppv2ac_out  # AC output power of the PV2AC conversion pathway
@@ -587,7 +718,8 @@ def max_self_consumption(parameter, ppv, pl, pvmod=True, ideal=False):
         else:
             Pr = Ppvs - pl - Pperi
 
-        return Pr, Ppv, Ppvs, Pperi
+        # Keep the data type of the input series, the parameters are double precision
+        return tuple(x.astype(ppv.dtype, copy=False) for x in (Pr, Ppv, Ppvs, Pperi))
 
     # Maximize self consumption for DC-coupled systems
     elif parameter['Top'] == 'DC':
@@ -631,7 +763,8 @@ def max_self_consumption(parameter, ppv, pl, pvmod=True, ideal=False):
         # Residual power for battery discharging
         Pr = Ppv2ac_out - Pac
 
-        return Pr, Prpv, Ppv, ppv2ac, Ppv2ac_out
+        # Keep the data type of the input series, the parameters are double precision
+        return tuple(x.astype(ppv.dtype, copy=False) for x in (Pr, Prpv, Ppv, ppv2ac, Ppv2ac_out))
 
     # Maximize self consumption for PV-coupled systems
     elif parameter['Top'] == 'PV':
@@ -659,48 +792,268 @@ def max_self_consumption(parameter, ppv, pl, pvmod=True, ideal=False):
         # Power demand on the AC side
         Pac = pl + Pperi
 
-        return Pac, Ppv, Pperi
-
-
-@nb.jit(nopython=True)
-def batmod_ac(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat):
-    """Performance Simulation function for AC-coupled battery systems
-
-    :param d: array containing parameters
-    :type d: numpy array
+        # Keep the data type of the input series, the parameters are double precision
+        return tuple(x.astype(ppv.dtype, copy=False) for x in (Pac, Ppv, Pperi))
+
+
+# Explicit signatures of the simulation kernels. The kernels are compiled eagerly when the
+# module is imported (or loaded from the on-disk cache) and all states of the previous time
+# step are pinned to float64, so calling them with soc0=0 does not compile a second version.
+SIGNATURES = {
+    'batmod_ideal': 'Tuple((f8[:], f8[:], f8))(f8, f8, f8, f8[:], f8[:], f8[:])',
+    'batmod_ac_chunk': 'Tuple((f8[:], f8[:], f8[:], f8, f8, b1))'
+                       '(f8[:], f8, f8, f8[:], f8[:], f8, f8[:], f8[:], b1, i8, b1)',
+    'batmod_ac': 'Tuple((f8[:], f8[:], f8[:], f8, f8))(f8[:], f8, f8, f8[:], f8[:], f8, f8[:], f8[:])',
+    'batmod_ac_ideal': 'Tuple((f8[:], f8[:], f8, f8[:]))(f8[:], f8, f8, f8[:], f8[:], f8[:])',
+    'batmod_dc_chunk': 'Tuple((f8[:], f8[:], f8, f8[:], f8, f8[:], f8[:], f8[:], f8, b1))'
+                       '(f8[:], f8, f8, f8[:], f8[:], f8[:], f8[:], f8, f8[:], f8, f8[:], f8[:], f8[:], f8[:], b1, i8, b1)',
+    'batmod_dc': 'Tuple((f8[:], f8[:], f8, f8[:], f8, f8[:], f8[:], f8[:], f8))'
+                 '(f8[:], f8, f8, f8[:], f8[:], f8[:], f8[:], f8, f8[:], f8, f8[:], f8[:], f8[:], f8[:])',
+    'batmod_dc_ideal': 'Tuple((f8[:], f8[:], f8))(f8[:], f8, f8, f8[:], f8[:], f8[:])',
+    'batmod_pv_chunk': 'Tuple((f8[:], f8, f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], b1))'
+                       '(f8[:], f8, f8, f8[:], f8[:], f8[:], f8, f8[:], f8[:], f8, f8[:], f8[:], f8[:], b1, i8)',
+    'batmod_pv': 'Tuple((f8[:], f8, f8[:], f8[:], f8[:], f8[:], f8[:], f8[:]))'
+                 '(f8[:], f8, f8, f8[:], f8[:], f8[:], f8, f8[:], f8[:], f8, f8[:], f8[:], f8[:])',
+    'batmod_ac_fused': 'Tuple((f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8, f8))'
+                       '(f8[:], f8[:], f8, f8, f8[:], f8[:], b1, f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:, :], f8, b1)',
+    'batmod_dc_fused': 'Tuple((f8[:], f8[:], f8[:], f8, f8[:], f8, f8[:], f8[:], f8[:], f8))'
+                       '(f8[:], f8[:], f8, f8, f8[:], f8[:], b1, f8[:], f8, f8[:], f8, f8[:], f8[:], f8[:], f8[:], f8[:], f8[:, :], f8, b1)',
+    'batmod_ideal_fused': 'Tuple((f8[:], f8[:], f8))(f8, f8, f8, f8, f8[:], f8[:], b1, f8[:], f8[:], f8[:, :])',
+    'energy_sums_ac': 'f8[:, :](f8[:, :], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8)',
+    'energy_sums_dc': 'f8[:, :](f8[:, :], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8)',
+    'energy_sums_ideal_ac': 'f8[:, :](f8[:, :], f8[:], f8[:], f8[:], f8[:], f8[:])',
+    'energy_sums_ideal_dc': 'f8[:, :](f8[:, :], f8[:], f8[:], f8[:], f8[:])',
+    'batmod_ideal_batch': '(f8[:], f8, f8[:], f8[:, :])',
+    'batmod_ac_batch': '(f8[:, :], f8, f8[:], f8[:, :], f8[:])',
+    'batmod_dc_batch': '(f8[:, :], f8, f8[:], f8[:, :], f8[:, :], f8[:, :], f8[:], f8[:], f8[:, :])',
+    'batmod_pv_batch': '(f8[:, :], f8, f8[:], f8[:, :], f8[:, :], f8[:], f8[:])',
+    'parse_csv': 'f8[:, :](u1[:], i8, i8, i8[:], i8)',
+    'resample_steps': '(f8[:], f8, f8, b1, f8[:])',
+    'resample_steps_batch': '(f8[:, :], f8, f8, b1, f8[:, :])',
+    'format_csv': 'u1[:](f8[:, :], f8, f8, i8, i8)',
+    'synthetic_batch': '(i8[:], f8[:], f8[:], i8, f8, f8[:, :], f8[:, :], f8[:, :])',
+}
+
+# Additional single precision signatures of the kernels: the time series are float32,
+# the parameters and the states of the previous time step stay float64
+SIGNATURES_SINGLE = {
+    'batmod_ideal': '(f8, f8, f8, f4[:], f4[:], f4[:])',
+    'batmod_ac_chunk': '(f8[:], f8, f8, f4[:], f4[:], f8, f4[:], f4[:], b1, i8, b1)',
+    'batmod_ac': '(f8[:], f8, f8, f4[:], f4[:], f8, f4[:], f4[:])',
+    'batmod_ac_ideal': '(f8[:], f8, f8, f4[:], f4[:], f4[:])',
+    'batmod_dc_chunk': '(f8[:], f8, f8, f4[:], f4[:], f4[:], f4[:], f8, f4[:], f8, f4[:], f4[:], f4[:], f4[:], b1, i8, b1)',
+    'batmod_dc': '(f8[:], f8, f8, f4[:], f4[:], f4[:], f4[:], f8, f4[:], f8, f4[:], f4[:], f4[:], f4[:])',
+    'batmod_dc_ideal': '(f8[:], f8, f8, f4[:], f4[:], f4[:])',
+    'batmod_pv_chunk': '(f8[:], f8, f8, f4[:], f4[:], f4[:], f8, f4[:], f4[:], f8, f4[:], f4[:], f4[:], b1, i8)',
+    'batmod_pv': '(f8[:], f8, f8, f4[:], f4[:], f4[:], f8, f4[:], f4[:], f8, f4[:], f4[:], f4[:])',
+    'batmod_ac_fused': '(f8[:], f8[:], f8, f8, f4[:], f4[:], b1, f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f8[:, :], f8, b1)',
+    'batmod_dc_fused': '(f8[:], f8[:], f8, f8, f4[:], f4[:], b1, f4[:], f8, f4[:], f8, f4[:], f4[:], f4[:], f4[:], f4[:], f8[:, :], f8, b1)',
+    'batmod_ideal_fused': '(f8, f8, f8, f8, f4[:], f4[:], b1, f4[:], f4[:], f8[:, :])',
+    'energy_sums_ac': '(f8[:, :], f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f8[:], f8)',
+    'energy_sums_dc': '(f8[:, :], f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f4[:], f8[:], f8)',
+    'energy_sums_ideal_ac': '(f8[:, :], f4[:], f4[:], f4[:], f4[:], f4[:])',
+    'energy_sums_ideal_dc': '(f8[:, :], f4[:], f4[:], f4[:], f4[:])',
+    'resample_steps': '(f4[:], f8, f8, b1, f4[:])',
+    'resample_steps_batch': '(f4[:, :], f8, f8, b1, f4[:, :])',
+}
+
+# Kernels that can be compiled ahead of time with build_aot (parallel kernels are excluded)
+AOT_KERNELS = ('batmod_ideal', 'batmod_ac', 'batmod_ac_ideal', 'batmod_dc', 'batmod_dc_ideal', 'batmod_pv',
+               'batmod_ac_chunk', 'batmod_dc_chunk', 'batmod_pv_chunk', 'batmod_ac_fused', 'batmod_dc_fused', 'batmod_ideal_fused',
+               'energy_sums_ac', 'energy_sums_dc', 'energy_sums_ideal_ac', 'energy_sums_ideal_dc')
+
+# Number of time steps the fused kernels preprocess and simulate at once, small enough
+# for the block buffers to stay in the cache
+FUSED_BLOCK = 4096
+
+# Selections of the series the model classes keep: 'none' keeps only the energy sums and the
+# SPI, 'soc' the state of charge of the battery as well and 'all' every series
+OUTPUTS = ('none', 'soc', 'all')
+
+# Records of the system parameters consumed by the kernels, one float64 field per parameter.
+# The kernels take the float64 view of a record and index it by name, see _positions.
+PARAMETER_DTYPES = {
+    'AC': np.dtype([(name, np.float64) for name in (
+        'E_BAT', 'eta_BAT', 't_CONSTANT', 'P_SYS_SOC0_DC', 'P_SYS_SOC0_AC', 'P_SYS_SOC1_DC',
+        'P_SYS_SOC1_AC', 'AC2BAT_a_in', 'AC2BAT_b_in', 'AC2BAT_c_in', 'BAT2AC_a_out', 'BAT2AC_b_out',
+        'BAT2AC_c_out', 'P_AC2BAT_DEV', 'P_BAT2AC_DEV', 'P_BAT2AC_out', 'P_AC2BAT_in', 't_DEAD', 'SOC_h')]),
+    'DC': np.dtype([(name, np.float64) for name in (
+        'E_BAT', 'P_PV2AC_in', 'P_PV2AC_out', 'P_PV2BAT_in', 'P_BAT2AC_out', 'PV2AC_a_in', 'PV2AC_b_in',
+        'PV2AC_c_in', 'PV2BAT_a_in', 'PV2BAT_b_in', 'BAT2AC_a_out', 'BAT2AC_b_out', 'BAT2AC_c_out',
+        'eta_BAT', 'SOC_h', 'P_PV2BAT_DEV', 'P_BAT2AC_DEV', 't_DEAD', 't_CONSTANT', 'P_SYS_SOC1_DC',
+        'P_SYS_SOC0_AC', 'P_SYS_SOC0_DC')]),
+    'PV': np.dtype([(name, np.float64) for name in (
+        'E_BAT', 'P_PV2AC_in', 'P_PV2AC_out', 'P_PV2BAT_in', 'P_BAT2PV_out', 'PV2AC_a_in', 'PV2AC_b_in',
+        'PV2AC_c_in', 'PV2BAT_a_in', 'PV2BAT_b_in', 'PV2BAT_c_in', 'PV2AC_a_out', 'PV2AC_b_out',
+        'PV2AC_c_out', 'BAT2PV_a_out', 'BAT2PV_b_out', 'BAT2PV_c_out', 'eta_BAT', 'SOC_h', 'P_PV2BAT_DEV',
+        'P_BAT2AC_DEV', 'P_SYS_SOC1_DC', 'P_SYS_SOC0_AC', 'P_SYS_SOC0_DC', 't_DEAD', 't_CONSTANT')]),
+}
+
+# Records of the parameters of the PV inverter consumed by the fused kernels and the energy sums
+PVINV_DTYPES = {
+    'AC': np.dtype([(name, np.float64) for name in (
+        'P_PV', 'P_PV2AC_in', 'P_PV2AC_out', 'PV2AC_a_in', 'PV2AC_b_in', 'PV2AC_c_in', 'PV2AC_a_out',
+        'PV2AC_b_out', 'PV2AC_c_out', 'P_PERI_AC', 'P_PVINV_AC')]),
+    'DC': np.dtype([(name, np.float64) for name in (
+        'P_PV', 'P_PV2AC_in', 'P_PV2AC_out', 'PV2AC_a_in', 'PV2AC_b_in', 'PV2AC_c_in', 'PV2AC_a_out',
+        'PV2AC_b_out', 'PV2AC_c_out', 'P_PERI_AC')]),
+}
+
+
+def _positions(dtype):
+    """Positions of the fields of a parameter record in its float64 view"""
+    return collections.namedtuple('Positions', dtype.names)(*range(len(dtype.names)))
+
+
+# Positions of the parameters in the parameter arrays of the kernels, e.g. d[_AC.t_DEAD]
+_AC = _positions(PARAMETER_DTYPES['AC'])
+_DC = _positions(PARAMETER_DTYPES['DC'])
+_PV = _positions(PARAMETER_DTYPES['PV'])
+_PVINV_AC = _positions(PVINV_DTYPES['AC'])
+_PVINV_DC = _positions(PVINV_DTYPES['DC'])
+
+# Energy sums of AC-coupled systems in the order of the accumulators of energy_sums_ac
+E_KEYS_AC = ('El', 'Epv', 'Ebatin', 'Ebatout', 'Eac2g', 'Eg2ac', 'Eg2l', 'Eperi', 'Ect',
+             'Epvs', 'Eac2bs', 'Ebs2ac', 'Epvs2l', 'Epvs2bs', 'Eg2bs', 'Epvs2g', 'Ebs2l', 'Ebs2g')
+
+# Energy sums of DC- and PV-coupled systems in the order of the accumulators of energy_sums_dc
+E_KEYS_DC = ('El', 'Epv', 'Ebatin', 'Ebatout', 'Eac2g', 'Eg2ac', 'Eg2l', 'Eperi', 'Ect',
+             'Eg2pvbs', 'Eac2pvbs', 'Epvbs2ac', 'Epvbs2l')
+
+
+@nb.jit([SIGNATURES['batmod_ideal'], SIGNATURES_SINGLE['batmod_ideal']], nopython=True, cache=True)
+def batmod_ideal(_E_BAT, _dt, _soc0, _soc, _Pr, _Pbat):
+    """Lossless battery model of AC- and DC-coupled systems
+
+    The battery takes up the residual power completely until it is full or empty. Time
+    steps in which a full battery would be charged or an empty battery would be discharged
+    do not change the state of charge, so these runs are filled at once instead of being
+    integrated step by step. The results are identical to the step by step integration.
+
+    :param E_BAT: capacity of the battery in kWh
+    :type E_BAT: float
     :param dt: time step width
     :type dt: integer
     :param soc0: state of charge in the previous time step
     :type soc0: float
+    :param soc: state of charge
+    :type soc: numpy array
     :param Pr: residual power
     :type Pr: numpy array
-    :param Pbs0: AC-power of the battery system in the previous time step
-    :type Pbs0: float
-    :param Pbs: AC-power of the battery syste
-    :type Pbs: numpy array
-    :param Pbat: DC-power oof the battery
+    :param Pbat: DC-power of the battery
     :type Pbat: numpy array
     """
+    _tend = _Pr.size
+    t = 0
+
+    while t < _tend:
+
+        # Energy content of the battery in the previous time step
+        E_b0 = _soc0 * _E_BAT * 1000
+
+        # Calculate the DC power of the battery from the residual power
+        P_bat = _Pr[t]
+
+        # Decision if the battery should be charged or discharged
+        if P_bat > 0 and _soc0 < 1 or P_bat < 0 and _soc0 > 0:
+
+            # Change the energy content of the battery
+            E_b = E_b0 + P_bat * _dt / 3600
+
+            _Pbat[t] = P_bat
+            _soc0 = E_b / (_E_BAT * 1000)
+            _soc[t] = _soc0
+            t += 1
+
+        else:  # Neither charging nor discharging of the battery
+
+            # No change in the energy content of the battery
+            _Pbat[t] = 0
+            _soc0 = E_b0 / (_E_BAT * 1000)
+            _soc[t] = _soc0
+            t += 1
+
+            # If the conversion between energy content and state of charge is stable,
+            # the state of charge does not change until the battery is used again
+            if _soc0 * _E_BAT * 1000 / (_E_BAT * 1000) == _soc0:
+                while t < _tend and not (_Pr[t] > 0 and _soc0 < 1 or _Pr[t] < 0 and _soc0 > 0):
+                    _Pbat[t] = 0
+                    _soc[t] = _soc0
+                    t += 1
+
+    return _Pbat, _soc, _soc0
+
+
+@nb.jit(SIGNATURES['batmod_ideal_batch'], nopython=True, parallel=True, cache=True)
+def batmod_ideal_batch(_E_BAT, _dt, _soc0, _Pr):
+    """Lossless battery model for many AC- or DC-coupled systems at once
+
+    :param E_BAT: capacity of the battery of each system in kWh
+    :type E_BAT: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge of each system in the previous time step
+    :type soc0: numpy array
+    :param Pr: residual power of each system (systems x time steps)
+    :type Pr: numpy array
+    :return: stacked DC-power of the battery, state of charge and the final state of charge of every system
+    :rtype: tuple
+    """
+    _n = _E_BAT.size
+
+    _Pbat = np.zeros(_Pr.shape)
+    _soc = np.zeros(_Pr.shape)
+    _soc_end = np.zeros(_n)
+
+    for i in nb.prange(_n):
+        _, _, soc0 = batmod_ideal(_E_BAT[i], _dt, _soc0[i], _soc[i], _Pr[i], _Pbat[i])
+        _soc_end[i] = soc0
+
+    return _Pbat, _soc, _soc_end
+
+
+@nb.jit([SIGNATURES['batmod_ac_chunk'], SIGNATURES_SINGLE['batmod_ac_chunk']], nopython=True, cache=True)
+def batmod_ac_chunk(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat, _th, _t0, _skip):
+    """Performance simulation function for AC-coupled battery systems that continues a previous run
+
+    Takes the same arguments as :func:`batmod_ac` plus the state of the hysteresis threshold
+    and the start index of the chunk. With _t0 < 0 the simulation starts like :func:`batmod_ac`.
+    Otherwise the first _t0 entries of the input and output arrays hold the last time steps
+    of the previous chunk (dead time history) and the simulation starts at index _t0.
+
+    With _skip the runs of time steps in standby mode in discharged state in which the state
+    of the system cannot change (e.g. at night) are filled in bulk instead of being simulated
+    step by step. The results are identical to the stepwise simulation.
+
+    :param th: hysteresis threshold for the recharging of the battery in the previous time step
+    :type th: bool
+    :param t0: index of the first time step of the chunk or -1 for the first chunk
+    :type t0: integer
+    :param skip: skip the runs of time steps in which the state of the system cannot change
+    :type skip: bool
+    :return: results of :func:`batmod_ac` and the hysteresis threshold of the last time step
+    :rtype: tuple
+    """
     # Loading of particular variables
-    _E_BAT = d[0]
-    _eta_BAT = d[1]
-    _t_CONSTANT = d[2]
-    _P_SYS_SOC0_DC = d[3]
-    _P_SYS_SOC0_AC = d[4]
-    _P_SYS_SOC1_DC = d[5]
-    _P_SYS_SOC1_AC = d[6]
-    _AC2BAT_a_in = d[7]
-    _AC2BAT_b_in = d[8]
-    _AC2BAT_c_in = d[9]
-    _BAT2AC_a_out = d[10]
-    _BAT2AC_b_out = d[11]
-    _BAT2AC_c_out = d[12]
-    _P_AC2BAT_DEV = d[13]
-    _P_BAT2AC_DEV = d[14]
-    _P_BAT2AC_out = d[15]
-    _P_AC2BAT_in = d[16]
-    _t_DEAD = int(round(d[17]))
-    _SOC_h = d[18]
+    _E_BAT = d[_AC.E_BAT]
+    _eta_BAT = d[_AC.eta_BAT]
+    _t_CONSTANT = d[_AC.t_CONSTANT]
+    _P_SYS_SOC0_DC = d[_AC.P_SYS_SOC0_DC]
+    _P_SYS_SOC0_AC = d[_AC.P_SYS_SOC0_AC]
+    _P_SYS_SOC1_DC = d[_AC.P_SYS_SOC1_DC]
+    _P_SYS_SOC1_AC = d[_AC.P_SYS_SOC1_AC]
+    _AC2BAT_a_in = d[_AC.AC2BAT_a_in]
+    _AC2BAT_b_in = d[_AC.AC2BAT_b_in]
+    _AC2BAT_c_in = d[_AC.AC2BAT_c_in]
+    _BAT2AC_a_out = d[_AC.BAT2AC_a_out]
+    _BAT2AC_b_out = d[_AC.BAT2AC_b_out]
+    _BAT2AC_c_out = d[_AC.BAT2AC_c_out]
+    _P_AC2BAT_DEV = d[_AC.P_AC2BAT_DEV]
+    _P_BAT2AC_DEV = d[_AC.P_BAT2AC_DEV]
+    _P_BAT2AC_out = d[_AC.P_BAT2AC_out]
+    _P_AC2BAT_in = d[_AC.P_AC2BAT_in]
+    _t_DEAD = int(round(d[_AC.t_DEAD]))
+    _SOC_h = d[_AC.SOC_h]
 
     _P_AC2BAT_min = _AC2BAT_c_in
     _P_BAT2AC_min = _BAT2AC_c_out
@@ -717,7 +1070,6 @@ def batmod_ac(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat):
     # First time step with regard to the dead time of the system control
     _tstart = np.maximum(2, 1 + _t_DEAD)
     _tend = int(_Pr.size)
-    _th = 0
 
     # Capacity of the battery, conversion from kWh to Wh
     _E_BAT *= 1000
@@ -726,19 +1078,37 @@ def batmod_ac(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat):
     _eta_BAT /= 100
 
     # Check if the dead or settling time can be ignored and set flags accordingly
-    if _dt >= (3 * _t_CONSTANT) or _tend == 1:
+    if _dt >= (3 * _t_CONSTANT) or _tend == 1 and _t0 < 0:
         _tstart = 1
         T_DEAD = False
     else:
         T_DEAD = True
 
+    # Continue a previous chunk, the first _t0 time steps hold the history of the previous chunk
+    if _t0 >= 0:
+        _tstart = _t0 + 1
+
     if _dt >= _t_DEAD + 3 * _t_CONSTANT:
         SETTLING = False
     else:
         SETTLING = True
 
+    # Delay of the residual power and end of the run of time steps that is skipped
+    _lag = _t_DEAD if T_DEAD else 0
+    _tskip = 0
+    _idle = False
+
     for t in range(_tstart - 1, _tend):
 
+        # Time step already filled in by a skipped run
+        if t < _tskip:
+            continue
+
+        # State of the previous time step
+        soc0 = _soc0
+        th = _th
+        idle = False
+
         # Energy content of the battery in the previous time step
         E_b0 = _soc0 * _E_BAT
 
@@ -823,6 +1193,7 @@ def batmod_ac(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat):
             # DC and AC power consumption of the battery converter
             P_bat = -np.maximum(0, _P_SYS_SOC0_DC)
             P_bs = _P_SYS_SOC0_AC
+            idle = True
 
         elif P_bat == 0 and _soc0 > 0:  # Standby mode in fully charged state
 
@@ -858,45 +1229,67 @@ def batmod_ac(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat):
         else:
             _th = False
 
-    return _Pbat, _Pbs, _soc, _soc0, _Pbs0
-
+        # In standby mode in discharged state the residual power of every following time step
+        # with a negative estimated energy is reduced to the same value. If the state of the
+        # system did not change and the previous time step was in standby mode as well (same
+        # input of the settling time), these time steps repeat the current one.
+        if _skip and idle and _idle and E_bs_est < 0 and _soc0 == soc0 and _th == th:
+            r = t + 1
+            while r < _tend and _Pr[r - _lag] * _dt / 3600 < 0:
+                r += 1
 
-@nb.jit(nopython=True)
-def batmod_ac_ideal(d, _dt, _soc0, _soc, _Pr, _Pbat):
-
-    _E_BAT = d[0]
-
-    for t in range(_Pr.size):
-
-        # Energy content of the battery in the previous time step
-        E_b0 = _soc0 * _E_BAT * 1000
+            _Pbs[t + 1:r] = _Pbs[t]
+            _Pbat[t + 1:r] = _Pbat[t]
+            _soc[t + 1:r] = _soc[t]
+            _tskip = r
 
-        # Calculate the DC power of the battery from the residual power
-        P_bat = _Pr[t]
+        _idle = idle
 
-        # Decision if the battery should be charged or discharged
-        if P_bat > 0 and _soc0 < 1:  # Battery charging
-            E_b = E_b0 + P_bat * _dt / 3600  # Change the energy content of the battery
+    return _Pbat, _Pbs, _soc, _soc0, _Pbs0, _th
 
-        elif P_bat < 0 and _soc0 > 0:  # Battery discharging
 
-            # Change the energy content of the battery
-            E_b = E_b0 + P_bat * _dt / 3600
+@nb.jit([SIGNATURES['batmod_ac'], SIGNATURES_SINGLE['batmod_ac']], nopython=True, cache=True)
+def batmod_ac(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat):
+    """Performance Simulation function for AC-coupled battery systems
 
-        else:  # Neither charging nor discharging of the battery
+    :param d: array containing parameters
+    :type d: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge in the previous time step
+    :type soc0: float
+    :param Pr: residual power
+    :type Pr: numpy array
+    :param Pbs0: AC-power of the battery system in the previous time step
+    :type Pbs0: float
+    :param Pbs: AC-power of the battery syste
+    :type Pbs: numpy array
+    :param Pbat: DC-power oof the battery
+    :type Pbat: numpy array
+    """
+    _Pbat, _Pbs, _soc, _soc0, _Pbs0, _ = batmod_ac_chunk(d, _dt, _soc0, _soc, _Pr, _Pbs0, _Pbs, _Pbat, False, -1, False)
 
-            # Set the DC power of the battery to zero
-            P_bat = 0
+    return _Pbat, _Pbs, _soc, _soc0, _Pbs0
 
-            # No change in the energy content of the battery
-            E_b = E_b0
 
-        # Transfer the realized DC power of the battery
-        _Pbat[t] = P_bat
+@nb.jit([SIGNATURES['batmod_ac_ideal'], SIGNATURES_SINGLE['batmod_ac_ideal']], nopython=True, cache=True)
+def batmod_ac_ideal(d, _dt, _soc0, _soc, _Pr, _Pbat):
+    """Lossless battery model for AC-coupled systems, see :func:`batmod_ideal`
 
-        # Calculate the state of charge of the battery
-        _soc0 = E_b / (_E_BAT * 1000)
-        _soc[t] = _soc0
+    :param d: array containing parameters
+    :type d: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge in the previous time step
+    :type soc0: float
+    :param soc: state of charge
+    :type soc: numpy array
+    :param Pr: residual power
+    :type Pr: numpy array
+    :param Pbat: DC-power of the battery
+    :type Pbat: numpy array
+    """
+    _Pbat, _soc, _soc0 = batmod_ideal(d[_AC.E_BAT], _dt, _soc0, _soc, _Pr, _Pbat)
 
     # Define missing parameters
 
@@ -905,62 +1298,51 @@ def batmod_ac_ideal(d, _dt, _soc0, _soc, _Pr, _Pbat):
     return _Pbs, _Pbat, _soc0, _soc
 
 
-@nb.jit(nopython=True)
-def batmod_dc(d, _dt, _soc0, _soc, _Pr, _Prpv,  _Ppv, _Ppv2bat_in0, _Ppv2bat_in, _Pbat2ac_out0, _Pbat2ac_out, _Ppv2ac_out, _Ppvbs, _Pbat):
-    """Performance simulation function for DC-coupled battery systems
+@nb.jit([SIGNATURES['batmod_dc_chunk'], SIGNATURES_SINGLE['batmod_dc_chunk']], nopython=True, cache=True)
+def batmod_dc_chunk(d, _dt, _soc0, _soc, _Pr, _Prpv,  _Ppv, _Ppv2bat_in0, _Ppv2bat_in, _Pbat2ac_out0, _Pbat2ac_out, _Ppv2ac_out, _Ppvbs, _Pbat, _th, _t0, _skip):
+    """Performance simulation function for DC-coupled battery systems that continues a previous run
 
-    :param d: array containing parameters
-    :type d: numpy array
-    :param dt: time step width
-    :type dt: integer
-    :param soc0: state of charge in the previous time step
-    :type soc0: float
-    :param Pr: residual power
-    :type Pr: numpy array
-    :param Prpv: residual power of the PV-system
-    :type Prpv: numpy array
-    :param Ppv: PV-power
-    :type Ppv: numpy array
-    :param Ppv2bat_in0: AC input power of the battery system in the previous time step
-    :type Ppv2bat_in0: float
-    :param Ppv2bat_in: AC input power of the battery system
-    :type Ppv2bat_in: numpy array
-    :param Pbat2ac_out0: AC output power of the battery system in the previous time step
-    :type Pbat2ac_out0: float
-    :param Pbat2ac_out: AC output power of the battery system
-    :type Pbat2ac_out: numpy array
-    :param Ppv2ac_out0: AC output power of the PV inverter in the previous time step
-    :type Ppv2ac_out0: float
-    :param Ppv2ac_out: AC output power of the PV inverter
-    :type Ppv2ac_out: numpy array
-    :param Ppvbs: AC power from the PV system to the battery system
-    :type Ppvbs: numpy array
-    :param Pbat: DC power of the battery
-    :type Pbat: float
+    Takes the same arguments as :func:`batmod_dc` plus the state of the hysteresis threshold
+    and the start index of the chunk. With _t0 < 0 the simulation starts like :func:`batmod_dc`.
+    Otherwise the first _t0 entries of the input and output arrays hold the last time steps
+    of the previous chunk (dead time history) and the simulation starts at index _t0.
+
+    With _skip the runs of time steps in standby mode in discharged state in which the state
+    of the system cannot change (e.g. at night) are filled in bulk instead of being simulated
+    step by step. The results are identical to the stepwise simulation.
+
+    :param th: hysteresis threshold for the recharging of the battery in the previous time step
+    :type th: bool
+    :param t0: index of the first time step of the chunk or -1 for the first chunk
+    :type t0: integer
+    :param skip: skip the runs of time steps in which the state of the system cannot change
+    :type skip: bool
+    :return: results of :func:`batmod_dc` and the hysteresis threshold of the last time step
+    :rtype: tuple
     """
 
-    _E_BAT = d[0]
-    _P_PV2AC_in = d[1]
-    _P_PV2AC_out = d[2]
-    _P_PV2BAT_in = d[3]
-    _P_BAT2AC_out = d[4]
-    _PV2AC_a_in = d[5]
-    _PV2AC_b_in = d[6]
-    _PV2AC_c_in = d[7]
-    _PV2BAT_a_in = d[8]
-    _PV2BAT_b_in = d[9]
-    _BAT2AC_a_out = d[10]
-    _BAT2AC_b_out = d[11]
-    _BAT2AC_c_out = d[12]
-    _eta_BAT = d[13]
-    _SOC_h = d[14]
-    _P_PV2BAT_DEV = d[15]
-    _P_BAT2AC_DEV = d[16]
-    _t_DEAD = int(round(d[17]))
-    _t_CONSTANT = d[18]
-    _P_SYS_SOC1_DC = d[19]
-    _P_SYS_SOC0_AC = d[20]
-    _P_SYS_SOC0_DC = d[21]
+    _E_BAT = d[_DC.E_BAT]
+    _P_PV2AC_in = d[_DC.P_PV2AC_in]
+    _P_PV2AC_out = d[_DC.P_PV2AC_out]
+    _P_PV2BAT_in = d[_DC.P_PV2BAT_in]
+    _P_BAT2AC_out = d[_DC.P_BAT2AC_out]
+    _PV2AC_a_in = d[_DC.PV2AC_a_in]
+    _PV2AC_b_in = d[_DC.PV2AC_b_in]
+    _PV2AC_c_in = d[_DC.PV2AC_c_in]
+    _PV2BAT_a_in = d[_DC.PV2BAT_a_in]
+    _PV2BAT_b_in = d[_DC.PV2BAT_b_in]
+    _BAT2AC_a_out = d[_DC.BAT2AC_a_out]
+    _BAT2AC_b_out = d[_DC.BAT2AC_b_out]
+    _BAT2AC_c_out = d[_DC.BAT2AC_c_out]
+    _eta_BAT = d[_DC.eta_BAT]
+    _SOC_h = d[_DC.SOC_h]
+    _P_PV2BAT_DEV = d[_DC.P_PV2BAT_DEV]
+    _P_BAT2AC_DEV = d[_DC.P_BAT2AC_DEV]
+    _t_DEAD = int(round(d[_DC.t_DEAD]))
+    _t_CONSTANT = d[_DC.t_CONSTANT]
+    _P_SYS_SOC1_DC = d[_DC.P_SYS_SOC1_DC]
+    _P_SYS_SOC0_AC = d[_DC.P_SYS_SOC0_AC]
+    _P_SYS_SOC0_DC = d[_DC.P_SYS_SOC0_DC]
     _P_PV2AC_min = _PV2AC_c_in
 
     # Capacity of the battery, conversion from kWh to Wh
@@ -977,22 +1359,38 @@ def batmod_dc(d, _dt, _soc0, _soc, _Pr, _Prpv,  _Ppv, _Ppv2bat_in0, _Ppv2bat_in,
     # First time step with regard to the dead time of the system control
     _tstart = np.maximum(2, 1 + _t_DEAD)
     _tend = int(_Pr.size)
-    _th = 0
     corr = 0.1
 
     # Check if the dead or settling time can be ignored and set flags accordingly
-    if _dt >= (3 * _t_CONSTANT) or _tend == 1:
+    if _dt >= (3 * _t_CONSTANT) or _tend == 1 and _t0 < 0:
         _tstart = 1
         T_DEAD = False
     else:
         T_DEAD = True
 
+    # Continue a previous chunk, the first _t0 time steps hold the history of the previous chunk
+    if _t0 >= 0:
+        _tstart = _t0 + 1
+
     if _dt >= _t_DEAD + 3 * _t_CONSTANT:
         SETTLING = False
     else:
         SETTLING = True
 
+    # Delay of the residual power and end of the run of time steps that is skipped
+    _lag = _t_DEAD if T_DEAD else 0
+    _tskip = 0
+
     for t in range(_tstart - 1, _tend):
+        # Time step already filled in by a skipped run
+        if t < _tskip:
+            continue
+
+        # State of the previous time step
+        soc0 = _soc0
+        th = _th
+        idle = False
+
         # Energy content of the battery in the previous time step
         E_b0 = _soc0 * _E_BAT
 
@@ -1136,6 +1534,7 @@ def batmod_dc(d, _dt, _soc0, _soc, _Pr, _Prpv,  _Ppv, _Ppv2bat_in0, _Ppv2bat_in,
             # DC and AC power consumption of the PV-battery inverter
             P_bat = -np.maximum(0, _P_SYS_SOC0_DC)
             P_pvbs = -_P_SYS_SOC0_AC
+            idle = P_rpv <= 0
 
         elif P_bat == 0 and P_pvbs > 0 and _soc0 > 0:  # Standby mode in fully charged state
 
@@ -1166,139 +1565,156 @@ def batmod_dc(d, _dt, _soc0, _soc, _Pr, _Prpv,  _Ppv, _Ppv2bat_in0, _Ppv2bat_in,
         else:
             _th = False
 
-    return _Ppv2ac_out, _Ppv2bat_in, _Ppv2bat_in0, _Pbat2ac_out, _Pbat2ac_out0, _Ppvbs, _Pbat, _soc, _soc0
-
-
-@nb.jit(nopython=True)
-def batmod_dc_ideal(d, _dt, _soc0, _soc, _Pr, _Pbat):
-
-    _E_BAT = d[0]
-
-    for t in range(_Pr.size):
-        # Energy content of the battery in the previous time step
-        E_b0 = _soc0 * _E_BAT * 1000
-
-        P_bat = _Pr[t]
-
-        if P_bat > 0 and _soc0 < 1:  # Battery charging
-            # Change the energy content of the battery
-            E_b = E_b0 + P_bat * _dt / 3600
-
-        elif P_bat < 0 and _soc0 > 0:  # Battery discharging
-            # Change the energy content of the battery
-            E_b = E_b0 + P_bat * _dt / 3600
-
-        else:  # Neither charging nor discharging of the battery
-            P_bat = 0
-            E_b = E_b0
-
-        _Pbat[t] = P_bat
+        # In standby mode in discharged state every following time step without residual power
+        # of the PV-system and without AC output of the PV2AC conversion pathway ends in the
+        # standby mode again. If the state of the system did not change, these time steps
+        # repeat the current one.
+        if _skip and idle and _soc0 == soc0 and _th == th:
+            r = t + 1
+            while r < _tend and _Prpv[r - _lag] <= 0 and _Ppv2ac_out[r] == 0:
+                r += 1
 
-        _soc0 = E_b / (_E_BAT * 1000)
-        _soc[t] = _soc0
+            _Ppvbs[t + 1:r] = _Ppvbs[t]
+            _Pbat[t + 1:r] = _Pbat[t]
+            _soc[t + 1:r] = _soc[t]
+            _tskip = r
 
-    return _Pbat, _soc, _soc0
+    return _Ppv2ac_out, _Ppv2bat_in, _Ppv2bat_in0, _Pbat2ac_out, _Pbat2ac_out0, _Ppvbs, _Pbat, _soc, _soc0, _th
 
 
-@nb.jit(nopython=True)
-def batmod_pv(d, _dt, _soc0, _soc, _Ppv, _Pac, _Ppv2bat_in0, _Ppv2bat_in, _Ppv2ac_out, _Pbat2pv_out0, _Pbat2pv_out, _Ppvbs, _Pbat):
-    """Performance simulation function for PV-coupled battery systems
+@nb.jit([SIGNATURES['batmod_dc'], SIGNATURES_SINGLE['batmod_dc']], nopython=True, cache=True)
+def batmod_dc(d, _dt, _soc0, _soc, _Pr, _Prpv,  _Ppv, _Ppv2bat_in0, _Ppv2bat_in, _Pbat2ac_out0, _Pbat2ac_out, _Ppv2ac_out, _Ppvbs, _Pbat):
+    """Performance simulation function for DC-coupled battery systems
 
     :param d: array containing parameters
     :type d: numpy array
-
     :param dt: time step width
     :type dt: integer
-
-    :param soc0: state of charge of the battery in the previous time step
+    :param soc0: state of charge in the previous time step
     :type soc0: float
-
-    :param soc: state of charge of the battery
-    :type soc: numpy array
-
     :param Pr: residual power
     :type Pr: numpy array
-
+    :param Prpv: residual power of the PV-system
+    :type Prpv: numpy array
     :param Ppv: PV-power
     :type Ppv: numpy array
-
-    :param Pac: AC output power of the PV inverter
-    :type Pac: numpy array
-
-    :param Ppv2bat_in: AC input power of the battery system
-    :type Ppv2bat_in: numpy array
-
     :param Ppv2bat_in0: AC input power of the battery system in the previous time step
     :type Ppv2bat_in0: float
-
-    :param Pbat2pv_out0: AC output power of the battery system in the previous time step
-    :type Pbat2pv_out0: float
-
-    :param Pbat2pv_out: AC output power of the battery system
-    :type Pbat2pv_out: numpy array
-
+    :param Ppv2bat_in: AC input power of the battery system
+    :type Ppv2bat_in: numpy array
+    :param Pbat2ac_out0: AC output power of the battery system in the previous time step
+    :type Pbat2ac_out0: float
+    :param Pbat2ac_out: AC output power of the battery system
+    :type Pbat2ac_out: numpy array
+    :param Ppv2ac_out0: AC output power of the PV inverter in the previous time step
+    :type Ppv2ac_out0: float
+    :param Ppv2ac_out: AC output power of the PV inverter
+    :type Ppv2ac_out: numpy array
     :param Ppvbs: AC power from the PV system to the battery system
     :type Ppvbs: numpy array
-
     :param Pbat: DC power of the battery
     :type Pbat: float
     """
+    _Ppv2ac_out, _Ppv2bat_in, _Ppv2bat_in0, _Pbat2ac_out, _Pbat2ac_out0, _Ppvbs, _Pbat, _soc, _soc0, _ = batmod_dc_chunk(d, _dt, _soc0, _soc, _Pr, _Prpv, _Ppv, _Ppv2bat_in0, _Ppv2bat_in, _Pbat2ac_out0, _Pbat2ac_out, _Ppv2ac_out, _Ppvbs, _Pbat, False, -1, False)
 
-    # Initialization of particular variables
+    return _Ppv2ac_out, _Ppv2bat_in, _Ppv2bat_in0, _Pbat2ac_out, _Pbat2ac_out0, _Ppvbs, _Pbat, _soc, _soc0
 
-    _E_BAT = d[0]
-    _P_PV2AC_in = d[1]
-    _P_PV2AC_out = d[2]
-    _P_PV2BAT_in = d[3]
-    _P_BAT2PV_out = d[4]
-    _PV2AC_a_in = d[5]
-    _PV2AC_b_in = d[6]
-    _PV2AC_c_in = d[7]
-    _PV2BAT_a_in = d[8]
-    _PV2BAT_b_in = d[9]
-    _PV2BAT_c_in = d[10]
-    _PV2AC_a_out = d[11]
-    _PV2AC_b_out = d[12]
-    _PV2AC_c_out = d[13]
-    _BAT2PV_a_out = d[14]
-    _BAT2PV_b_out = d[15]
-    _BAT2PV_c_out = d[16]
-    _eta_BAT = d[17]
-    _SOC_h = d[18]
-    _P_PV2BAT_DEV = d[19]
-    _P_BAT2AC_DEV = d[20]
-    _P_SYS_SOC1_DC = d[21]
-    _P_SYS_SOC0_AC = d[22]
-    _P_SYS_SOC0_DC = d[23]
-    _t_DEAD = int(round(d[24]))
-    _t_CONSTANT = d[25]
 
-    # Correction factor to avoid over charge and discharge the battery
-    corr = 0.1
+@nb.jit([SIGNATURES['batmod_dc_ideal'], SIGNATURES_SINGLE['batmod_dc_ideal']], nopython=True, cache=True)
+def batmod_dc_ideal(d, _dt, _soc0, _soc, _Pr, _Pbat):
+    """Lossless battery model for DC-coupled systems, see :func:`batmod_ideal`
 
-    _P_PV2BAT_min = _PV2BAT_c_in  # Minimum DC charging power
-    _P_BAT2PV_min = _BAT2PV_c_out  # Minimum DC discharging power
+    :param d: array containing parameters
+    :type d: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge in the previous time step
+    :type soc0: float
+    :param soc: state of charge
+    :type soc: numpy array
+    :param Pr: residual power
+    :type Pr: numpy array
+    :param Pbat: DC-power of the battery
+    :type Pbat: numpy array
+    """
+    return batmod_ideal(d[_DC.E_BAT], _dt, _soc0, _soc, _Pr, _Pbat)
 
-    # Initialization of particular variables
+
+@nb.jit([SIGNATURES['batmod_pv_chunk'], SIGNATURES_SINGLE['batmod_pv_chunk']], nopython=True, cache=True)
+def batmod_pv_chunk(d, _dt, _soc0, _soc, _Ppv, _Pac, _Ppv2bat_in0, _Ppv2bat_in, _Ppv2ac_out, _Pbat2pv_out0, _Pbat2pv_out, _Ppvbs, _Pbat, _th, _t0):
+    """Performance simulation function for PV-coupled battery systems that continues a previous run
+
+    Takes the same arguments as :func:`batmod_pv` plus the state of the hysteresis threshold
+    and the start index of the chunk. With _t0 < 0 the simulation starts like :func:`batmod_pv`.
+    Otherwise the first _t0 entries of the input and output arrays hold the last time steps
+    of the previous chunk (dead time history) and the simulation starts at index _t0.
+
+    :param th: hysteresis threshold for the recharging of the battery in the previous time step
+    :type th: bool
+    :param t0: index of the first time step of the chunk or -1 for the first chunk
+    :type t0: integer
+    :return: results of :func:`batmod_pv` and the hysteresis threshold of the last time step
+    :rtype: tuple
+    """
+
+    # Initialization of particular variables
+
+    _E_BAT = d[_PV.E_BAT]
+    _P_PV2AC_in = d[_PV.P_PV2AC_in]
+    _P_PV2AC_out = d[_PV.P_PV2AC_out]
+    _P_PV2BAT_in = d[_PV.P_PV2BAT_in]
+    _P_BAT2PV_out = d[_PV.P_BAT2PV_out]
+    _PV2AC_a_in = d[_PV.PV2AC_a_in]
+    _PV2AC_b_in = d[_PV.PV2AC_b_in]
+    _PV2AC_c_in = d[_PV.PV2AC_c_in]
+    _PV2BAT_a_in = d[_PV.PV2BAT_a_in]
+    _PV2BAT_b_in = d[_PV.PV2BAT_b_in]
+    _PV2BAT_c_in = d[_PV.PV2BAT_c_in]
+    _PV2AC_a_out = d[_PV.PV2AC_a_out]
+    _PV2AC_b_out = d[_PV.PV2AC_b_out]
+    _PV2AC_c_out = d[_PV.PV2AC_c_out]
+    _BAT2PV_a_out = d[_PV.BAT2PV_a_out]
+    _BAT2PV_b_out = d[_PV.BAT2PV_b_out]
+    _BAT2PV_c_out = d[_PV.BAT2PV_c_out]
+    _eta_BAT = d[_PV.eta_BAT]
+    _SOC_h = d[_PV.SOC_h]
+    _P_PV2BAT_DEV = d[_PV.P_PV2BAT_DEV]
+    _P_BAT2AC_DEV = d[_PV.P_BAT2AC_DEV]
+    _P_SYS_SOC1_DC = d[_PV.P_SYS_SOC1_DC]
+    _P_SYS_SOC0_AC = d[_PV.P_SYS_SOC0_AC]
+    _P_SYS_SOC0_DC = d[_PV.P_SYS_SOC0_DC]
+    _t_DEAD = int(round(d[_PV.t_DEAD]))
+    _t_CONSTANT = d[_PV.t_CONSTANT]
+
+    # Correction factor to avoid over charge and discharge the battery
+    corr = 0.1
+
+    _P_PV2BAT_min = _PV2BAT_c_in  # Minimum DC charging power
+    _P_BAT2PV_min = _BAT2PV_c_out  # Minimum DC discharging power
+
+    # Initialization of particular variables
     _tde = _t_CONSTANT > 0  # Binary variable to activate the first-order time delay element
     # Factor of the first-order time delay element
     _ftde = 1 - np.exp(-_dt / _t_CONSTANT)
     # First time step with regard to the dead time of the system control
     _tstart = np.maximum(2, 1 + _t_DEAD)
     _tend = int(_Ppv.size)
-    _th = 0
 
     _E_BAT *= 1000  # Conversion from W to kW
 
     _eta_BAT /= 100
 
     # Check if the dead or settling time can be ignored and set flags accordingly
-    if _dt >= (3 * _t_CONSTANT) or _tend == 1:
+    if _dt >= (3 * _t_CONSTANT) or _tend == 1 and _t0 < 0:
         _tstart = 1
         T_DEAD = False
     else:
         T_DEAD = True
 
+    # Continue a previous chunk, the first _t0 time steps hold the history of the previous chunk
+    if _t0 >= 0:
+        _tstart = _t0 + 1
+
     if _dt >= _t_DEAD + 3 * _t_CONSTANT:
         SETTLING = False
     else:
@@ -1503,567 +1919,1596 @@ def batmod_pv(d, _dt, _soc0, _soc, _Ppv, _Pac, _Ppv2bat_in0, _Ppv2bat_in, _Ppv2a
         else:
             _th = False
 
-    return _soc, _soc0, _Ppv, _Ppvbs, _Pbat, _Ppv2ac_out, _Pbat2pv_out, _Ppv2bat_in
+    return _soc, _soc0, _Ppv, _Ppvbs, _Pbat, _Ppv2ac_out, _Pbat2pv_out, _Ppv2bat_in, _th
 
 
-def bat_res_mod(_parameter, _Pl, _Ppv, _Pbat, _dt, *args):
-    """Function for calculating energy sums
+@nb.jit([SIGNATURES['batmod_pv'], SIGNATURES_SINGLE['batmod_pv']], nopython=True, cache=True)
+def batmod_pv(d, _dt, _soc0, _soc, _Ppv, _Pac, _Ppv2bat_in0, _Ppv2bat_in, _Ppv2ac_out, _Pbat2pv_out0, _Pbat2pv_out, _Ppvbs, _Pbat):
+    """Performance simulation function for PV-coupled battery systems
 
-    :param _parameter: parameter of the system
-    :type _parameter: dict
-    :param _Pl: load power
-    :type _Pl: numpy array
-    :param _Ppv: output power of the PV generator
-    :type _Ppv: numpy array
-    :param _Pbat: DC power of the battery
-    :type _Pbat: numpy array
-    :param _dt: time step width
-    :type _dt: integer
-    :return: energy sums
-    :rtype: dict
+    :param d: array containing parameters
+    :type d: numpy array
+
+    :param dt: time step width
+    :type dt: integer
+
+    :param soc0: state of charge of the battery in the previous time step
+    :type soc0: float
+
+    :param soc: state of charge of the battery
+    :type soc: numpy array
+
+    :param Pr: residual power
+    :type Pr: numpy array
+
+    :param Ppv: PV-power
+    :type Ppv: numpy array
+
+    :param Pac: AC output power of the PV inverter
+    :type Pac: numpy array
+
+    :param Ppv2bat_in: AC input power of the battery system
+    :type Ppv2bat_in: numpy array
+
+    :param Ppv2bat_in0: AC input power of the battery system in the previous time step
+    :type Ppv2bat_in0: float
+
+    :param Pbat2pv_out0: AC output power of the battery system in the previous time step
+    :type Pbat2pv_out0: float
+
+    :param Pbat2pv_out: AC output power of the battery system
+    :type Pbat2pv_out: numpy array
+
+    :param Ppvbs: AC power from the PV system to the battery system
+    :type Ppvbs: numpy array
+
+    :param Pbat: DC power of the battery
+    :type Pbat: float
     """
-    _E = dict()
+    _soc, _soc0, _Ppv, _Ppvbs, _Pbat, _Ppv2ac_out, _Pbat2pv_out, _Ppv2bat_in, _ = batmod_pv_chunk(d, _dt, _soc0, _soc, _Ppv, _Pac, _Ppv2bat_in0, _Ppv2bat_in, _Ppv2ac_out, _Pbat2pv_out0, _Pbat2pv_out, _Ppvbs, _Pbat, False, -1)
 
-    if _parameter['Top'] == 'AC':  # AC-coupled systems
+    return _soc, _soc0, _Ppv, _Ppvbs, _Pbat, _Ppv2ac_out, _Pbat2pv_out, _Ppv2bat_in
 
-        _Ppvs = args[0]  # AC output power of the PV system
-        _Pbs = args[1]  # AC power of the battery system
-        # Additional power consumption of the other system components
-        _Pperi = args[2]
 
-    elif _parameter['Top'] == 'DC' or _parameter['Top'] == 'PV':  # DC- and PV-coupled systems
+@nb.jit(nopython=True, cache=True)
+def _acc(S, i, x):
+    """Adds the absolute value of x to the compensated sum i of the accumulators S
+    """
+    x = abs(x)
+    s = S[0, i]
+    t = s + x
 
-        _Ppv2ac = args[0]  # AC output power of the PV2AC conversion pathway
-        _Ppv2bat_in = args[1]  # Input power of the PV2BAT conversion pathway
-        _Ppvbs = args[2]  # AC power of the PV-battery system
-        # Additional power consumption of the other system components
-        _Pperi = args[3]
+    # Neumaier summation, S[1] collects the rounding errors of S[0]
+    if s >= x:
+        S[1, i] += (s - t) + x
+    else:
+        S[1, i] += (x - t) + s
 
-        _Ppv2ac_in = _Ppv - _Ppv2bat_in  # Input power of the PV2AC conversion pathway
+    S[0, i] = t
 
-    # Total load including the power consumption of the other system components
-    _Plt = _Pl + _Pperi
-    # DC input power of the battery (charged)
-    _Pbatin = np.maximum(0, _Pbat)
-    # DC output power of the battery (discharged)
-    _Pbatout = np.minimum(0, _Pbat)
-    # Maximum PV feed-in power
-    _P_ac2g_max = _parameter['p_ac2g_max'] * _parameter['P_PV'] * 1000
 
-    if _parameter['Top'] == 'AC':  # AC-coupled systems
+@nb.jit(nopython=True, cache=True)
+def _pv2ac_in(P_pv2ac_out, p):
+    """DC input power of the PV2AC conversion pathway (PV inverter) for a given AC output power,
+    used to calculate back the DC power of the PV generator in case of curtailment
 
+    :param P_pv2ac_out: AC output power of the PV2AC conversion pathway
+    :type P_pv2ac_out: float
+    :param p: array containing the parameters of the PV inverter, see :func:`transform_dict_to_pvinv_array`
+    :type p: numpy array
+    :return: DC input power of the PV2AC conversion pathway
+    :rtype: float
+    """
+    # Normalized AC output power of the PV2AC conversion pathway, the fields of the PV2AC
+    # conversion pathway have the same positions in the records of AC- and DC-coupled systems
+    ppv2ac = P_pv2ac_out / p[_PVINV_DC.P_PV2AC_out] / 1000
+
+    return P_pv2ac_out + (p[_PVINV_DC.PV2AC_a_out] * ppv2ac ** 2 + p[_PVINV_DC.PV2AC_b_out] * ppv2ac + p[_PVINV_DC.PV2AC_c_out])
+
+
+@nb.jit([SIGNATURES['energy_sums_ac'], SIGNATURES_SINGLE['energy_sums_ac']], nopython=True, cache=True)
+def energy_sums_ac(S, _Pl, _Ppv, _Pbat, _Ppvs, _Pbs, _Pperi, p, _P_ac2g_max):
+    """Accumulates the energy sums of AC-coupled systems in a single pass
+
+    Computes the power flows of :func:`bat_res_mod` time step by time step, including the
+    curtailment of PV power, and adds their absolute values to the accumulators. As in
+    :func:`bat_res_mod` the DC power of the PV generator is corrected for the curtailment
+    in place.
+
+    :param S: compensated sums in the order of E_KEYS_AC (2 x keys)
+    :type S: numpy array
+    :param Pl: load power
+    :type Pl: numpy array
+    :param Ppv: DC power output of the PV generator
+    :type Ppv: numpy array
+    :param Pbat: DC power of the battery
+    :type Pbat: numpy array
+    :param Ppvs: AC power output of the PV inverter
+    :type Ppvs: numpy array
+    :param Pbs: AC power of the battery system
+    :type Pbs: numpy array
+    :param Pperi: Additional power consumption of other system components
+    :type Pperi: numpy array
+    :param p: array containing the parameters of the PV inverter, see :func:`transform_dict_to_pvinv_array`
+    :type p: numpy array
+    :param P_ac2g_max: maximum PV feed-in power in W
+    :type P_ac2g_max: float
+    :return: accumulators
+    :rtype: numpy array
+    """
+    for t in range(_Pl.size):
+        # Total load including the power consumption of the other system components
+        P_lt = _Pl[t] + _Pperi[t]
         # Residual power without curtailment
-        _Pr = _Ppvs - _Plt
-        # AC input power of the battery system
-        _Pac2bs = np.maximum(0, _Pbs)
-        # AC output power of the battery system
-        _Pbs2ac = np.minimum(0, _Pbs)
-        # Negative residual power (residual load demand)
-        _Prn = np.minimum(0, _Pr)
-        # Positive residual power (surplus PV power)
-        _Prp = np.maximum(0, _Pr)
-        # Direct use of PV power by the load
-        _Ppvs2l = np.minimum(_Ppvs, _Plt)
-        # PV charging power
-        _Ppvs2bs = np.minimum(_Prp, _Pac2bs)
+        P_r = _Ppvs[t] - P_lt
+        # AC input and output power of the battery system
+        P_ac2bs = np.maximum(0, _Pbs[t])
+        P_bs2ac = np.minimum(0, _Pbs[t])
+        # Negative and positive residual power
+        P_rn = np.minimum(0, P_r)
+        P_rp = np.maximum(0, P_r)
         # Grid charging power
-        _Pg2bs = np.maximum(_Pac2bs - _Prp, 0)
+        P_g2bs = np.maximum(P_ac2bs - P_rp, 0)
         # Grid supply power of the load
-        _Pg2l = np.minimum(_Prn - _Pbs2ac, 0)
-        # Battery supply power of the load
-        _Pbs2l = np.maximum(_Prn, _Pbs2ac)
+        P_g2l = np.minimum(P_rn - P_bs2ac, 0)
         # Battery feed-in power
-        _Pbs2g = np.minimum(_Pbs2ac - _Prn, 0)
+        P_bs2g = np.minimum(P_bs2ac - P_rn, 0)
         # PV feed-in power including curtailment
-        _Ppvs2g = np.minimum(np.maximum(_Prp - _Pac2bs, 0), _P_ac2g_max)
-        # Power demand from the grid
-        _Pg2ac = _Pg2l - _Pg2bs
-        # Feed-in power to the grid
-        _Pac2g = _Ppvs2g - _Pbs2g
-        # Grid power
-        _Pg = _Pac2g + _Pg2ac
+        P_pvs2g = np.minimum(np.maximum(P_rp - P_ac2bs, 0), _P_ac2g_max)
         # Curtailed PV power (AC output power)
-        _Pct = np.maximum(_Prp - _Pac2bs, 0) - _Ppvs2g
+        P_ct = np.maximum(P_rp - P_ac2bs, 0) - P_pvs2g
         # AC output power of the PV system including curtailment
-        _Ppvs = _Ppvs - _Pct
-        # Residual power including curtailment
-        _Pr = _Ppvs - _Plt
-        # Index for PV curtailment
-        _idx = np.where(_Pct > 0)[0]
-
-        for i in range(len(_idx)):
+        P_pvs = _Ppvs[t] - P_ct
 
-            _tct = _idx[i]
-            # Normalized output power of the PV inverter
-            _ppvinvout = _Ppvs[_tct] / _parameter['P_PV2AC_out'] / 1000
+        if P_ct > 0:
             # DC output power of the PV generator taking into account the
             # conversion and curtailment losses
-            _Ppv[_tct] = _Ppvs[_tct] + (_parameter['PV2AC_a_out'] * _ppvinvout **
-                                        2 + _parameter['PV2AC_b_out'] * _ppvinvout + _parameter['PV2AC_c_out'])
-
-    elif _parameter['Top'] == 'DC' or _parameter['Top'] == 'PV':  # DC- and PV-coupled systems
-
+            _Ppv[t] = _pv2ac_in(P_pvs, p)
+
+        _acc(S, 0, P_lt)
+        _acc(S, 1, _Ppv[t])
+        _acc(S, 2, np.maximum(0, _Pbat[t]))
+        _acc(S, 3, np.minimum(0, _Pbat[t]))
+        _acc(S, 4, P_pvs2g - P_bs2g)
+        _acc(S, 5, P_g2l - P_g2bs)
+        _acc(S, 6, P_g2l)
+        _acc(S, 7, _Pperi[t])
+        _acc(S, 8, P_ct)
+        _acc(S, 9, P_pvs)
+        _acc(S, 10, P_ac2bs)
+        _acc(S, 11, P_bs2ac)
+        _acc(S, 12, np.minimum(_Ppvs[t], P_lt))
+        _acc(S, 13, np.minimum(P_rp, P_ac2bs))
+        _acc(S, 14, P_g2bs)
+        _acc(S, 15, P_pvs2g)
+        _acc(S, 16, np.maximum(P_rn, P_bs2ac))
+        _acc(S, 17, P_bs2g)
+
+    return S
+
+
+@nb.jit([SIGNATURES['energy_sums_dc'], SIGNATURES_SINGLE['energy_sums_dc']], nopython=True, cache=True)
+def energy_sums_dc(S, _Pl, _Ppv, _Pbat, _Ppv2ac, _Ppv2bat_in, _Ppvbs, _Pperi, p, _P_ac2g_max):
+    """Accumulates the energy sums of DC- and PV-coupled systems in a single pass
+
+    Computes the power flows of :func:`bat_res_mod` time step by time step, including the
+    curtailment of PV power, and adds their absolute values to the accumulators. The
+    additional last accumulator holds the DC power of the PV generator recomputed from
+    the PV2AC input power, which :func:`bat_res_mod` reports if any PV power is curtailed.
+
+    :param S: compensated sums in the order of E_KEYS_DC and the recomputed PV power (2 x keys + 1)
+    :type S: numpy array
+    :param Pl: load power
+    :type Pl: numpy array
+    :param Ppv: DC power output of the PV generator
+    :type Ppv: numpy array
+    :param Pbat: DC power of the battery
+    :type Pbat: numpy array
+    :param Ppv2ac: AC output power of the PV2AC conversion pathway
+    :type Ppv2ac: numpy array
+    :param Ppv2bat_in: Input power of the PV2BAT conversion pathway
+    :type Ppv2bat_in: numpy array
+    :param Ppvbs: AC power of the PV-battery system
+    :type Ppvbs: numpy array
+    :param Pperi: Additional power consumption of other system components
+    :type Pperi: numpy array
+    :param p: array containing the parameters of the PV2AC conversion pathway, see :func:`transform_dict_to_pvinv_array`
+    :type p: numpy array
+    :param P_ac2g_max: maximum PV feed-in power in W
+    :type P_ac2g_max: float
+    :return: accumulators
+    :rtype: numpy array
+    """
+    for t in range(_Pl.size):
+        # Total load including the power consumption of the other system components
+        P_lt = _Pl[t] + _Pperi[t]
+        # Input power of the PV2AC conversion pathway
+        P_pv2ac_in = _Ppv[t] - _Ppv2bat_in[t]
         # Grid power demand of the PV-battery system
-        _Pg2pvbs = np.minimum(0, _Ppvbs)
-        # AC input power of the PV-battery system
-        _Pac2pvbs = _Pg2pvbs
-        # AC output power of the PV-battery system
-        _Ppvbs2ac = np.maximum(0, _Ppvbs)
+        P_g2pvbs = np.minimum(0, _Ppvbs[t])
         # Load supply power by the PV-battery system
-        _Ppvbs2l = np.minimum(_Plt, _Ppvbs2ac)
-        # Load supply power by the grid
-        _Pg2l = _Plt - _Ppvbs2l
+        P_pvbs2l = np.minimum(P_lt, np.maximum(0, _Ppvbs[t]))
         # Direct use of PV power by the load
-        _Ppv2l = np.minimum(_Plt, _Ppv2ac)
+        P_pv2l = np.minimum(P_lt, _Ppv2ac[t])
         # PV feed-in power including curtailment
-        _Ppv2g = np.minimum(_Ppv2ac - _Ppv2l, _P_ac2g_max)
+        P_pv2g = np.minimum(_Ppv2ac[t] - P_pv2l, _P_ac2g_max)
         # Curtailed PV power (AC output power)
-        _Pct = _Ppv2ac - _Ppv2l - _Ppv2g
-
-        if np.sum(_Pct) > 0:
-            # Power of the PV-battery system including curtailment
-            _Ppvbs = _Ppvbs - _Pct
-            # AC output power of the PV-battery system including curtailment
-            _Ppvbs2ac = np.maximum(0, _Ppvbs)
-            # AC output power of the PV2AC conversion pathway including curtailment
-            _Ppv2ac = _Ppv2ac - _Pct
-            # Index for PV curtailment
-            _idx = np.where(_Pct > 0)[0]
-
-            for i in range(len(_idx)):
-
-                _tct = _idx[i]
-                # Specific AC output power of the PV2AC conversion pathway
-                _ppv2ac = _Ppv2ac[_tct] / _parameter['P_PV2AC_out'] / 1000
-                # DC input power of the PV2AC conversion pathway including curtailment
-                _Ppv2ac_in[_tct] = _Ppv2ac[_tct] + (_parameter['PV2AC_a_out'] * _ppv2ac **
-                                                    2 + _parameter['PV2AC_b_out'] * _ppv2ac + _parameter['PV2AC_c_out'])
-
-            # DC output power of the PV generator including curtailment
-            _Ppv = _Ppv2ac_in + _Ppv2bat_in
-
-        # Grid power including curtailment
-        _Pg = _Ppvbs-_Plt
-        # Feed-in power to the grid including curtailment
-        _Pac2g = np.maximum(0, _Pg)
-        # Power demand from the grid
-        _Pg2ac = np.minimum(0, _Pg)
-
-    # Energy sums in MWH
-
-    # Electrical demand including the energy consumption of the other system components
-    _E['El'] = np.sum(np.abs(_Plt)) * _dt / 3.6e9
-    # DC output of the PV generator including curtailment
-    _E['Epv'] = np.sum(np.abs(_Ppv)) * _dt / 3.6e9
-    # DC input of the battery (charged)
-    _E['Ebatin'] = np.sum(np.abs(_Pbatin)) * _dt / 3.6e9
-    # DC output of the battery (discharged)
-    _E['Ebatout'] = np.sum(np.abs(_Pbatout)) * _dt / 3.6e9
-    # Grid feed-in
-    _E['Eac2g'] = np.sum(np.abs(_Pac2g)) * _dt / 3.6e9
-    # Grid demand
-    _E['Eg2ac'] = np.sum(np.abs(_Pg2ac)) * _dt / 3.6e9
-    # Load supply by the grid
-    _E['Eg2l'] = np.sum(np.abs(_Pg2l)) * _dt / 3.6e9
-    # Demand of the other system components
-    _E['Eperi'] = np.sum(np.abs(_Pperi)) * _dt / 3.6e9
-    # Curtailed PV energy
-    _E['Ect'] = np.sum(np.abs(_Pct)) * _dt / 3.6e9
-
-    if _parameter['Top'] == 'AC':  # AC-coupled systems
-
-        # AC output of the PV system including curtailment
-        _E['Epvs'] = np.sum(np.abs(_Ppvs)) * _dt / 3.6e9
-        # AC input of the battery system
-        _E['Eac2bs'] = np.sum(np.abs(_Pac2bs)) * _dt / 3.6e9
-        # AC output of the battery system
-        _E['Ebs2ac'] = np.sum(np.abs(_Pbs2ac)) * _dt / 3.6e9
-        # Direct use of PV energy
-        _E['Epvs2l'] = np.sum(np.abs(_Ppvs2l)) * _dt / 3.6e9
-        # PV charging
-        _E['Epvs2bs'] = np.sum(np.abs(_Ppvs2bs)) * _dt / 3.6e9
-        # Grid charging
-        _E['Eg2bs'] = np.sum(np.abs(_Pg2bs)) * _dt / 3.6e9
-        # PV feed-in
-        _E['Epvs2g'] = np.sum(np.abs(_Ppvs2g)) * _dt / 3.6e9
-        # Load supply by the battery system
-        _E['Ebs2l'] = np.sum(np.abs(_Pbs2l)) * _dt / 3.6e9
-        # Battery feed-in
-        _E['Ebs2g'] = np.sum(np.abs(_Pbs2g)) * _dt / 3.6e9
-
-    elif _parameter['Top'] == 'DC' or _parameter['Top'] == 'PV':  # DC- and PV-coupled systems
-
-        # Grid demand of the PV-battery system
-        _E['Eg2pvbs'] = np.sum(np.abs(_Pg2pvbs)) * _dt / 3.6e9
-        # AC input of the PV-battery system
-        _E['Eac2pvbs'] = np.sum(np.abs(_Pac2pvbs)) * _dt / 3.6e9
-        # AC output of the PV-battery system
-        _E['Epvbs2ac'] = np.sum(np.abs(_Ppvbs2ac)) * _dt / 3.6e9
-        # Load supply by the PV-battery system
-        _E['Epvbs2l'] = np.sum(np.abs(_Ppvbs2l)) * _dt / 3.6e9
-
-    return _E
-
-
-def bat_res_mod_ideal(_parameter, _Pl, _Ppv, _Pbat, _dt, *args):
-    E = dict()  # Dictionary to store energy sums
+        P_ct = _Ppv2ac[t] - P_pv2l - P_pv2g
+        # Power of the PV-battery system including curtailment
+        P_pvbs = _Ppvbs[t] - P_ct
 
-    if _parameter['Top'] == 'AC':
-        Ppvs = args[0]  # AC output power of the PV system
-        Pbs = args[1]  # AC power of the battery system
-        Pperi = args[2]  # Additional power consumption of the other system components
-
-    elif _parameter['Top'] == 'DC':
-        Ppv2ac = args[0]
-        Ppv2bat_in = args[1]
-        Ppvbs = args[2]
-        Pperi = args[3]
-        Ppv2ac_in = _Ppv - Ppv2bat_in
-
-    # Additional power consumption of the other system components
-    Pperi = np.zeros_like(_Ppv)
-    # Total load including the power consumption of the other system components
-    Plt = _Pl
-    # DC input power of the battery (charged)
-    Pbatin = np.maximum(0, _Pbat)
-    # DC output power of the battery (discharged)
-    Pbatout = np.minimum(0, _Pbat)
+        if P_ct > 0:
+            # DC input power of the PV2AC conversion pathway including curtailment
+            P_pv2ac_in = _pv2ac_in(_Ppv2ac[t] - P_ct, p)
 
-    if _parameter['Top'] == 'AC':
+        # Grid power including curtailment
+        P_g = P_pvbs - P_lt
+
+        _acc(S, 0, P_lt)
+        _acc(S, 1, _Ppv[t])
+        _acc(S, 2, np.maximum(0, _Pbat[t]))
+        _acc(S, 3, np.minimum(0, _Pbat[t]))
+        _acc(S, 4, np.maximum(0, P_g))
+        _acc(S, 5, np.minimum(0, P_g))
+        _acc(S, 6, P_lt - P_pvbs2l)
+        _acc(S, 7, _Pperi[t])
+        _acc(S, 8, P_ct)
+        _acc(S, 9, P_g2pvbs)
+        _acc(S, 10, P_g2pvbs)
+        _acc(S, 11, np.maximum(0, P_pvbs))
+        _acc(S, 12, P_pvbs2l)
+        _acc(S, 13, P_pv2ac_in + _Ppv2bat_in[t])
+
+    return S
+
+
+@nb.jit([SIGNATURES['energy_sums_ideal_ac'], SIGNATURES_SINGLE['energy_sums_ideal_ac']], nopython=True, cache=True)
+def energy_sums_ideal_ac(S, _Pl, _Ppv, _Pbat, _Ppvs, _Pbs):
+    """Accumulates the energy sums of the lossless AC-coupled system in a single pass,
+    see :func:`bat_res_mod_ideal`
+
+    :param S: compensated sums in the order of E_KEYS_AC (2 x keys)
+    :type S: numpy array
+    :param Pl: load power
+    :type Pl: numpy array
+    :param Ppv: DC power output of the PV generator
+    :type Ppv: numpy array
+    :param Pbat: DC power of the battery
+    :type Pbat: numpy array
+    :param Ppvs: AC power output of the PV system
+    :type Ppvs: numpy array
+    :param Pbs: AC power of the battery system
+    :type Pbs: numpy array
+    :return: accumulators
+    :rtype: numpy array
+    """
+    for t in range(_Pl.size):
         # Grid power
-        Pg = Ppvs - _Pl - Pbs
+        P_g = _Ppvs[t] - _Pl[t] - _Pbs[t]
         # Residual power
-        Pr = Ppvs - Plt
-        # AC input power of the battery system
-        Pac2bs = np.maximum(0, Pbs)
-        # AC output power of the battery system
-        Pbs2ac = np.minimum(0, Pbs)
-        # Negative residual power (residual load demand)
-        Prn = np.minimum(0, Pr)
-        # Positive residual power (surplus PV power)
-        Prp = np.maximum(0, Pr)
-        # Direct use of PV power by the load
-        Ppvs2l = np.minimum(Ppvs, Plt)
-        # PV charging power
-        Ppvs2bs=np.minimum(Prp, Pac2bs)
-        # Grid charging power
-        Pg2bs=np.maximum(Pac2bs - Prp, 0)
-        # Grid supply power of the load
-        Pg2l=np.minimum(Prn - Pbs2ac, 0)
-        # Battery supply power of the load
-        Pbs2l=np.maximum(Prn, Pbs2ac)
-        # Battery feed-in power
-        Pbs2g=np.minimum(Pbs2ac - Prn, 0)
-        # PV feed-in power
-        Ppvs2g=np.maximum(Prp - Pac2bs, 0)
-
-    elif _parameter['Top'] == 'DC':
+        P_r = _Ppvs[t] - _Pl[t]
+        # AC input and output power of the battery system
+        P_ac2bs = np.maximum(0, _Pbs[t])
+        P_bs2ac = np.minimum(0, _Pbs[t])
+        # Negative and positive residual power
+        P_rn = np.minimum(0, P_r)
+        P_rp = np.maximum(0, P_r)
+
+        _acc(S, 0, _Pl[t])
+        _acc(S, 1, _Ppv[t])
+        _acc(S, 2, np.maximum(0, _Pbat[t]))
+        _acc(S, 3, np.minimum(0, _Pbat[t]))
+        _acc(S, 4, np.maximum(0, P_g))
+        _acc(S, 5, np.minimum(0, P_g))
+        _acc(S, 6, np.minimum(P_rn - P_bs2ac, 0))
+        _acc(S, 9, _Ppvs[t])
+        _acc(S, 10, P_ac2bs)
+        _acc(S, 11, P_bs2ac)
+        _acc(S, 12, np.minimum(_Ppvs[t], _Pl[t]))
+        _acc(S, 13, np.minimum(P_rp, P_ac2bs))
+        _acc(S, 14, np.maximum(P_ac2bs - P_rp, 0))
+        _acc(S, 15, np.maximum(P_rp - P_ac2bs, 0))
+        _acc(S, 16, np.maximum(P_rn, P_bs2ac))
+        _acc(S, 17, np.minimum(P_bs2ac - P_rn, 0))
+
+    return S
+
+
+@nb.jit([SIGNATURES['energy_sums_ideal_dc'], SIGNATURES_SINGLE['energy_sums_ideal_dc']], nopython=True, cache=True)
+def energy_sums_ideal_dc(S, _Pl, _Ppv, _Pbat, _Ppvbs):
+    """Accumulates the energy sums of the lossless DC-coupled system in a single pass,
+    see :func:`bat_res_mod_ideal`
+
+    :param S: compensated sums in the order of E_KEYS_DC (2 x keys)
+    :type S: numpy array
+    :param Pl: load power
+    :type Pl: numpy array
+    :param Ppv: DC power output of the PV generator
+    :type Ppv: numpy array
+    :param Pbat: DC power of the battery
+    :type Pbat: numpy array
+    :param Ppvbs: AC power of the PV-battery system
+    :type Ppvbs: numpy array
+    :return: accumulators
+    :rtype: numpy array
+    """
+    for t in range(_Pl.size):
         # Grid power
-        Pg = Ppvbs - _Pl
+        P_g = _Ppvbs[t] - _Pl[t]
         # Grid power demand of the PV-battery system
-        Pg2pvbs = np.minimum(0, Ppvbs)
-        # AC input power of the PV-battery system
-        Pac2pvbs = Pg2pvbs
+        P_g2pvbs = np.minimum(0, _Ppvbs[t])
         # AC output power of the PV-battery system
-        Ppvbs2ac = np.maximum(0, Ppvbs)
+        P_pvbs2ac = np.maximum(0, _Ppvbs[t])
         # Load supply power by the PV-battery system
-        Ppvbs2l = np.minimum(_Pl, Ppvbs2ac)
-        # Load supply power by the grid
-        Pg2l = (Plt - Ppvbs2l)
-
-    # Curtailed PV power (AC output power)
-    Pct = np.zeros_like(_Ppv)
-    # Power demand from the grid
-    Pg2ac = np.minimum(0, Pg)
-    # Feed-in power to the grid
-    Pac2g=np.maximum(0, Pg)
-
-    # Energy sums
-
-    # Electrical demand including the energy consumption of the other system components
-    E['El'] = np.sum(np.abs(Plt)) / 3.6e9
-    # DC output of the PV generator including curtailment
-    E['Epv'] = np.sum(np.abs(_Ppv)) / 3.6e9
-    # DC input of the battery (charged)
-    E['Ebatin'] = np.sum(np.abs(Pbatin)) / 3.6e9
-    # DC output of the battery (discharged)
-    E['Ebatout'] = np.sum(np.abs(Pbatout)) / 3.6e9
-    # Grid feed-in
-    E['Eac2g'] = np.sum(np.abs(Pac2g)) / 3.6e9
-    # Grid demand
-    E['Eg2ac'] = np.sum(np.abs(Pg2ac)) / 3.6e9
-    # Load supply by the grid
-    E['Eg2l'] = np.sum(np.abs(Pg2l)) / 3.6e9
-    # Demand of the other system components
-    E['Eperi'] = np.sum(np.abs(Pperi)) / 3.6e9
-    # Curtailed PV energy
-    E['Ect'] = np.sum(np.abs(Pct)) / 3.6e9
-
-    if _parameter['Top'] == 'AC':
+        P_pvbs2l = np.minimum(_Pl[t], P_pvbs2ac)
 
-        # AC output of the PV system including curtailment
-        E['Epvs']=np.sum(np.abs(Ppvs)) / 3.6e9
-        # AC input of the battery system
-        E['Eac2bs']=np.sum(np.abs(Pac2bs)) / 3.6e9
-        # AC output of the battery system
-        E['Ebs2ac']=np.sum(np.abs(Pbs2ac)) / 3.6e9
-        # Direct use of PV energy
-        E['Epvs2l']=np.sum(np.abs(Ppvs2l)) / 3.6e9
-        # PV charging
-        E['Epvs2bs']=np.sum(np.abs(Ppvs2bs)) / 3.6e9
-        # Grid charging
-        E['Eg2bs']=np.sum(np.abs(Pg2bs)) / 3.6e9
-        # PV feed-in
-        E['Epvs2g']=np.sum(np.abs(Ppvs2g)) / 3.6e9
-        # Load supply by the battery system
-        E['Ebs2l']=np.sum(np.abs(Pbs2l)) / 3.6e9
-        # Battery feed-in
-        E['Ebs2g']=np.sum(np.abs(Pbs2g)) / 3.6e9
+        _acc(S, 0, _Pl[t])
+        _acc(S, 1, _Ppv[t])
+        _acc(S, 2, np.maximum(0, _Pbat[t]))
+        _acc(S, 3, np.minimum(0, _Pbat[t]))
+        _acc(S, 4, np.maximum(0, P_g))
+        _acc(S, 5, np.minimum(0, P_g))
+        _acc(S, 6, _Pl[t] - P_pvbs2l)
+        _acc(S, 9, P_g2pvbs)
+        _acc(S, 10, P_g2pvbs)
+        _acc(S, 11, P_pvbs2ac)
+        _acc(S, 12, P_pvbs2l)
 
-    elif _parameter['Top'] == 'DC':
-        # Grid demand of the PV-battery system
-        E['Eg2pvbs'] = np.sum(np.abs(Pg2pvbs)) / 3.6e9
-        # AC input of the PV-battery system
-        E['Eac2pvbs'] = np.sum(np.abs(Pac2pvbs)) / 3.6e9
-        # AC output of the PV-battery system
-        E['Epvbs2ac'] = np.sum(np.abs(Ppvbs2ac)) / 3.6e9
-        # Load supply by the PV-battery system
-        E['Epvbs2l'] = np.sum(np.abs(Ppvbs2l)) / 3.6e9
-
-    return E
-
-
-def load_parameter(fname, col_name):
-    """Loads system parameter from excel file
-
-    :param fname: Path to the excel file
-    :type fname: string
-    :param col_name: Column to read data from
-    :type col_name: string
-    :return: Dictionary holding parameters from the Excel sheet
-    :rtype: dict
-    """
-    
-    wb = load_workbook(fname, data_only=True)
-    ws = wb['Data'] # Load Data sheet of excel file
+    return S
 
-    # read keys and values from Excel sheet
-    keys = (c.value for c in ws['E'][1:])
-    values = (c.value if c.value != 'ns' else None for c in ws[col_name][1:])
-    
-    parameter = dict(zip(keys, values))
 
-    # deletes entries where key is None
-    del parameter[None]
+@nb.jit(nopython=True, cache=True)
+def _buffer(X, n):
+    # Block buffer for a series that is not kept by the caller
+    return np.zeros(n if X.size == 0 else 0, X.dtype)
 
-    # Assign specific parameters
-    parameter['P_PV2AC_out_PVINV'] = ws[col_name][15].value
-    parameter['P_PV2AC_out'] = ws[col_name][24].value
-    parameter['P_AC2BAT_in_DCC'] = ws[col_name][25].value
-    parameter['P_AC2BAT_in'] = ws[col_name][26].value
-    parameter['P_BAT2AC_out'] = ws[col_name][27].value
-    parameter['P_BAT2AC_out_DCC'] = ws[col_name][28].value
 
-    # Set refrence case values to boolean
-    if parameter['ref_1'] == 'yes':
-        parameter['ref_1'] = True
-    elif parameter['ref_1'] == 'no':
-        parameter['ref_1'] = False
-    
-    if parameter['ref_2'] == 'yes':
-        parameter['ref_2'] = True
-    elif parameter['ref_2'] == 'no':
-        parameter['ref_2'] = False
+@nb.jit(nopython=True, cache=True)
+def _view(X, Xb, lo, end, n):
+    # Time steps lo to end of a kept series or the current block buffer
+    if X.size > 0:
+        return X[lo:end]
+    return Xb[:n]
 
-    # Specific parameters of DC-coupled systems
-    if parameter['Top'] == 'DC':
-        parameter['P_AC2BAT_in'] = parameter['P_AC2BAT_in_DCC'] # Nominal charging power (AC) in kW
-        parameter['P_BAT2AC_out'] = parameter['P_BAT2AC_out_DCC']
-    
-    # Specific parameters of PV inverters and AC-coupled systems
-    if parameter['Top'] == 'PVINV' or parameter['Top'] == 'AC' and parameter['P_PV2AC_out_PVINV'] is not None:
-        parameter['P_PV2AC_out'] = parameter['P_PV2AC_out_PVINV']
-    
-    # Specific parameters of PV-coupled systems
-    if parameter['Top'] == 'PV':
-        parameter['P_BAT2PV_in'] = parameter['P_BAT2AC_in']
-        parameter['P_BAT2AC_out'] = parameter['P_BAT2AC_out_DCC']
 
-    # replace 'ns', 'o' and 'c' entries to None
-    for key, value in parameter.items():
-        if value == 'ns' or value == 'o' or value == 'c' or value == ' ':
-            parameter[key] = None
+@nb.jit(nopython=True, cache=True)
+def _shift(Xb, n, h):
+    # Keep the last h time steps of the block as history of the next block
+    if Xb.size > 0:
+        for i in range(h):
+            Xb[i] = Xb[n - h + i]
+        Xb[h:] = 0
 
-    # Convert to kW
-    convert_to_kw = ['P_PV2AC_in', 'P_PV2AC_out_PVINV','P_PV2AC_out','P_AC2BAT_in_DCC','P_AC2BAT_in','P_BAT2AC_out',
-             'P_BAT2AC_out_DCC','P_PV2BAT_in','P_BAT2PV_out','P_PV2BAT_out','P_BAT2AC_in']
 
-    for par in convert_to_kw:
-        if parameter[par]:
-            parameter[par] /= 1000
-        
-    return parameter
+@nb.jit([SIGNATURES['batmod_ac_fused'], SIGNATURES_SINGLE['batmod_ac_fused']], nopython=True, cache=True)
+def batmod_ac_fused(d, p, _dt, _soc0, _ppv, _pl, _pvmod, _Ppv, _Ppvs, _Pperi, _Pbs, _Pbat, _soc, _S, _P_ac2g_max, _skip):
+    """Performance simulation function for AC-coupled systems including the PV inverter
 
+    Computes the PV inverter losses and the residual power of :func:`max_self_consumption`
+    and the battery dispatch of :func:`batmod_ac` in one pass. The residual power is only
+    kept for one block of time steps and the dead time history, each block is simulated
+    with :func:`batmod_ac_chunk` while it is still in the cache. The results are identical
+    to :func:`max_self_consumption` followed by :func:`batmod_ac`.
 
-def eta2abc(parameter):
-    """Function to calculate the parameters of the power loss functions (quadratic equations) from the path efficiencies
+    Series passed as empty arrays are only kept block by block. With non-empty accumulators
+    S the energy sums of :func:`energy_sums_ac` are computed block by block as well, so a
+    simulation that only needs the energy sums does not keep any series.
 
-    :param parameter: Holds parameters of the system
-    :type parameter: dict
-    :return: Dictionary holding parameters from the Excel sheet
-    :rtype: dict
+    :param d: array containing parameters
+    :type d: numpy array
+    :param p: array containing the parameters of the PV inverter, see :func:`transform_dict_to_pvinv_array`
+    :type p: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge in the previous time step
+    :type soc0: float
+    :param ppv: normalized DC power output of the PV generator
+    :type ppv: numpy array
+    :param pl: AC load power
+    :type pl: numpy array
+    :param pvmod: ppv is normalized to the nominal PV power in kW/kWp
+    :type pvmod: bool
+    :param Ppv: DC power output of the PV generator
+    :type Ppv: numpy array
+    :param Ppvs: AC power output of the PV inverter
+    :type Ppvs: numpy array
+    :param Pperi: Additional power consumption of other system components
+    :type Pperi: numpy array
+    :param Pbs: AC-power of the battery system
+    :type Pbs: numpy array
+    :param Pbat: DC-power of the battery
+    :type Pbat: numpy array
+    :param soc: state of charge
+    :type soc: numpy array
+    :param S: accumulators of the energy sums (2 x E_KEYS_AC) or an empty array
+    :type S: numpy array
+    :param P_ac2g_max: maximum PV feed-in power in W
+    :type P_ac2g_max: float
+    :param skip: skip the runs of time steps in which the state of the system cannot change
+    :type skip: bool
     """
-    # PV2AC conversion pathway TODO
-    if parameter['Top'] == 'DC' or parameter['Top'] == 'PVINV' or parameter['Top'] == 'PV' and parameter['P_PV2AC_out'] is not None or parameter['Top'] == 'AC' and parameter['P_PV2AC_out'] is not None:
-        
-        # Create variables for the sampling points and corresponding efficiencies TODO
-        p_pv2ac = np.fromiter((value for key, value in parameter.items() if 'p_PV2AC_' in key and value is not None), float)
-        eta_pv2ac = np.fromiter((value / 100 for key, value in parameter.items() if 'eta_PV2AC_' in key and value is not None), float)
+    _P_PV = p[_PVINV_AC.P_PV]
+    _P_PV2AC_in = p[_PVINV_AC.P_PV2AC_in]
+    _P_PV2AC_out = p[_PVINV_AC.P_PV2AC_out]
+    _PV2AC_a_in = p[_PVINV_AC.PV2AC_a_in]
+    _PV2AC_b_in = p[_PVINV_AC.PV2AC_b_in]
+    _PV2AC_c_in = p[_PVINV_AC.PV2AC_c_in]
+    _P_PERI_AC = p[_PVINV_AC.P_PERI_AC]
+    _P_PVINV_AC = p[_PVINV_AC.P_PVINV_AC]
+
+    _tend = _ppv.size
+
+    # Length of the dead time history and of the blocks
+    _h = max(int(round(d[_AC.t_DEAD])), 1)
+    _B = max(FUSED_BLOCK, _h)
+
+    # Block buffers of the residual power and of the series that are not kept,
+    # the first _h entries hold the history
+    _Pr = np.zeros(_h + _B, _ppv.dtype)
+    _Ppv_b = _buffer(_Ppv, _h + _B)
+    _Ppvs_b = _buffer(_Ppvs, _h + _B)
+    _Pperi_b = _buffer(_Pperi, _h + _B)
+    _Pbs_b = _buffer(_Pbs, _h + _B)
+    _Pbat_b = _buffer(_Pbat, _h + _B)
+    _soc_b = _buffer(_soc, _h + _B)
+
+    _th = False
+    _Pbs0 = 0.0
+    _t0 = -1
+
+    for start in range(0, _tend, _B):
+        end = min(start + _B, _tend)
+        off = _h if _t0 >= 0 else 0
+        lo = start - off
+        n = off + end - start
+
+        Ppv = _view(_Ppv, _Ppv_b, lo, end, n)
+        Ppvs = _view(_Ppvs, _Ppvs_b, lo, end, n)
+        Pperi = _view(_Pperi, _Pperi_b, lo, end, n)
+        Pbs = _view(_Pbs, _Pbs_b, lo, end, n)
+        Pbat = _view(_Pbat, _Pbat_b, lo, end, n)
+        soc = _view(_soc, _soc_b, lo, end, n)
+
+        for t in range(start, end):
+            i = off + t - start
+
+            # DC power output of the PV generator
+            if _pvmod:
+                P_pv = np.minimum(_ppv[t] * _P_PV, _P_PV2AC_in) * 1000
+            else:
+                P_pv = np.minimum(_ppv[t], _P_PV2AC_in * 1000)
 
-        # Absolute input and output power in W
-        p_pv2ac_out = parameter['P_PV2AC_out'] * p_pv2ac * 1000
-        p_pv2ac_in = p_pv2ac_out / eta_pv2ac
+            # Normalized input power of the PV inverter
+            ppvinvin = P_pv / _P_PV2AC_in / 1000
 
-        # Absolute power loss in W
-        P_l_pv2ac_in = (1 - eta_pv2ac) * p_pv2ac_in
-        P_l_pv2ac_out = (1 / eta_pv2ac - 1) * p_pv2ac_out
+            # AC power output of the PV inverter taking into account the conversion losses and maximum
+            # output power of the PV inverter
+            P_pvs = np.minimum(np.maximum(0, P_pv - (_PV2AC_a_in * ppvinvin * ppvinvin + _PV2AC_b_in * ppvinvin + _PV2AC_c_in)), _P_PV2AC_out * 1000)
 
-        # Polynomial curve fitting parameters of the power loss functions in W
-        
-        # Based on input power
-        p = np.polyfit(p_pv2ac_in / parameter['P_PV2AC_in'] / 1000, P_l_pv2ac_in, 2)
-        parameter['PV2AC_a_in'] = p[0]
-        parameter['PV2AC_b_in'] = p[1]
-        parameter['PV2AC_c_in'] = p[2]
+            # Additional power consumption including the standby consumption of the PV inverter
+            P_peri = _P_PERI_AC
+            if P_pvs == 0:
+                P_peri += _P_PVINV_AC
 
-        # Based on output power
-        p = np.polyfit(p_pv2ac, P_l_pv2ac_out, 2)
-        parameter['PV2AC_a_out'] = p[0]
-        parameter['PV2AC_b_out'] = p[1]
-        parameter['PV2AC_c_out'] = p[2]
-    
-    # PV2BAT conversion pathway
-    if parameter['Top'] == 'DC' or parameter['Top'] == 'PV':
+            Ppv[i] = P_pv
+            Ppvs[i] = P_pvs
+            Pperi[i] = P_peri
 
-        # Create variables for the sampling points and corresponding efficiencies
-        p_pv2bat = np.array([value for key, value in parameter.items() if 'p_PV2BAT_' in key])
-        eta_pv2bat = np.array([value / 100 for key, value in parameter.items() if 'eta_PV2BAT_' in key])
+            # Residual power
+            _Pr[i] = P_pvs - _pl[t] - P_peri
 
-        # Create missing variables
+        _, _, _, _soc0, _Pbs0, _th = batmod_ac_chunk(d, _dt, _soc0, soc, _Pr[:n], _Pbs0, Pbs, Pbat, _th, _t0, _skip)
 
-        # Nominal input power of the PV2BAT conversion pathway of DC-coupled systems
-        if parameter['P_PV2BAT_in'] is None:
-            parameter['P_PV2BAT_in'] = parameter['P_PV2BAT_out'] / (parameter['eta_PV2BAT_100'] / 100)
+        if _S.size > 0:
+            energy_sums_ac(_S, _pl[start:end], Ppv[off:], Pbat[off:], Ppvs[off:], Pbs[off:], Pperi[off:], p, _P_ac2g_max)
 
-        # Absolute input and output power in W
-        p_pv2bat_out = parameter['P_PV2BAT_out'] * p_pv2bat * 1000
-        p_pv2bat_in = p_pv2bat_out / eta_pv2bat
+        for Xb in (_Pr, _Ppv_b, _Ppvs_b, _Pperi_b, _Pbs_b, _Pbat_b, _soc_b):
+            _shift(Xb, n, _h)
+        _t0 = _h
 
-        # Absolute power loss in W
-        P_l_pv2bat_in = (1 - eta_pv2bat) * p_pv2bat_in
-        P_l_pv2bat_out = (1 / eta_pv2bat - 1) * p_pv2bat_out
-        
-        # Polynomial curve fitting parameters of the power loss functions in W
-                 
-        # Based on input power
-        p = np.polyfit(p_pv2bat_in / parameter['P_PV2BAT_in'] / 1000, P_l_pv2bat_in, 2)
-        parameter['PV2BAT_a_in'] = p[0]
-        parameter['PV2BAT_b_in'] = p[1]
-        parameter['PV2BAT_c_in'] = p[2]
+    return _Ppv, _Ppvs, _Pperi, _Pbat, _Pbs, _soc, _soc0, _Pbs0
 
-        # Based on output power
-        p = np.polyfit(p_pv2bat, P_l_pv2bat_out, 2)
-        parameter['PV2BAT_a_out'] = p[0]
-        parameter['PV2BAT_b_out'] = p[1]
-        parameter['PV2BAT_c_out'] = p[2]
-    
-    # AC2BAT conversion pathway
-    if parameter['Top'] == 'AC' or parameter['Top'] == 'DC' and parameter['P_AC2BAT_in'] is not None:
 
-        # Create variables for the sampling points and corresponding efficiencies TODO
-        p_ac2bat = np.fromiter((value for key, value in parameter.items() if 'p_AC2BAT_' in key), float)
-        eta_ac2bat = np.fromiter((value / 100 for key, value in parameter.items() if 'eta_AC2BAT_' in key), float)
+@nb.jit([SIGNATURES['batmod_dc_fused'], SIGNATURES_SINGLE['batmod_dc_fused']], nopython=True, cache=True)
+def batmod_dc_fused(d, p, _dt, _soc0, _ppv, _pl, _pvmod, _Ppv, _Ppv2bat_in0, _Ppv2bat_in, _Pbat2ac_out0, _Pbat2ac_out, _Ppv2ac_out, _Ppvbs, _Pbat, _soc, _S, _P_ac2g_max, _skip):
+    """Performance simulation function for DC-coupled systems including the PV2AC conversion pathway
 
-        # Absolute input and output power in W
-        p_ac2bat_out = parameter['P_PV2BAT_out'] * p_ac2bat * 1000
-        p_ac2bat_in = p_ac2bat_out / eta_ac2bat
+    Computes the residual powers of :func:`max_self_consumption` and the battery dispatch
+    of :func:`batmod_dc` in one pass. The residual powers are only kept for one block of
+    time steps and the dead time history, each block is simulated with :func:`batmod_dc_chunk`
+    while it is still in the cache. The results are identical to :func:`max_self_consumption`
+    followed by :func:`batmod_dc`.
 
-        # Absolute power loss in W
-        P_l_ac2bat_in = (1 - eta_ac2bat) * p_ac2bat_in
-        P_l_ac2bat_out = (1 / eta_ac2bat - 1) * p_ac2bat_out
+    Series passed as empty arrays are only kept block by block. With non-empty accumulators
+    S the energy sums of :func:`energy_sums_dc` are computed block by block as well, so a
+    simulation that only needs the energy sums does not keep any series.
+
+    :param d: array containing parameters
+    :type d: numpy array
+    :param p: array containing the parameters of the PV2AC conversion pathway, see :func:`transform_dict_to_pvinv_array`
+    :type p: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge in the previous time step
+    :type soc0: float
+    :param ppv: normalized DC power output of the PV generator
+    :type ppv: numpy array
+    :param pl: AC load power
+    :type pl: numpy array
+    :param pvmod: ppv is normalized to the nominal PV power in kW/kWp
+    :type pvmod: bool
+    :param Ppv: DC power output of the PV generator
+    :type Ppv: numpy array
+    :param Ppv2bat_in0: AC input power of the battery system in the previous time step
+    :type Ppv2bat_in0: float
+    :param Ppv2bat_in: AC input power of the battery system
+    :type Ppv2bat_in: numpy array
+    :param Pbat2ac_out0: AC output power of the battery system in the previous time step
+    :type Pbat2ac_out0: float
+    :param Pbat2ac_out: AC output power of the battery system
+    :type Pbat2ac_out: numpy array
+    :param Ppv2ac_out: AC output power of the PV2AC conversion pathway
+    :type Ppv2ac_out: numpy array
+    :param Ppvbs: AC power of the PV-battery system
+    :type Ppvbs: numpy array
+    :param Pbat: DC power of the battery
+    :type Pbat: numpy array
+    :param soc: state of charge
+    :type soc: numpy array
+    :param S: accumulators of the energy sums (2 x E_KEYS_DC + 1) or an empty array
+    :type S: numpy array
+    :param P_ac2g_max: maximum PV feed-in power in W
+    :type P_ac2g_max: float
+    :param skip: skip the runs of time steps in which the state of the system cannot change
+    :type skip: bool
+    """
+    _P_PV = p[_PVINV_DC.P_PV]
+    _P_PV2AC_in = p[_PVINV_DC.P_PV2AC_in]
+    _P_PV2AC_out = p[_PVINV_DC.P_PV2AC_out]
+    _PV2AC_a_in = p[_PVINV_DC.PV2AC_a_in]
+    _PV2AC_b_in = p[_PVINV_DC.PV2AC_b_in]
+    _PV2AC_c_in = p[_PVINV_DC.PV2AC_c_in]
+    _PV2AC_a_out = p[_PVINV_DC.PV2AC_a_out]
+    _PV2AC_b_out = p[_PVINV_DC.PV2AC_b_out]
+    _PV2AC_c_out = p[_PVINV_DC.PV2AC_c_out]
+    _P_PERI_AC = p[_PVINV_DC.P_PERI_AC]
+
+    _tend = _ppv.size
+
+    # Length of the dead time history and of the blocks
+    _h = max(int(round(d[_DC.t_DEAD])), 1)
+    _B = max(FUSED_BLOCK, _h)
+
+    # Block buffers of the residual powers and of the series that are not kept,
+    # the first _h entries hold the history
+    _Pr = np.zeros(_h + _B, _ppv.dtype)
+    _Prpv = np.zeros(_h + _B, _ppv.dtype)
+    _Ppv_b = _buffer(_Ppv, _h + _B)
+    _Ppv2bat_in_b = _buffer(_Ppv2bat_in, _h + _B)
+    _Pbat2ac_out_b = _buffer(_Pbat2ac_out, _h + _B)
+    _Ppv2ac_out_b = _buffer(_Ppv2ac_out, _h + _B)
+    _Ppvbs_b = _buffer(_Ppvbs, _h + _B)
+    _Pbat_b = _buffer(_Pbat, _h + _B)
+    _soc_b = _buffer(_soc, _h + _B)
+
+    # Additional power consumption of other system components for the energy sums
+    _Pperi = np.full(_B if _S.size > 0 else 0, _P_PERI_AC, _ppv.dtype)
+
+    _th = False
+    _t0 = -1
+
+    for start in range(0, _tend, _B):
+        end = min(start + _B, _tend)
+        off = _h if _t0 >= 0 else 0
+        lo = start - off
+        n = off + end - start
+
+        Ppv = _view(_Ppv, _Ppv_b, lo, end, n)
+        Ppv2bat_in = _view(_Ppv2bat_in, _Ppv2bat_in_b, lo, end, n)
+        Pbat2ac_out = _view(_Pbat2ac_out, _Pbat2ac_out_b, lo, end, n)
+        Ppv2ac_out = _view(_Ppv2ac_out, _Ppv2ac_out_b, lo, end, n)
+        Ppvbs = _view(_Ppvbs, _Ppvbs_b, lo, end, n)
+        Pbat = _view(_Pbat, _Pbat_b, lo, end, n)
+        soc = _view(_soc, _soc_b, lo, end, n)
+
+        for t in range(start, end):
+            i = off + t - start
+
+            # DC power output of the PV generator taking into account the maximum
+            # DC input power of the PV2AC conversion pathway
+            if _pvmod:
+                P_pv = np.minimum(_ppv[t] * _P_PV * 1000, _P_PV2AC_in * 1000)
+            else:
+                P_pv = np.minimum(_ppv[t], _P_PV2AC_in * 1000)
+
+            # Power demand on the AC side
+            P_ac = _pl[t] + _P_PERI_AC
+
+            # Normalized AC output power of the PV2AC conversion pathway to cover the AC
+            # power demand
+            ppv2ac = np.minimum(P_ac, _P_PV2AC_out * 1000) / _P_PV2AC_out / 1000
+
+            # Target DC input power of the PV2AC conversion pathway
+            P_pv2ac_in_ac = np.minimum(P_ac, _P_PV2AC_out * 1000) + (
+                _PV2AC_a_out * ppv2ac**2 + _PV2AC_b_out * ppv2ac + _PV2AC_c_out)
+
+            # Normalized DC input power of the PV2AC conversion pathway
+            ppv2ac = P_pv / _P_PV2AC_in / 1000
+
+            # Target AC output power of the PV2AC conversion pathway
+            P_pv2ac_out = np.maximum(0, P_pv - (_PV2AC_a_in * ppv2ac**2 + _PV2AC_b_in * ppv2ac + _PV2AC_c_in))
+
+            Ppv[i] = P_pv
+            Ppv2ac_out[i] = P_pv2ac_out
+
+            # Residual power for battery charging and discharging
+            _Prpv[i] = P_pv - P_pv2ac_in_ac
+            _Pr[i] = P_pv2ac_out - P_ac
+
+        _, _, _Ppv2bat_in0, _, _Pbat2ac_out0, _, _, _, _soc0, _th = batmod_dc_chunk(
+            d, _dt, _soc0, soc, _Pr[:n], _Prpv[:n], Ppv, _Ppv2bat_in0, Ppv2bat_in, _Pbat2ac_out0, Pbat2ac_out,
+            Ppv2ac_out, Ppvbs, Pbat, _th, _t0, _skip)
+
+        if _S.size > 0:
+            energy_sums_dc(_S, _pl[start:end], Ppv[off:], Pbat[off:], Ppv2ac_out[off:], Ppv2bat_in[off:], Ppvbs[off:],
+                           _Pperi[:end - start], p, _P_ac2g_max)
+
+        for Xb in (_Pr, _Prpv, _Ppv_b, _Ppv2bat_in_b, _Pbat2ac_out_b, _Ppv2ac_out_b, _Ppvbs_b, _Pbat_b, _soc_b):
+            _shift(Xb, n, _h)
+        _t0 = _h
+
+    return _Ppv, _Ppv2ac_out, _Ppv2bat_in, _Ppv2bat_in0, _Pbat2ac_out, _Pbat2ac_out0, _Ppvbs, _Pbat, _soc, _soc0
+
+
+@nb.jit([SIGNATURES['batmod_ideal_fused'], SIGNATURES_SINGLE['batmod_ideal_fused']], nopython=True, cache=True)
+def batmod_ideal_fused(_E_BAT, _P_PV, _dt, _soc0, _ppv, _pl, _ac, _Pbat, _soc, _S):
+    """Lossless battery model of AC- and DC-coupled systems including the energy sums
+
+    Computes the PV power and the residual power of the lossless system, the battery dispatch
+    of :func:`batmod_ideal` and the energy sums of :func:`energy_sums_ideal_ac` or
+    :func:`energy_sums_ideal_dc` block by block, so the series of the lossless system are not
+    needed for the energy sums. Series passed as empty arrays are only kept block by block.
+
+    :param E_BAT: capacity of the battery in kWh
+    :type E_BAT: float
+    :param P_PV: nominal power of the PV generator in kWp
+    :type P_PV: float
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge in the previous time step
+    :type soc0: float
+    :param ppv: normalized DC power output of the PV generator
+    :type ppv: numpy array
+    :param pl: AC load power
+    :type pl: numpy array
+    :param ac: AC-coupled system, DC-coupled otherwise
+    :type ac: bool
+    :param Pbat: DC-power of the battery
+    :type Pbat: numpy array
+    :param soc: state of charge
+    :type soc: numpy array
+    :param S: accumulators of the energy sums (2 x E_KEYS_AC or E_KEYS_DC)
+    :type S: numpy array
+    """
+    _tend = _ppv.size
+    _B = FUSED_BLOCK
+
+    _Ppv = np.zeros(_B, _ppv.dtype)
+    _Pr = np.zeros(_B, _ppv.dtype)
+    _Ppvbs = np.zeros(0 if _ac else _B, _ppv.dtype)
+    _Pbat_b = _buffer(_Pbat, _B)
+    _soc_b = _buffer(_soc, _B)
+
+    for start in range(0, _tend, _B):
+        end = min(start + _B, _tend)
+        n = end - start
+
+        Pbat = _view(_Pbat, _Pbat_b, start, end, n)
+        soc = _view(_soc, _soc_b, start, end, n)
+
+        for t in range(start, end):
+            i = t - start
+            _Ppv[i] = np.maximum(0, _ppv[t]) * _P_PV * 1000
+            _Pr[i] = _Ppv[i] - _pl[t]
+
+        _, _, _soc0 = batmod_ideal(_E_BAT, _dt, _soc0, soc, _Pr[:n], Pbat)
+
+        if _ac:
+            # The AC power of the PV system and of the battery system are lossless
+            energy_sums_ideal_ac(_S, _pl[start:end], _Ppv[:n], Pbat, _Ppv[:n], Pbat)
+        else:
+            for i in range(n):
+                _Ppvbs[i] = _Ppv[i] - np.maximum(0, Pbat[i]) - np.minimum(0, Pbat[i])
+            energy_sums_ideal_dc(_S, _pl[start:end], _Ppv[:n], Pbat, _Ppvbs[:n])
+
+    return _Pbat, _soc, _soc0
+
+
+@nb.jit(SIGNATURES['batmod_ac_batch'], nopython=True, parallel=True, cache=True)
+def batmod_ac_batch(D, _dt, _soc0, _Pr, _Pbs0):
+    """Performance Simulation function for many AC-coupled battery systems at once
+
+    Each row of the parameter matrix is simulated with :func:`batmod_ac`,
+    the systems are distributed over all available cores.
+
+    :param D: matrix containing one parameter array per row (systems x parameters)
+    :type D: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge of each system in the previous time step
+    :type soc0: numpy array
+    :param Pr: residual power of each system (systems x time steps)
+    :type Pr: numpy array
+    :param Pbs0: AC-power of each battery system in the previous time step
+    :type Pbs0: numpy array
+    :return: stacked DC-power of the battery, AC-power of the battery system, state of charge
+        and the final states soc0 and Pbs0 of every system
+    :rtype: tuple
+    """
+    _n = D.shape[0]
+
+    _Pbat = np.zeros(_Pr.shape)
+    _Pbs = np.zeros(_Pr.shape)
+    _soc = np.zeros(_Pr.shape)
+    _soc_end = np.zeros(_n)
+    _Pbs_end = np.zeros(_n)
+
+    for i in nb.prange(_n):
+        _, _, _, soc0, Pbs0 = batmod_ac(
+            D[i], _dt, _soc0[i], _soc[i], _Pr[i], _Pbs0[i], _Pbs[i], _Pbat[i])
+        _soc_end[i] = soc0
+        _Pbs_end[i] = Pbs0
+
+    return _Pbat, _Pbs, _soc, _soc_end, _Pbs_end
+
+
+@nb.jit(SIGNATURES['batmod_dc_batch'], nopython=True, parallel=True, cache=True)
+def batmod_dc_batch(D, _dt, _soc0, _Pr, _Prpv, _Ppv, _Ppv2bat_in0, _Pbat2ac_out0, _Ppv2ac_out):
+    """Performance simulation function for many DC-coupled battery systems at once
+
+    Each row of the parameter matrix is simulated with :func:`batmod_dc`,
+    the systems are distributed over all available cores.
+
+    :param D: matrix containing one parameter array per row (systems x parameters)
+    :type D: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge of each system in the previous time step
+    :type soc0: numpy array
+    :param Pr: residual power of each system (systems x time steps)
+    :type Pr: numpy array
+    :param Prpv: residual power of the PV-system of each system (systems x time steps)
+    :type Prpv: numpy array
+    :param Ppv: PV-power of each system (systems x time steps)
+    :type Ppv: numpy array
+    :param Ppv2bat_in0: input power of the PV2BAT conversion pathway in the previous time step
+    :type Ppv2bat_in0: numpy array
+    :param Pbat2ac_out0: output power of the BAT2AC conversion pathway in the previous time step
+    :type Pbat2ac_out0: numpy array
+    :param Ppv2ac_out: target AC output power of the PV2AC conversion pathway (systems x time steps)
+    :type Ppv2ac_out: numpy array
+    :return: stacked result arrays and the final states of every system
+    :rtype: tuple
+    """
+    _n = D.shape[0]
+
+    # The kernel overwrites the target values with the realized values
+    _Ppv2ac_out = _Ppv2ac_out.copy()
+    _Ppv2bat_in = np.zeros(_Pr.shape)
+    _Pbat2ac_out = np.zeros(_Pr.shape)
+    _Ppvbs = np.zeros(_Pr.shape)
+    _Pbat = np.zeros(_Pr.shape)
+    _soc = np.zeros(_Pr.shape)
+    _soc_end = np.zeros(_n)
+    _Ppv2bat_in_end = np.zeros(_n)
+    _Pbat2ac_out_end = np.zeros(_n)
+
+    for i in nb.prange(_n):
+        _, _, Ppv2bat_in0, _, Pbat2ac_out0, _, _, _, soc0 = batmod_dc(
+            D[i], _dt, _soc0[i], _soc[i], _Pr[i], _Prpv[i], _Ppv[i], _Ppv2bat_in0[i], _Ppv2bat_in[i],
+            _Pbat2ac_out0[i], _Pbat2ac_out[i], _Ppv2ac_out[i], _Ppvbs[i], _Pbat[i])
+        _soc_end[i] = soc0
+        _Ppv2bat_in_end[i] = Ppv2bat_in0
+        _Pbat2ac_out_end[i] = Pbat2ac_out0
+
+    return _Ppv2ac_out, _Ppv2bat_in, _Pbat2ac_out, _Ppvbs, _Pbat, _soc, _soc_end, _Ppv2bat_in_end, _Pbat2ac_out_end
+
+
+@nb.jit(SIGNATURES['batmod_pv_batch'], nopython=True, parallel=True, cache=True)
+def batmod_pv_batch(D, _dt, _soc0, _Ppv, _Pac, _Ppv2bat_in0, _Pbat2pv_out0):
+    """Performance simulation function for many PV-coupled battery systems at once
+
+    Each row of the parameter matrix is simulated with :func:`batmod_pv`,
+    the systems are distributed over all available cores.
+
+    :param D: matrix containing one parameter array per row (systems x parameters)
+    :type D: numpy array
+    :param dt: time step width
+    :type dt: integer
+    :param soc0: state of charge of each system in the previous time step
+    :type soc0: numpy array
+    :param Ppv: PV-power of each system (systems x time steps)
+    :type Ppv: numpy array
+    :param Pac: power demand on the AC side of each system (systems x time steps)
+    :type Pac: numpy array
+    :param Ppv2bat_in0: input power of the PV2BAT conversion pathway in the previous time step
+    :type Ppv2bat_in0: numpy array
+    :param Pbat2pv_out0: output power of the BAT2PV conversion pathway in the previous time step
+    :type Pbat2pv_out0: numpy array
+    :return: stacked result arrays and the final state of charge of every system
+    :rtype: tuple
+    """
+    _n = D.shape[0]
+
+    # The kernel limits the PV power in place
+    _Ppv = _Ppv.copy()
+    _soc = np.zeros(_Ppv.shape)
+    _Ppvbs = np.zeros(_Ppv.shape)
+    _Pbat = np.zeros(_Ppv.shape)
+    _Ppv2ac_out = np.zeros(_Ppv.shape)
+    _Pbat2pv_out = np.zeros(_Ppv.shape)
+    _Ppv2bat_in = np.zeros(_Ppv.shape)
+    _soc_end = np.zeros(_n)
+
+    for i in nb.prange(_n):
+        _, soc0, _, _, _, _, _, _ = batmod_pv(
+            D[i], _dt, _soc0[i], _soc[i], _Ppv[i], _Pac[i], _Ppv2bat_in0[i], _Ppv2bat_in[i],
+            _Ppv2ac_out[i], _Pbat2pv_out0[i], _Pbat2pv_out[i], _Ppvbs[i], _Pbat[i])
+        _soc_end[i] = soc0
+
+    return _soc, _soc_end, _Ppv, _Ppvbs, _Pbat, _Ppv2ac_out, _Pbat2pv_out, _Ppv2bat_in
+
+
+def _kernel(name, dtype=np.float64):
+    """Returns the ahead-of-time compiled kernel if the module built by build_aot is available,
+    otherwise the jitted kernel
+
+    :param name: Name of the kernel
+    :type name: string
+    :param dtype: Data type of the time series, the compiled module only covers float64
+    :type dtype: numpy dtype
+    :return: simulation kernel
+    :rtype: function
+    """
+    if _batmod_aot is not None and name in AOT_KERNELS and np.dtype(dtype) == np.float64:
+        return getattr(_batmod_aot, name)
+
+    return globals()[name]
+
+
+def build_aot(output_dir=None):
+    """Compiles the single system kernels ahead of time into the extension module _batmod_aot
+
+    Once built, the model classes use the compiled module and a fresh process does not
+    compile anything.
+
+    :param output_dir: Directory of the extension module, defaults to the package directory
+    :type output_dir: string
+    """
+    from numba.pycc import CC
+
+    cc = CC('_batmod_aot')
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+
+    for name in AOT_KERNELS:
+        cc.export(name, SIGNATURES[name])(globals()[name].py_func)
+
+    cc.compile()
+
+
+def warmup(groups=('simulation', 'batch')):
+    """Runs the kernels of the selected groups once on a short series
+
+    Loads the compiled kernels and starts the threading layer of the parallel kernels,
+    so the first simulation of a short-lived worker process does not pay for it.
+
+    :param groups: Groups of kernels: 'simulation' (single systems), 'batch' (many systems
+        at once, starts the threading layer), 'io' (CSV parsing and formatting) and
+        'profiles' (resampling and synthetic profiles)
+    :type groups: tuple
+    """
+    unknown = set(groups) - {'simulation', 'batch', 'io', 'profiles'}
+    if unknown:
+        raise ValueError('Unknown kernel groups %s!' % ', '.join(sorted(unknown)))
+
+    d_ac = np.ones(len(PARAMETER_DTYPES['AC']))
+    d_dc = np.ones(len(PARAMETER_DTYPES['DC']))
+    d_pv = np.ones(len(PARAMETER_DTYPES['PV']))
+    x = np.ones(4)
+    X = np.ones((1, 4))
+    s = np.zeros(1)
+
+    if 'simulation' in groups:
+        _warmup_simulation(d_ac, d_dc, d_pv, x)
+
+    if 'batch' in groups:
+        batmod_ideal_batch(np.ones(1), 1.0, s, X)
+        batmod_ac_batch(d_ac[np.newaxis], 1.0, s, X, s)
+        batmod_dc_batch(d_dc[np.newaxis], 1.0, s, X, X, X, s, s, X)
+        batmod_pv_batch(d_pv[np.newaxis], 1.0, s, X, X, s, s)
+
+    if 'io' in groups:
+        parse_csv(np.frombuffer(bytearray(b'2021-01-01 00:00:00,1.5\n'), np.uint8), ord(','), ord('.'), np.arange(2), 0)
+        format_csv(X, 0.0, 1.0, 6, ord(','))
+
+    if 'profiles' in groups:
+        resample(x, 1, 2)
+        resample(X, 1, 2)
+        synthetic_profiles(1, dt=3600)
+
+
+def _warmup_simulation(d_ac, d_dc, d_pv, x):
+    # Single system kernels of the model classes, see warmup
+    _kernel('batmod_ac')(d_ac, 1.0, 0.0, x.copy(), x.copy(), 0.0, x.copy(), x.copy())
+    _kernel('batmod_ac_ideal')(d_ac, 1.0, 0.0, x.copy(), x.copy(), x.copy())
+    _kernel('batmod_dc')(d_dc, 1.0, 0.0, x.copy(), x.copy(), x.copy(), x.copy(), 0.0, x.copy(),
+                         0.0, x.copy(), x.copy(), x.copy(), x.copy())
+    _kernel('batmod_dc_ideal')(d_dc, 1.0, 0.0, x.copy(), x.copy(), x.copy())
+    _kernel('batmod_pv')(d_pv, 1.0, 0.0, x.copy(), x.copy(), x.copy(), 0.0, x.copy(), x.copy(),
+                         0.0, x.copy(), x.copy(), x.copy())
+
+    _kernel('batmod_ideal')(1.0, 1.0, 0.0, x.copy(), x.copy(), x.copy())
+
+    _kernel('batmod_ac_fused')(d_ac, np.ones(len(PVINV_DTYPES['AC'])), 1.0, 0.0, x, x, True, x.copy(), x.copy(), x.copy(), x.copy(),
+                               x.copy(), x.copy(), np.zeros((2, len(E_KEYS_AC))), 1.0, False)
+    _kernel('batmod_dc_fused')(d_dc, np.ones(len(PVINV_DTYPES['DC'])), 1.0, 0.0, x, x, True, x.copy(), 0.0, x.copy(), 0.0, x.copy(),
+                               x.copy(), x.copy(), x.copy(), x.copy(), np.zeros((2, len(E_KEYS_DC) + 1)), 1.0, False)
+    _kernel('batmod_ideal_fused')(1.0, 1.0, 1.0, 0.0, x, x, True, x.copy(), x.copy(), np.zeros((2, len(E_KEYS_AC))))
+    _kernel('energy_sums_ideal_ac')(np.zeros((2, len(E_KEYS_AC))), x, x, x, x, x)
+    _kernel('energy_sums_ideal_dc')(np.zeros((2, len(E_KEYS_DC))), x, x, x, x)
+
+
+def simulation_stream(parameter, chunks, dt, pvmod=True, dtype=np.float64, skip=False):
+    """Generator for the chunked simulation of AC-, DC- or PV-coupled systems
+
+    The states of the battery system (state of charge, powers of the previous time step,
+    hysteresis threshold and the dead time history) are carried over from one chunk to the
+    next, so long time series are simulated in constant memory. The concatenated results
+    are identical to a single run over the whole time series. Every chunk must be longer
+    than the dead time of the system.
+
+    :param parameter: PV battery system parameters
+    :type parameter: dict
+    :param chunks: pairs of the normalized DC power of the PV generator and the AC load power
+    :type chunks: iterable
+    :param dt: time step width in seconds
+    :type dt: integer
+    :param pvmod: ppv is normalized to the nominal PV power in kW/kWp
+    :type pvmod: bool
+    :param dtype: Data type of the time series, np.float32 for single precision
+    :type dtype: numpy dtype
+    :param skip: Fill the runs of time steps in standby mode in discharged state of AC- and
+        DC-coupled systems in bulk
+    :type skip: bool
+    :return: dictionary holding the result series of each chunk
+    :rtype: generator
+    """
+    d = transform_dict_to_array(parameter)
+
+    # Length of the dead time history
+    h = int(round(parameter['t_DEAD']))
+
+    t0 = -1
+    th = False
+    soc0 = 0.0
+    soc0_ideal = 0.0
+    hist = None
+
+    def extend(x, i):
+        # Prepend the history of the previous chunk
+        if hist is None:
+            return np.array(x, dtype=dtype)
+        return np.concatenate((hist[i], x))
+
+    for ppv, pl in chunks:
+        ppv = np.asarray(ppv, dtype)
+        pl = np.asarray(pl, dtype)
+        n = ppv.size
+        r = dict()
+
+        if parameter['Top'] == 'AC':
+            r['Pr'], r['Ppv'], r['Ppvs'], r['Pperi'] = max_self_consumption(parameter, ppv, pl, pvmod)
+
+            Pr, Pbs, Pbat, soc = (extend(x, i) for i, x in enumerate((r['Pr'], np.zeros(n, dtype), np.zeros(n, dtype), np.zeros(n, dtype))))
+            Pbs0 = Pbs[-n - 1] if hist is not None else 0.0
+
+            Pbat, Pbs, soc, soc0, Pbs0, th = _kernel('batmod_ac_chunk', dtype)(
+                d, dt, soc0, soc, Pr, Pbs0, Pbs, Pbat, th, t0, skip)
+
+            ext = (Pr, Pbs, Pbat, soc)
+            r['Pbs'], r['Pbat'], r['soc'] = Pbs[-n:], Pbat[-n:], soc[-n:]
+
+        elif parameter['Top'] == 'DC':
+            r['Pr'], r['Prpv'], r['Ppv'], _, Ppv2ac_out = max_self_consumption(parameter, ppv, pl, pvmod)
+
+            Pr, Prpv, Ppv, Ppv2ac_out, Ppv2bat_in, Pbat2ac_out, Ppvbs, Pbat, soc = (
+                extend(x, i) for i, x in enumerate((r['Pr'], r['Prpv'], r['Ppv'], Ppv2ac_out, np.zeros(n, dtype), np.zeros(n, dtype),
+                                                    np.zeros(n, dtype), np.zeros(n, dtype), np.zeros(n, dtype))))
+
+            # Powers of the last time step of the previous chunk for the settling time
+            if hist is not None:
+                Ppv2bat_in0, Pbat2ac_out0 = Ppv2bat_in[-n - 1], Pbat2ac_out[-n - 1]
+            else:
+                Ppv2bat_in0, Pbat2ac_out0 = 0.0, 0.0
+
+            Ppv2ac_out, Ppv2bat_in, _, Pbat2ac_out, _, Ppvbs, Pbat, soc, soc0, th = _kernel('batmod_dc_chunk', dtype)(
+                d, dt, soc0, soc, Pr, Prpv, Ppv, Ppv2bat_in0, Ppv2bat_in, Pbat2ac_out0, Pbat2ac_out,
+                Ppv2ac_out, Ppvbs, Pbat, th, t0, skip)
+
+            ext = (Pr, Prpv, Ppv, Ppv2ac_out, Ppv2bat_in, Pbat2ac_out, Ppvbs, Pbat, soc)
+            for key, x in zip(('Ppv2ac_out', 'Ppv2bat_in', 'Pbat2ac_out', 'Ppvbs', 'Pbat', 'soc'), ext[3:]):
+                r[key] = x[-n:]
+
+        elif parameter['Top'] == 'PV':
+            Pac, Ppv, r['Pperi'] = max_self_consumption(parameter, ppv, pl, pvmod)
+
+            Ppv, Pac, Ppv2bat_in, Ppv2ac_out, Pbat2pv_out, Ppvbs, Pbat, soc = (
+                extend(x, i) for i, x in enumerate((Ppv, Pac, np.zeros(n, dtype), np.zeros(n, dtype), np.zeros(n, dtype), np.zeros(n, dtype),
+                                                    np.zeros(n, dtype), np.zeros(n, dtype))))
+
+            # Powers of the last time step of the previous chunk for the settling time
+            if hist is not None:
+                Ppv2bat_in0, Pbat2pv_out0 = Ppv2bat_in[-n - 1], Pbat2pv_out[-n - 1]
+            else:
+                Ppv2bat_in0, Pbat2pv_out0 = 0.0, 0.0
+
+            soc, soc0, Ppv, Ppvbs, Pbat, Ppv2ac_out, Pbat2pv_out, Ppv2bat_in, th = _kernel('batmod_pv_chunk', dtype)(
+                d, dt, soc0, soc, Ppv, Pac, Ppv2bat_in0, Ppv2bat_in, Ppv2ac_out, Pbat2pv_out0, Pbat2pv_out,
+                Ppvbs, Pbat, th, t0)
+
+            ext = (Ppv, Pac, Ppv2bat_in, Ppv2ac_out, Pbat2pv_out, Ppvbs, Pbat, soc)
+            for key, x in zip(('Ppv', 'Pac', 'Ppv2bat_in', 'Ppv2ac_out', 'Pbat2pv_out', 'Ppvbs', 'Pbat', 'soc'), ext):
+                r[key] = x[-n:]
+
+        # Lossless reference system of AC- and DC-coupled systems
+        if parameter['Top'] == 'AC' or parameter['Top'] == 'DC':
+            Ppv_ideal = np.maximum(0, ppv) * parameter['P_PV'] * 1000 if pvmod else np.maximum(0, ppv)
+            r['Pbat_ideal'], r['soc_ideal'], soc0_ideal = _kernel('batmod_ideal', dtype)(
+                parameter['E_BAT'], dt, soc0_ideal, np.zeros(n, dtype), Ppv_ideal - pl, np.zeros(n, dtype))
+
+        # Keep the last time steps as history of the next chunk
+        hist = [x[x.size - max(h, 1):].copy() for x in ext]
+        t0 = hist[0].size
+
+        yield r
+
+
+def _check_outputs(outputs):
+    # Selection of the kept series, see OUTPUTS
+    if outputs not in OUTPUTS:
+        raise ValueError('Unknown outputs %r, expected one of %s!' % (outputs, ', '.join(OUTPUTS)))
+    return outputs
+
+
+def _output(x, keep, fill=0):
+    # Preallocated series like x, empty if it is not kept
+    if not keep:
+        return np.zeros(0, x.dtype)
+    if fill:
+        return np.full_like(x, fill)
+    return np.zeros_like(x)
+
+
+def _series(*args):
+    # Time series for the energy accumulators, single precision only if all series are
+    if all(np.asarray(x).dtype == np.float32 for x in args):
+        dtype = np.float32
+    else:
+        dtype = np.float64
+    return tuple(np.asarray(x).astype(dtype, copy=False) for x in args)
+
+
+def energy_dict(S, keys, dt=1):
+    """Function for converting the accumulators of the energy sums into the dict of energy sums
+
+    :param S: compensated sums of the absolute power values in W
+    :type S: numpy array
+    :param keys: names of the energy sums, E_KEYS_AC or E_KEYS_DC
+    :type keys: tuple
+    :param dt: time step width
+    :type dt: integer
+    :return: energy sums in MWh
+    :rtype: dict
+    """
+    _E = dict()
+
+    for i, key in enumerate(keys):
+        _E[key] = (S[0, i] + S[1, i]) * dt / 3.6e9
+
+    return _E
+
+
+def energy_accumulators(_parameter):
+    """Function for allocating the accumulators of the energy sums of a system
+
+    :param _parameter: parameter of the system
+    :type _parameter: dict
+    :return: accumulators for :func:`energy_sums_ac` or :func:`energy_sums_dc`
+    :rtype: numpy array
+    """
+    if _parameter['Top'] == 'AC':
+        return np.zeros((2, len(E_KEYS_AC)))
+
+    # The additional accumulator holds the PV power recomputed in case of curtailment
+    return np.zeros((2, len(E_KEYS_DC) + 1))
+
+
+def energy_sums(_parameter, S, _dt):
+    """Function for converting the accumulators of :func:`energy_sums_ac` or
+    :func:`energy_sums_dc` into the energy sums of :func:`bat_res_mod`
+
+    :param _parameter: parameter of the system
+    :type _parameter: dict
+    :param S: accumulators
+    :type S: numpy array
+    :param _dt: time step width
+    :type _dt: integer
+    :return: energy sums
+    :rtype: dict
+    """
+    if _parameter['Top'] == 'AC':
+        return energy_dict(S, E_KEYS_AC, _dt)
+
+    # In case of curtailment the DC output of the PV generator is recomputed
+    # from the curtailed input power of the PV2AC conversion pathway
+    if S[0, E_KEYS_DC.index('Ect')] > 0:
+        S = S.copy()
+        S[:, E_KEYS_DC.index('Epv')] = S[:, len(E_KEYS_DC)]
+
+    return energy_dict(S, E_KEYS_DC, _dt)
+
+
+def bat_res_mod(_parameter, _Pl, _Ppv, _Pbat, _dt, *args):
+    """Function for calculating energy sums
+
+    The power flows are computed and summed up in a single pass of :func:`energy_sums_ac`
+    or :func:`energy_sums_dc`, without intermediate series.
+
+    :param _parameter: parameter of the system
+    :type _parameter: dict
+    :param _Pl: load power
+    :type _Pl: numpy array
+    :param _Ppv: output power of the PV generator
+    :type _Ppv: numpy array
+    :param _Pbat: DC power of the battery
+    :type _Pbat: numpy array
+    :param _dt: time step width
+    :type _dt: integer
+    :return: energy sums
+    :rtype: dict
+    """
+    # Parameters of the PV inverter for the curtailment of PV power
+    p = transform_dict_to_pvinv_array(_parameter)
+    # Maximum PV feed-in power
+    _P_ac2g_max = _parameter['p_ac2g_max'] * _parameter['P_PV'] * 1000
+
+    S = energy_accumulators(_parameter)
+
+    if _parameter['Top'] == 'AC':  # AC-coupled systems
+
+        # AC output power of the PV system, AC power of the battery system and additional
+        # power consumption of the other system components
+        series = _series(_Pl, _Ppv, _Pbat, *args[:3])
+        _kernel('energy_sums_ac', series[0].dtype)(S, *series, p, _P_ac2g_max)
+
+        # The DC output of the PV generator is corrected for the curtailment in place
+        if series[1] is not _Ppv:
+            _Ppv[:] = series[1]
+
+    elif _parameter['Top'] == 'DC' or _parameter['Top'] == 'PV':  # DC- and PV-coupled systems
+
+        # AC output power of the PV2AC conversion pathway, input power of the PV2BAT conversion
+        # pathway, AC power of the PV-battery system and additional power consumption of the
+        # other system components
+        series = _series(_Pl, _Ppv, _Pbat, *args[:4])
+        _kernel('energy_sums_dc', series[0].dtype)(S, *series, p, _P_ac2g_max)
+
+    return energy_sums(_parameter, S, _dt)
+
+
+def bat_res_mod_ideal(_parameter, _Pl, _Ppv, _Pbat, _dt, *args):
+    """Function for calculating energy sums of the lossless system
+
+    :param _parameter: parameter of the system
+    :type _parameter: dict
+    :param _Pl: load power
+    :type _Pl: numpy array
+    :param _Ppv: output power of the PV generator
+    :type _Ppv: numpy array
+    :param _Pbat: DC power of the battery
+    :type _Pbat: numpy array
+    :param _dt: time step width, applied like to the energy sums of the real system so the
+        SPI compares energies of the same time step width
+    :type _dt: integer
+    :return: energy sums
+    :rtype: dict
+    """
+    if _parameter['Top'] == 'AC':
+        # AC output power of the PV system and AC power of the battery system
+        series = _series(_Pl, _Ppv, _Pbat, *args[:2])
+        S = _kernel('energy_sums_ideal_ac', series[0].dtype)(np.zeros((2, len(E_KEYS_AC))), *series)
+
+        return energy_dict(S, E_KEYS_AC, _dt)
+
+    elif _parameter['Top'] == 'DC':
+        # AC power of the PV-battery system
+        series = _series(_Pl, _Ppv, _Pbat, args[2])
+        S = _kernel('energy_sums_ideal_dc', series[0].dtype)(np.zeros((2, len(E_KEYS_DC))), *series)
+
+        return energy_dict(S, E_KEYS_DC, _dt)
+
+
+def load_parameter(fname, col_name):
+    """Loads system parameter from excel file
+
+    :param fname: Path to the excel file
+    :type fname: string
+    :param col_name: Column to read data from
+    :type col_name: string
+    :return: Dictionary holding parameters from the Excel sheet
+    :rtype: dict
+    """
+    
+    wb = load_workbook(fname, data_only=True)
+    ws = wb['Data'] # Load Data sheet of excel file
+
+    return _read_parameter(ws, col_name)
+
+
+def _read_parameter(ws, col_name):
+    """Reads the system parameters of one column of the Data sheet
+
+    :param ws: Data sheet of the excel file
+    :type ws: openpyxl worksheet
+    :param col_name: Column to read data from
+    :type col_name: string
+    :return: Dictionary holding parameters from the Excel sheet
+    :rtype: dict
+    """
+    # read keys and values from Excel sheet
+    keys = (c.value for c in ws['E'][1:])
+    values = (c.value if c.value != 'ns' else None for c in ws[col_name][1:])
+    
+    parameter = dict(zip(keys, values))
+
+    # deletes entries where key is None
+    del parameter[None]
+
+    # Assign specific parameters
+    parameter['P_PV2AC_out_PVINV'] = ws[col_name][15].value
+    parameter['P_PV2AC_out'] = ws[col_name][24].value
+    parameter['P_AC2BAT_in_DCC'] = ws[col_name][25].value
+    parameter['P_AC2BAT_in'] = ws[col_name][26].value
+    parameter['P_BAT2AC_out'] = ws[col_name][27].value
+    parameter['P_BAT2AC_out_DCC'] = ws[col_name][28].value
+
+    # Set refrence case values to boolean
+    if parameter['ref_1'] == 'yes':
+        parameter['ref_1'] = True
+    elif parameter['ref_1'] == 'no':
+        parameter['ref_1'] = False
+    
+    if parameter['ref_2'] == 'yes':
+        parameter['ref_2'] = True
+    elif parameter['ref_2'] == 'no':
+        parameter['ref_2'] = False
+
+    # Specific parameters of DC-coupled systems
+    if parameter['Top'] == 'DC':
+        parameter['P_AC2BAT_in'] = parameter['P_AC2BAT_in_DCC'] # Nominal charging power (AC) in kW
+        parameter['P_BAT2AC_out'] = parameter['P_BAT2AC_out_DCC']
+    
+    # Specific parameters of PV inverters and AC-coupled systems
+    if parameter['Top'] == 'PVINV' or parameter['Top'] == 'AC' and parameter['P_PV2AC_out_PVINV'] is not None:
+        parameter['P_PV2AC_out'] = parameter['P_PV2AC_out_PVINV']
+    
+    # Specific parameters of PV-coupled systems
+    if parameter['Top'] == 'PV':
+        parameter['P_BAT2PV_in'] = parameter['P_BAT2AC_in']
+        parameter['P_BAT2AC_out'] = parameter['P_BAT2AC_out_DCC']
+
+    # replace 'ns', 'o' and 'c' entries to None
+    for key, value in parameter.items():
+        if value == 'ns' or value == 'o' or value == 'c' or value == ' ':
+            parameter[key] = None
+
+    # Convert to kW
+    convert_to_kw = ['P_PV2AC_in', 'P_PV2AC_out_PVINV','P_PV2AC_out','P_AC2BAT_in_DCC','P_AC2BAT_in','P_BAT2AC_out',
+             'P_BAT2AC_out_DCC','P_PV2BAT_in','P_BAT2PV_out','P_PV2BAT_out','P_BAT2AC_in']
+
+    for par in convert_to_kw:
+        if parameter[par]:
+            parameter[par] /= 1000
+        
+    return parameter
+
+
+def load_parameter_table(fname):
+    """Loads the parameters of all systems from excel file at once
+
+    The Data sheet is read once, every system column (up to the column marked 'End') becomes
+    one row of the table, indexed by its column letter. The parameters of the power loss
+    functions of all systems are calculated at once with :func:`eta2abc_batch`. Numeric fields are float64 with NaN for
+    missing values, 'Top' holds the topology and 'ref_1' and 'ref_2' the eligibility for the
+    reference cases. Rows are turned back into parameter dicts with :func:`table_to_parameters`.
+
+    :param fname: Path to the excel file
+    :type fname: string
+    :return: Table holding the parameters of all systems (systems x parameters)
+    :rtype: pandas data frame
+    """
+    wb = load_workbook(fname, data_only=True)
+    ws = wb['Data']
 
-        # Polynomial curve fitting parameters of the power loss functions in W
-        
-        # Based on input power
-        p = np.polyfit(p_ac2bat_in / parameter['P_AC2BAT_in'] / 1000, P_l_ac2bat_in, 2)
-        parameter['AC2BAT_a_in'] = p[0]
-        parameter['AC2BAT_b_in'] = p[1]
-        parameter['AC2BAT_c_in'] = p[2]
+    keys = [c.value for c in ws['E']]
+    row_top = keys.index('Top')
+    row_number = keys.index('Number')
 
-        # Based on output power
-        p = np.polyfit(p_ac2bat, P_l_ac2bat_out, 2)
-        parameter['AC2BAT_a_out'] = p[0]
-        parameter['AC2BAT_b_out'] = p[1]
-        parameter['AC2BAT_c_out'] = p[2]
-    
-    # BAT2AC conversion pathway
-    if parameter['Top'] =='AC' or parameter['Top'] =='DC' or parameter['Top'] =='PV' and parameter['P_BAT2AC_out'] is not None:
+    rows = dict()
+    for col in ws.iter_cols(min_col=ws['H'][0].column):
+        if col[row_number].value == 'End':
+            break
+        if col[row_top].value is None:
+            continue
+        col_name = col[0].column_letter
+        rows[col_name] = _read_parameter(ws, col_name)
+
+    eta2abc_batch(list(rows.values()))
+
+    table = pd.DataFrame.from_dict(rows, orient='index')
+
+    # Typed columns, numbers as float64 and yes/no fields as bool where complete
+    for key in table.columns:
+        values = [value for value in table[key] if value is not None]
+        if values and all(isinstance(value, bool) for value in values) and len(values) == len(table):
+            table[key] = table[key].astype(bool)
+        elif values and all(isinstance(value, (int, float, np.number)) and not isinstance(value, bool) for value in values):
+            table[key] = table[key].astype(float)
+
+    return table
+
+
+def table_to_parameters(table):
+    """Function for turning the rows of a parameter table into dicts of system parameters.
+
+    :param table: Table from :func:`load_parameter_table`, e.g. filtered by topology
+    :type table: pandas data frame
+    :return: one dict of system parameters per row, NaN fields are None again
+    :rtype: list
+    """
+    parameters = list()
+    for _, row in table.iterrows():
+        parameters.append({key: None if isinstance(value, float) and np.isnan(value) else value
+                           for key, value in row.items()})
+
+    return parameters
+
+
+# Directory of the on-disk cache of the parsed parameter workbooks, None disables it
+PARAMETER_CACHE_DIR = os.environ.get('OPENBATLIB_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'openbatlib'))
+
+# Parsed parameter workbooks of this process, see load_parameter_cached
+_parameter_cache = dict()
+
+# Version of the parsing and fitting of the parameters, cache entries of other versions are discarded
+_PARAMETER_CACHE_VERSION = 2
+
+
+def load_parameter_cached(fname, col_name):
+    """Loads system parameter from excel file and calculates the parameters of the power loss functions
+
+    Same result as :func:`load_parameter` followed by :func:`eta2abc`. The parsed columns are kept
+    in memory for all Controller instances and in PARAMETER_CACHE_DIR on disk. An entry is valid
+    as long as the modification time or else the content hash of the workbook is unchanged.
+
+    :param fname: Path to the excel file
+    :type fname: string
+    :param col_name: Column to read data from
+    :type col_name: string
+    :return: Dictionary holding parameters from the Excel sheet
+    :rtype: dict
+    """
+    path = os.path.abspath(fname)
+    mtime = os.stat(path).st_mtime_ns
+    entry = _parameter_cache.get(path)
+
+    cache_file = None
+    if PARAMETER_CACHE_DIR is not None:
+        cache_file = os.path.join(PARAMETER_CACHE_DIR, hashlib.sha1(path.encode()).hexdigest() + '.pkl')
+
+    if entry is None and cache_file is not None:
+        try:
+            with open(cache_file, 'rb') as f:
+                entry = pickle.load(f)
+            if entry.get('version') != _PARAMETER_CACHE_VERSION:
+                entry = None
+        except Exception:  # Missing or unreadable cache file
+            entry = None
+
+    if entry is None or entry['mtime'] != mtime:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if entry is None or entry['hash'] != digest:
+            entry = dict(version=_PARAMETER_CACHE_VERSION, hash=digest, parameters=dict())
+        entry['mtime'] = mtime
+
+    _parameter_cache[path] = entry
+
+    if col_name not in entry['parameters']:
+        entry['parameters'][col_name] = eta2abc(load_parameter(path, col_name))
+
+        if cache_file is not None:
+            try:
+                os.makedirs(PARAMETER_CACHE_DIR, exist_ok=True)
+                tmp = '%s.%d.tmp' % (cache_file, os.getpid())
+                with open(tmp, 'wb') as f:
+                    pickle.dump(entry, f)
+                os.replace(tmp, cache_file)
+            except OSError:
+                pass
+
+    # The callers complete the parameters of the reference case in place
+    return dict(entry['parameters'][col_name])
 
-        # Create variables for the sampling points and corresponding efficiencies TODO
-        p_bat2ac = np.fromiter((value for key, value in parameter.items() if 'p_BAT2AC_' in key), float)
-        eta_bat2ac = np.fromiter((value / 100 for key, value in parameter.items() if 'eta_BAT2AC_' in key), float)
 
+def eta2abc(parameter):
+    """Function to calculate the parameters of the power loss functions (quadratic equations) from the path efficiencies
+
+    :param parameter: Holds parameters of the system
+    :type parameter: dict
+    :return: Dictionary holding parameters from the Excel sheet
+    :rtype: dict
+    """
+    return eta2abc_batch([parameter])[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _sampling_keys(keys):
+    """Returns the keys of the sampling points and efficiencies of every conversion pathway
+
+    :param keys: keys of a parameter dict
+    :type keys: tuple
+    :return: keys of the sampling points and of the efficiencies per pathway name
+    :rtype: dict
+    """
+    return {name: ([key for key in keys if 'p_' + name + '_' in key], [key for key in keys if 'eta_' + name + '_' in key])
+            for name in ('PV2AC', 'PV2BAT', 'AC2BAT', 'BAT2AC', 'BAT2PV')}
+
+
+# Fitted loss functions by sampling points and power losses, see polyfit2
+_polyfit_cache = dict()
+
+
+def polyfit2(X, Y):
+    """Function for fitting quadratic polynomials to many sets of sampling points at once
+
+    All least squares problems are solved in one batched operation, sets with fewer sampling
+    points are padded with rows of zeros. The coefficients are memoized by the sampling points.
+
+    :param X: sampling points of every fit
+    :type X: list of numpy arrays
+    :param Y: values at the sampling points of every fit
+    :type Y: list of numpy arrays
+    :return: coefficients of every fit, highest power first like np.polyfit (fits x 3)
+    :rtype: numpy array
+    """
+    keys = [(x.tobytes(), y.tobytes()) for x, y in zip(X, Y)]
+    new = [i for i, key in enumerate(keys) if key not in _polyfit_cache]
+
+    if new:
+        n = max(X[i].size for i in new)
+        A = np.zeros((len(new), n, 3))
+        b = np.zeros((len(new), n, 1))
+        for j, i in enumerate(new):
+            m = X[i].size
+            A[j, :m, 0] = X[i] ** 2
+            A[j, :m, 1] = X[i]
+            A[j, :m, 2] = 1
+            b[j, :m, 0] = Y[i]
+
+        # Column scaling like np.polyfit, the pseudo-inverse solves all problems at once
+        scale = np.sqrt((A * A).sum(axis=1, keepdims=True))
+        scale[scale == 0] = 1
+        C = (np.linalg.pinv(A / scale) @ b)[:, :, 0] / scale[:, 0, :]
+
+        if len(_polyfit_cache) > 65536:
+            _polyfit_cache.clear()
+        for j, i in enumerate(new):
+            _polyfit_cache[keys[i]] = C[j]
+
+    return np.array([_polyfit_cache[key] for key in keys]).reshape(len(keys), 3)
+
+
+def eta2abc_batch(parameters):
+    """Function to calculate the parameters of the power loss functions of many systems at once
+
+    The quadratic power loss functions of all conversion pathways of all systems are fitted
+    with one call of :func:`polyfit2`. The dicts are updated in place like by :func:`eta2abc`.
+
+    :param parameters: list of dicts holding the parameters of the systems
+    :type parameters: list
+    :return: the updated dicts
+    :rtype: list
+    """
+    X = list()
+    Y = list()
+    targets = list()
+
+    def add(parameter, name, P_out, P_in, p, eta):
         # Absolute input and output power in W
-        p_bat2ac_out = parameter['P_BAT2AC_out'] * p_bat2ac * 1000
-        p_bat2ac_in = p_bat2ac_out / eta_bat2ac
+        p_out = P_out * p * 1000
+        p_in = p_out / eta
 
         # Absolute power loss in W
-        P_l_bat2ac_in = (1 - eta_bat2ac) * p_bat2ac_in
-        P_l_bat2ac_out = (1 / eta_bat2ac - 1) * p_bat2ac_out
+        P_l_in = (1 - eta) * p_in
+        P_l_out = (1 / eta - 1) * p_out
 
-        # Polynomial curve fitting parameters of the power loss functions in W
-        
         # Based on input power
-        p = np.polyfit(p_bat2ac_in / parameter['P_BAT2AC_in'] / 1000, P_l_bat2ac_in, 2)
-        parameter['BAT2AC_a_in'] = p[0]
-        parameter['BAT2AC_b_in'] = p[1]
-        parameter['BAT2AC_c_in'] = p[2]
+        X.append(p_in / P_in / 1000)
+        Y.append(P_l_in)
+        targets.append((parameter, name + '_%s_in'))
 
         # Based on output power
-        p = np.polyfit(p_bat2ac, P_l_bat2ac_out, 2)
-        parameter['BAT2AC_a_out'] = p[0]
-        parameter['BAT2AC_b_out'] = p[1]
-        parameter['BAT2AC_c_out'] = p[2]
-    
-    # BAT2PV conversion pathway
-    if parameter['Top'] =='PV':
+        X.append(p)
+        Y.append(P_l_out)
+        targets.append((parameter, name + '_%s_out'))
 
-        # Create variables for the sampling points and corresponding efficiencies TODO
-        p_bat2pv = np.fromiter((value for key, value in parameter.items() if 'p_BAT2PV_' in key), float)
-        eta_bat2pv = np.fromiter((value / 100 for key, value in parameter.items() if 'eta_BAT2PV_' in key), float)
+    for parameter in parameters:
+        keys = _sampling_keys(tuple(parameter))
 
-        # Absolute input and output power in W
-        p_bat2pv_out = parameter['P_BAT2PV_out'] * p_bat2pv * 1000
-        p_bat2pv_in = p_bat2pv_out / eta_bat2pv
+        def samples(name, skip_none=False):
+            p_keys, eta_keys = keys[name]
+            p = [parameter[key] for key in p_keys]
+            eta = [parameter[key] / 100 for key in eta_keys if not skip_none or parameter[key] is not None]
+            if skip_none:
+                p = [value for value in p if value is not None]
+            return np.array(p, dtype=float), np.array(eta, dtype=float)
 
-        # Absolute power loss in W
-        P_l_bat2pv_in = (1 - eta_bat2pv) * p_bat2pv_in
-        P_l_bat2pv_out = (1 / eta_bat2pv - 1) * p_bat2pv_out
+        # PV2AC conversion pathway TODO
+        if parameter['Top'] == 'DC' or parameter['Top'] == 'PVINV' or parameter['Top'] == 'PV' and parameter['P_PV2AC_out'] is not None or parameter['Top'] == 'AC' and parameter['P_PV2AC_out'] is not None:
+            add(parameter, 'PV2AC', parameter['P_PV2AC_out'], parameter['P_PV2AC_in'], *samples('PV2AC', skip_none=True))
 
-        # Polynomial curve fitting parameters of the power loss functions in W
-        
-        # Based on input power TODO
-        p = np.polyfit(p_bat2pv_in / parameter['P_BAT2AC_in'] / 1000, P_l_bat2pv_in, 2)
-        parameter['BAT2PV_a_in'] = p[0]
-        parameter['BAT2PV_b_in'] = p[1]
-        parameter['BAT2PV_c_in'] = p[2]
+        # PV2BAT conversion pathway
+        if parameter['Top'] == 'DC' or parameter['Top'] == 'PV':
 
-        # Based on output power
-        p = np.polyfit(p_bat2pv, P_l_bat2pv_out, 2)
-        parameter['BAT2PV_a_out'] = p[0]
-        parameter['BAT2PV_b_out'] = p[1]
-        parameter['BAT2PV_c_out'] = p[2]
-    
+            # Nominal input power of the PV2BAT conversion pathway of DC-coupled systems
+            if parameter['P_PV2BAT_in'] is None:
+                parameter['P_PV2BAT_in'] = parameter['P_PV2BAT_out'] / (parameter['eta_PV2BAT_100'] / 100)
+
+            add(parameter, 'PV2BAT', parameter['P_PV2BAT_out'], parameter['P_PV2BAT_in'], *samples('PV2BAT'))
+
+        # AC2BAT conversion pathway
+        if parameter['Top'] == 'AC' or parameter['Top'] == 'DC' and parameter['P_AC2BAT_in'] is not None:
+            add(parameter, 'AC2BAT', parameter['P_PV2BAT_out'], parameter['P_AC2BAT_in'], *samples('AC2BAT'))
+
+        # BAT2AC conversion pathway
+        if parameter['Top'] =='AC' or parameter['Top'] =='DC' or parameter['Top'] =='PV' and parameter['P_BAT2AC_out'] is not None:
+            add(parameter, 'BAT2AC', parameter['P_BAT2AC_out'], parameter['P_BAT2AC_in'], *samples('BAT2AC'))
+
+        # BAT2PV conversion pathway, based on input power TODO
+        if parameter['Top'] =='PV':
+            add(parameter, 'BAT2PV', parameter['P_BAT2PV_out'], parameter['P_BAT2AC_in'], *samples('BAT2PV'))
+
+    # Polynomial curve fitting parameters of the power loss functions in W
+    if X:
+        C = polyfit2(X, Y)
+        for (parameter, key), c in zip(targets, C):
+            parameter[key % 'a'] = c[0]
+            parameter[key % 'b'] = c[1]
+            parameter[key % 'c'] = c[2]
+
+    for parameter in parameters:
+        _additional_parameters(parameter)
+
+    return parameters
+
+
+def _additional_parameters(parameter):
+    """Function to calculate the derived parameters of a system
+
+    :param parameter: Holds parameters of the system
+    :type parameter: dict
+    """
     # Additional parameters
 
     # Mean battery capacity in kWh
@@ -2099,30 +3544,839 @@ def eta2abc(parameter):
     # Feed-in power limit in kW/kWp
     parameter['p_ac2g_max'] = 0.7
 
-    return parameter
 
+def _npy_header(f):
+    """Reads the header of a .npy file
+
+    :param f: file positioned at the start of the .npy file
+    :type f: file object
+    :return: shape, data type and position of the data in the file
+    :rtype: tuple
+    """
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+    return shape, dtype, f.tell()
 
-def load_ref_case(fname, name):
+
+def load_ref_case(fname, name, window=None):
     """Loads PV power or Load from the reference cases
 
+    fname may also be a store of uncompressed series created by :func:`convert_ref_case`. A store
+    next to the npz file (same path without extension) is used instead of the npz file as long
+    as it is not older. The series of a store are memory-mapped copy-on-write: loading them is
+    free, all processes share the same physical pages and the file is never written.
+
     :param fname: Path to mat file 
     :type fname: string
 
     :param name: Identifier for PV Power or Load
     :type name: string
 
+    :param window: First and last (excluded) time step of the loaded part of the series, None
+        loads the whole series. Only this part is read from a store or from an uncompressed
+        npz file. A compressed npz member is decompressed from its start up to the end of the
+        window, convert the file with :func:`convert_ref_case` to avoid that.
+    :type window: tuple
+
     :return: Returns PV power or load from the reference case
     :rtype: numpy array
     """
-    with open(fname, 'rb') as f:
+    store = fname if os.path.isdir(fname) else os.path.splitext(fname)[0]
+    path = os.path.join(store, name + '.npy')
 
-        a = np.load(f)
+    if os.path.isdir(fname) or os.path.isfile(path) and os.path.getmtime(path) >= os.path.getmtime(fname):
+        if window is None:
+            return np.load(path, mmap_mode='c')
+
+        with open(path, 'rb') as f:
+            shape, dtype, offset = _npy_header(f)
+
+        start, stop, _ = slice(*window).indices(shape[0])
+        if stop <= start:
+            return np.zeros(0, dtype)
+
+        return np.memmap(path, dtype=dtype, mode='c', offset=offset + start * dtype.itemsize, shape=(stop - start,))
+
+    if window is None:
+        with open(fname, 'rb') as f:
+
+            a = np.load(f)
+
+            data = a[name]
+
+        return data
+
+    with zipfile.ZipFile(fname) as z, z.open(name + '.npy') as f:
+        if z.getinfo(name + '.npy').compress_type != zipfile.ZIP_STORED:
+            warnings.warn('%s is compressed, the series is decompressed up to the window. Convert it with '
+                          'convert_ref_case to read only the window.' % fname, stacklevel=2)
+
+        shape, dtype, offset = _npy_header(f)
+        start, stop, _ = slice(*window).indices(shape[0])
+
+        data = np.zeros(max(stop - start, 0), dtype)
+        f.seek(offset + start * dtype.itemsize)
+        f.readinto(data)
 
-        data = a[name]
-    
     return data
 
 
+def convert_ref_case(fname, dirname=None):
+    """Converts the reference cases to a store of uncompressed series for :func:`load_ref_case`
+
+    Every member of the npz file is written to its own .npy file.
+
+    :param fname: Path to the npz file
+    :type fname: string
+    :param dirname: Directory of the store, by default the path of the npz file without extension
+    :type dirname: string
+    :return: Directory of the store
+    :rtype: string
+    """
+    if dirname is None:
+        dirname = os.path.splitext(fname)[0]
+
+    os.makedirs(dirname, exist_ok=True)
+
+    with np.load(fname) as a:
+        for name in a.files:
+            path = os.path.join(dirname, name + '.npy')
+            tmp = '%s.%d.tmp' % (path, os.getpid())
+            with open(tmp, 'wb') as f:
+                np.save(f, a[name])
+            os.replace(tmp, path)
+
+    return dirname
+
+
+@nb.jit(nopython=True, cache=True)
+def _strip_field(buf, i, j):
+    # Bounds of a CSV field without blanks, quotes and carriage return
+    while i < j and (buf[i] == 32 or buf[i] == 34 or buf[i] == 9):
+        i += 1
+    while j > i and (buf[j - 1] == 32 or buf[j - 1] == 34 or buf[j - 1] == 13 or buf[j - 1] == 9):
+        j -= 1
+    return i, j
+
+
+@nb.jit(nopython=True, cache=True)
+def _parse_int(buf, i, n):
+    # Unsigned integer of n digits, -1 if a character is not a digit
+    x = 0
+    for k in range(i, i + n):
+        if buf[k] < 48 or buf[k] > 57:
+            return -1
+        x = x * 10 + (buf[k] - 48)
+    return x
+
+
+@nb.jit(nopython=True, cache=True)
+def _parse_number(buf, i, j, dec):
+    """Parses a decimal number, NaN if the field is empty or not a number
+
+    The digits are summed up exactly up to 2**53, so the result is correctly rounded
+    for the usual measurement values.
+    """
+    i, j = _strip_field(buf, i, j)
+
+    neg = False
+    if i < j and buf[i] == 45:
+        neg = True
+        i += 1
+    elif i < j and buf[i] == 43:
+        i += 1
+
+    m = 0.0
+    e = 0
+    digits = False
+    while i < j and 48 <= buf[i] <= 57:
+        m = m * 10 + (buf[i] - 48)
+        digits = True
+        i += 1
+
+    if i < j and buf[i] == dec:
+        i += 1
+        while i < j and 48 <= buf[i] <= 57:
+            m = m * 10 + (buf[i] - 48)
+            e -= 1
+            digits = True
+            i += 1
+
+    if digits and i < j and (buf[i] == 101 or buf[i] == 69):
+        i += 1
+        eneg = False
+        if i < j and buf[i] == 45:
+            eneg = True
+            i += 1
+        elif i < j and buf[i] == 43:
+            i += 1
+        x = 0
+        while i < j and 48 <= buf[i] <= 57:
+            x = x * 10 + (buf[i] - 48)
+            i += 1
+        e += -x if eneg else x
+
+    if not digits or i != j:
+        return np.nan
+
+    v = m * 10.0 ** e if e >= 0 else m / 10.0 ** -e
+
+    return -v if neg else v
+
+
+@nb.jit(nopython=True, cache=True)
+def _parse_time(buf, i, j, dec):
+    """Parses a timestamp to seconds since 1970-01-01 00:00 UTC
+
+    Dates are YYYY-MM-DD or DD.MM.YYYY, optionally followed by hh:mm[:ss[.fff]] and a UTC
+    offset (Z or +hh:mm). Other fields are parsed as number of seconds.
+    """
+    i, j = _strip_field(buf, i, j)
+
+    if j - i >= 10 and buf[i + 4] == 45 and buf[i + 7] == 45:
+        y, mo, d = _parse_int(buf, i, 4), _parse_int(buf, i + 5, 2), _parse_int(buf, i + 8, 2)
+    elif j - i >= 10 and buf[i + 2] == 46 and buf[i + 5] == 46:
+        d, mo, y = _parse_int(buf, i, 2), _parse_int(buf, i + 3, 2), _parse_int(buf, i + 6, 4)
+    else:
+        return _parse_number(buf, i, j, dec)
+
+    if y < 0 or mo < 1 or mo > 12 or d < 1 or d > 31:
+        return np.nan
+
+    # Days since 1970-01-01 of the proleptic Gregorian calendar
+    if mo <= 2:
+        y -= 1
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (mo + (-3 if mo > 2 else 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    s = float(era * 146097 + doe - 719468) * 86400
+
+    k = i + 10
+    if k < j and (buf[k] == 84 or buf[k] == 32):
+        k += 1
+    if k + 5 <= j and buf[k + 2] == 58:
+        s += _parse_int(buf, k, 2) * 3600 + _parse_int(buf, k + 3, 2) * 60
+        k += 5
+        if k + 3 <= j and buf[k] == 58:
+            s += _parse_int(buf, k + 1, 2)
+            k += 3
+            if k < j and (buf[k] == 46 or buf[k] == 44):
+                k += 1
+                f = 0.1
+                while k < j and 48 <= buf[k] <= 57:
+                    s += (buf[k] - 48) * f
+                    f /= 10
+                    k += 1
+
+    # UTC offset
+    if k + 3 <= j and (buf[k] == 43 or buf[k] == 45):
+        sign = 1 if buf[k] == 43 else -1
+        off = _parse_int(buf, k + 1, 2) * 3600
+        k += 3
+        if k < j and buf[k] == 58:
+            k += 1
+        if k + 2 <= j:
+            off += _parse_int(buf, k, 2) * 60
+        s -= sign * off
+
+    return s
+
+
+@nb.jit(SIGNATURES['parse_csv'], nopython=True, nogil=True, cache=True)
+def parse_csv(buf, sep, dec, colmap, timecol):
+    """Parses the selected columns of a block of lines of a CSV file
+
+    Runs without the GIL, so several blocks can be parsed in threads at the same time.
+    Fields must not contain the separator, empty lines are skipped.
+
+    :param buf: Bytes of complete lines
+    :type buf: numpy array
+    :param sep: Character code of the field separator
+    :type sep: integer
+    :param dec: Character code of the decimal separator
+    :type dec: integer
+    :param colmap: Output column of each field of a line, -1 for unused fields
+    :type colmap: numpy array
+    :param timecol: Output column that holds timestamps, -1 for none
+    :type timecol: integer
+    :return: Values of the selected columns, NaN for empty fields
+    :rtype: numpy array
+    """
+    n = buf.size
+
+    rows = 0
+    for k in range(n):
+        if buf[k] == 10:
+            rows += 1
+    if n > 0 and buf[n - 1] != 10:
+        rows += 1
+
+    ncol = 0
+    for c in colmap:
+        ncol = max(ncol, c + 1)
+
+    out = np.full((rows, ncol), np.nan)
+
+    row = 0
+    i = 0
+    while i < n:
+        # Skip empty lines
+        k = i
+        while k < n and (buf[k] == 13 or buf[k] == 32 or buf[k] == 9):
+            k += 1
+        if k == n or buf[k] == 10:
+            i = k + 1
+            continue
+
+        field = 0
+        while True:
+            j = i
+            while j < n and buf[j] != sep and buf[j] != 10:
+                j += 1
+
+            if field < colmap.size and colmap[field] >= 0:
+                c = colmap[field]
+                if c == timecol:
+                    out[row, c] = _parse_time(buf, i, j, dec)
+                else:
+                    out[row, c] = _parse_number(buf, i, j, dec)
+
+            field += 1
+            i = j + 1
+            if j >= n or buf[j] == 10:
+                break
+
+        row += 1
+
+    return out[:row]
+
+
+def _csv_blocks(fname, columns, time=None, sep=',', decimal='.', header=True, block_size=1 << 24, workers=None):
+    """Generator reading columns of a CSV file in blocks
+
+    The file is read in blocks of complete lines, which are parsed by :func:`parse_csv`
+    in a pool of threads while the next blocks are read.
+
+    :param fname: Path to the CSV file
+    :type fname: string
+    :param columns: Names of the columns, or their positions if the file has no header
+    :type columns: list
+    :param time: Name or position of the timestamp column, None if the file has none
+    :type time: string
+    :param block_size: Size of the blocks in bytes
+    :type block_size: integer
+    :param workers: Number of parsing threads, None uses all cores
+    :type workers: integer
+    :return: Values of the timestamp column (if any) and of the columns of each block
+    :rtype: generator
+    """
+    names = ([time] if time is not None else []) + list(columns)
+
+    with open(fname, 'rb') as f:
+        fields = [x.strip().strip('"') for x in f.readline().decode('utf-8-sig').split(sep)] if header else []
+        if not header:
+            f.seek(0)
+
+        colmap = np.full(max(len(fields), max([x + 1 for x in names if isinstance(x, int)], default=0)), -1, np.int64)
+        for c, name in enumerate(names):
+            if isinstance(name, int):
+                colmap[name] = c
+            elif name in fields:
+                colmap[fields.index(name)] = c
+            else:
+                raise ValueError('Column %s not found in %s!' % (name, fname))
+
+        timecol = 0 if time is not None else -1
+
+        workers = workers or os.cpu_count() or 1
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            carry = b''
+
+            while True:
+                buf = bytearray(len(carry) + block_size)
+                buf[:len(carry)] = carry
+                n = len(carry) + f.readinto(memoryview(buf)[len(carry):])
+
+                # Cut the block after its last complete line
+                cut = buf.rfind(b'\n', 0, n) + 1 if n > len(carry) else n
+                carry = bytes(buf[cut:n])
+
+                if cut > 0:
+                    pending.append(executor.submit(parse_csv, np.frombuffer(buf, np.uint8, cut),
+                                                   ord(sep), ord(decimal), colmap, timecol))
+
+                while pending and (len(pending) > 2 * workers or n == 0 or pending[0].done()):
+                    yield pending.popleft().result()
+
+                if n == 0:
+                    break
+
+
+def _store_blocks(dirname, columns, time=None, block_size=1 << 20):
+    """Generator reading columns of a store of .npy files (see :func:`convert_ref_case`) in blocks
+
+    :param dirname: Directory of the store
+    :type dirname: string
+    :param columns: Names of the series
+    :type columns: list
+    :param time: Name of the series of timestamps, None if there is none
+    :type time: string
+    :param block_size: Number of rows of the blocks
+    :type block_size: integer
+    :return: Values of the timestamps (if any) and of the series of each block
+    :rtype: generator
+    """
+    names = ([time] if time is not None else []) + list(columns)
+    series = [np.load(os.path.join(dirname, name + '.npy'), mmap_mode='r') for name in names]
+
+    for i in range(0, series[0].size, block_size):
+        yield np.column_stack([_seconds(x[i:i + block_size]) for x in series])
+
+
+def _parquet_blocks(fname, columns, time=None, block_size=1 << 20):
+    """Generator reading columns of a parquet file in blocks, requires pyarrow
+
+    The column chunks are decompressed and decoded by the threads of pyarrow.
+
+    :param fname: Path to the parquet file
+    :type fname: string
+    :param columns: Names of the columns
+    :type columns: list
+    :param time: Name of the timestamp column, None if the file has none
+    :type time: string
+    :param block_size: Number of rows of the blocks
+    :type block_size: integer
+    :return: Values of the timestamp column (if any) and of the columns of each block
+    :rtype: generator
+    """
+    import pyarrow.parquet as pq
+
+    names = ([time] if time is not None else []) + list(columns)
+
+    for batch in pq.ParquetFile(fname).iter_batches(batch_size=block_size, columns=names):
+        yield np.column_stack([_seconds(batch.column(name).to_numpy(zero_copy_only=False)) for name in names])
+
+
+def _seconds(x):
+    # Timestamps as seconds since 1970-01-01 00:00 UTC, other series as float
+    if x.dtype.kind == 'M':
+        return x.astype('datetime64[ns]').astype(np.int64) / 1e9
+    return np.asarray(x, dtype=np.float64)
+
+
+def read_measured_chunks(fname, ppv, pl, time=None, dt=None, chunksize=86400, ppv_unit=1.0, pl_unit=1.0, P_PV=None,
+                         **kwargs):
+    """Generator reading measured PV and load series of any length in chunks for :func:`simulation_stream`
+
+    Reads CSV files, parquet files (.parquet, requires pyarrow) and stores of .npy files
+    (directories, see :func:`convert_ref_case`) block by block, without loading the whole
+    file. With a timestamp column, the values are placed on a regular time grid of width
+    dt starting at the first timestamp. Repeated time steps are dropped, missing time steps
+    and empty values hold the previous value.
+
+    Example::
+
+        chunks = read_measured_chunks('household.csv', 'P_PV', 'P_Load', time='Time', ppv_unit=1000, P_PV=5)
+        for r in simulation_stream(parameter, chunks, dt=1):
+            ...
+
+    :param fname: Path to the file
+    :type fname: string
+    :param ppv: Name of the PV power column
+    :type ppv: string
+    :param pl: Name of the load power column
+    :type pl: string
+    :param time: Name of the timestamp column, None if the rows are consecutive time steps
+    :type time: string
+    :param dt: Time step width in seconds, by default the median step of the first block
+    :type dt: float
+    :param chunksize: Number of time steps of the chunks, the last chunk holds up to twice as
+        many, so every chunk is longer than the dead time of the system
+    :type chunksize: integer
+    :param ppv_unit: Factor that converts the PV power column to W, e.g. 1000 for kW
+    :type ppv_unit: float
+    :param pl_unit: Factor that converts the load power column to W
+    :type pl_unit: float
+    :param P_PV: Nominal power of the PV generator in kWp. The PV power is then normalized to
+        kW/kWp for pvmod=True, otherwise it is passed on in W.
+    :type P_PV: float
+    :param kwargs: sep, decimal, header, block_size and workers of CSV files
+    :type kwargs: dict
+    :return: pairs of the PV power and the AC load power
+    :rtype: generator
+    """
+    if os.path.isdir(fname):
+        blocks = _store_blocks(fname, (ppv, pl), time, **kwargs)
+    elif os.path.splitext(fname)[1].lower() in ('.parquet', '.pq'):
+        blocks = _parquet_blocks(fname, (ppv, pl), time, **kwargs)
+    else:
+        blocks = _csv_blocks(fname, (ppv, pl), time, **kwargs)
+
+    scale = np.array([ppv_unit / (P_PV * 1000) if P_PV is not None else ppv_unit, pl_unit])
+
+    last = np.zeros(2)  # Values of the previous time step
+    g0 = -1  # Index of the previous time step on the time grid
+    t0 = None
+    buffered = list()
+    size = 0
+
+    for X in blocks:
+        if time is not None:
+            X = X[~np.isnan(X[:, 0])]
+            if X.shape[0] == 0:
+                continue
+            if t0 is None:
+                t0 = X[0, 0]
+                if dt is None:
+                    dt = np.median(np.diff(X[:1000, 0])) if X.shape[0] > 1 else 1.0
+
+            # Place the rows on the time grid
+            g = np.rint((X[:, 0] - t0) / dt).astype(np.int64)
+            keep = g > np.maximum.accumulate(np.concatenate(([g0], g[:-1])))
+            g, X = g[keep], X[keep, 1:]
+            if g.size == 0:
+                continue
+
+            Y = np.full((g[-1] - g0, 2), np.nan)
+            Y[g - g0 - 1] = X
+            g0 = g[-1]
+        else:
+            Y = X
+
+        # Hold the previous value in missing time steps and empty values
+        for i in range(2):
+            valid = ~np.isnan(Y[:, i])
+            idx = np.maximum.accumulate(np.where(valid, np.arange(Y.shape[0]), -1))
+            Y[:, i] = np.where(idx >= 0, Y[np.maximum(idx, 0), i], last[i])
+        last = Y[-1].copy()
+
+        buffered.append(Y * scale)
+        size += Y.shape[0]
+
+        if size >= 2 * chunksize:
+            Y = np.concatenate(buffered)
+            while Y.shape[0] >= 2 * chunksize:
+                yield Y[:chunksize, 0].copy(), Y[:chunksize, 1].copy()
+                Y = Y[chunksize:]
+            buffered = [Y]
+            size = Y.shape[0]
+
+    if size > 0:
+        Y = np.concatenate(buffered)
+        yield Y[:, 0].copy(), Y[:, 1].copy()
+
+
+# Magic number of the result files and alignment of their columns in bytes
+RESULTS_MAGIC = b'OBLRES\x00\x01'
+RESULTS_ALIGN = 64
+
+
+def results_series(m):
+    """Collects all time series of a simulated model
+
+    :param m: simulated model
+    :type m: BatModAC, BatModDC or BatModPV
+    :return: time series by name, e.g. 'ppv', 'Real.soc' or 'Ideal.Pbat' (AC- and DC-coupled
+        systems) and 'soc' (PV-coupled systems)
+    :rtype: dict
+    """
+    n = np.size(m.ppv)
+    series = {'ppv': m.ppv, 'pl': m.pl}
+
+    if hasattr(m, 'Real'):
+        items = [('Real.' + key, x) for key, x in vars(m.Real).items()]
+        items += [('Ideal.' + key, x) for key, x in vars(m.Ideal).items()]
+    else:
+        items = vars(m).items()
+
+    for name, x in items:
+        if isinstance(x, np.ndarray) and x.ndim == 1 and x.size == n:
+            series[name] = x
+
+    return series
+
+
+def _json_default(x):
+    # Numpy scalars and arrays in the attributes of result files
+    if isinstance(x, np.generic):
+        return x.item()
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    return str(x)
+
+
+def write_results(fname, series, attrs=None):
+    """Writes time series and their attributes to one columnar result file
+
+    The file holds a JSON header with the attributes and the position of each column,
+    followed by the columns as raw arrays aligned to RESULTS_ALIGN bytes, so every column
+    can be mapped into memory without copying, see :func:`read_results`.
+
+    :param fname: Path to the result file
+    :type fname: string
+    :param series: time series by name
+    :type series: dict
+    :param attrs: attributes of the run, e.g. energy sums, SPI and parameters, must be
+        serializable to JSON (numpy values are converted)
+    :type attrs: dict
+    """
+    columns = dict()
+    arrays = list()
+    offset = 0
+    for name, x in series.items():
+        x = np.ascontiguousarray(x)
+        columns[name] = {'dtype': x.dtype.str, 'shape': list(x.shape), 'offset': offset}
+        arrays.append(x)
+        offset += -(-x.nbytes // RESULTS_ALIGN) * RESULTS_ALIGN
+
+    header = json.dumps({'columns': columns, 'attrs': attrs or dict()}, default=_json_default).encode()
+    start = -(-(len(RESULTS_MAGIC) + 8 + len(header)) // RESULTS_ALIGN) * RESULTS_ALIGN
+
+    tmp = '%s.%d.tmp' % (fname, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(RESULTS_MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for name, x in zip(columns, arrays):
+            f.seek(start + columns[name]['offset'])
+            f.write(x.data)
+        f.truncate(start + offset)
+    os.replace(tmp, fname)
+
+
+def read_results(fname):
+    """Reads a result file written by :func:`write_results`
+
+    The file is mapped into memory copy-on-write once and the columns are views of it,
+    so reading is independent of the size of the file and a column is only loaded from
+    disk when it is accessed.
+
+    :param fname: Path to the result file
+    :type fname: string
+    :return: time series by name and the attributes of the run
+    :rtype: tuple
+    """
+    with open(fname, 'rb') as f:
+        if f.read(len(RESULTS_MAGIC)) != RESULTS_MAGIC:
+            raise ValueError('%s is not a result file!' % fname)
+        size = int(np.frombuffer(f.read(8), np.uint64)[0])
+        header = json.loads(f.read(size))
+
+    start = -(-(len(RESULTS_MAGIC) + 8 + size) // RESULTS_ALIGN) * RESULTS_ALIGN
+    mm = np.memmap(fname, np.uint8, mode='c')
+
+    series = dict()
+    for name, c in header['columns'].items():
+        dtype = np.dtype(c['dtype'])
+        nbytes = int(np.prod(c['shape'])) * dtype.itemsize
+        offset = start + c['offset']
+        series[name] = mm[offset:offset + nbytes].view(dtype).reshape(c['shape'])
+
+    return series, header['attrs']
+
+
+@nb.jit(nopython=True, cache=True)
+def _write_uint(out, n, v, width):
+    # Writes the decimal digits of v, padded with zeros to width digits
+    digits = 1
+    x = v
+    while x >= 10:
+        x //= 10
+        digits += 1
+    digits = max(digits, width)
+    for k in range(n + digits - 1, n - 1, -1):
+        out[k] = 48 + v % 10
+        v //= 10
+    return n + digits
+
+
+@nb.jit(nopython=True, cache=True)
+def _write_fixed(out, n, v, decimals):
+    # Writes v / 10**decimals for an integer v >= 0 without trailing zeros
+    p = 10 ** decimals
+    n = _write_uint(out, n, v // p, 1)
+    f = v % p
+    if f > 0:
+        width = decimals
+        while f % 10 == 0:
+            f //= 10
+            width -= 1
+        out[n] = 46
+        n = _write_uint(out, n + 1, f, width)
+    return n
+
+
+@nb.jit(nopython=True, cache=True)
+def _write_float(out, n, x, decimals):
+    # Writes x rounded to the given number of decimal places, in scientific notation
+    # if it does not fit into 64 bit integers
+    if x != x:
+        out[n] = 110
+        out[n + 1] = 97
+        out[n + 2] = 110
+        return n + 3
+
+    p = 10 ** decimals
+    v = np.rint(abs(x) * p)
+    if x < 0 and v > 0:
+        out[n] = 45
+        n += 1
+    x = abs(x)
+
+    if v < 9e18:
+        return _write_fixed(out, n, np.int64(v), decimals)
+
+    if x == np.inf:
+        out[n] = 105
+        out[n + 1] = 110
+        out[n + 2] = 102
+        return n + 3
+
+    e = int(np.floor(np.log10(x)))
+    v = np.rint(x / 10.0 ** e * p)
+    if v >= 10 * p:
+        e += 1
+        v = np.rint(x / 10.0 ** e * p)
+    n = _write_fixed(out, n, np.int64(v), decimals)
+    out[n] = 101
+    return _write_uint(out, n + 1, e, 1)
+
+
+@nb.jit(SIGNATURES['format_csv'], nopython=True, nogil=True, cache=True)
+def format_csv(X, t0, dt, decimals, sep):
+    """Formats a block of aligned time series as lines of a CSV file
+
+    Runs without the GIL, so several blocks can be formatted in threads at the same time.
+
+    :param X: time series (series x time steps)
+    :type X: numpy array
+    :param t0: Time of the first time step in seconds since 1970-01-01 00:00, NaN writes
+        no timestamp column
+    :type t0: float
+    :param dt: time step width in seconds
+    :type dt: float
+    :param decimals: Number of decimal places
+    :type decimals: integer
+    :param sep: Character code of the field separator
+    :type sep: integer
+    :return: Bytes of the lines
+    :rtype: numpy array
+    """
+    cols, rows = X.shape
+    out = np.empty(rows * (20 + cols * (decimals + 27)), np.uint8)
+
+    n = 0
+    for r in range(rows):
+        if t0 == t0:
+            # Timestamp YYYY-MM-DD hh:mm:ss of the proleptic Gregorian calendar
+            s = np.int64(np.floor(t0 + r * dt))
+            z = s // 86400 + 719468
+            sec = s % 86400
+            era = z // 146097
+            doe = z - era * 146097
+            yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+            doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+            mp = (5 * doy + 2) // 153
+            d = doy - (153 * mp + 2) // 5 + 1
+            mo = mp + 3 if mp < 10 else mp - 9
+            y = yoe + era * 400
+            if mo <= 2:
+                y += 1
+
+            n = _write_uint(out, n, y, 4)
+            out[n] = 45
+            n = _write_uint(out, n + 1, mo, 2)
+            out[n] = 45
+            n = _write_uint(out, n + 1, d, 2)
+            out[n] = 32
+            n = _write_uint(out, n + 1, sec // 3600, 2)
+            out[n] = 58
+            n = _write_uint(out, n + 1, sec % 3600 // 60, 2)
+            out[n] = 58
+            n = _write_uint(out, n + 1, sec % 60, 2)
+            out[n] = sep
+            n += 1
+
+        for c in range(cols):
+            n = _write_float(out, n, X[c, r], decimals)
+            out[n] = sep
+            n += 1
+
+        out[n - 1] = 10
+
+    return out[:n]
+
+
+def write_csv(fname, series, dt=1, start=None, decimals=6, sep=',', compression='infer', rows=1 << 16, workers=None):
+    """Writes aligned time series to a CSV file in bulk
+
+    The lines are formatted block by block by :func:`format_csv` in a pool of threads. Compressed
+    files consist of one compressed stream per block, which are compressed in parallel as well and
+    are read like a single stream by gzip, bz2, lzma and pandas.
+
+    :param fname: Path to the CSV file
+    :type fname: string
+    :param series: time series of the same length by column name
+    :type series: dict
+    :param dt: time step width in seconds
+    :type dt: float
+    :param start: Time of the first time step (string or datetime), None writes no timestamp column
+    :type start: string
+    :param decimals: Number of decimal places (at most 15), values are rounded and trailing
+        zeros dropped
+    :type decimals: integer
+    :param sep: Field separator
+    :type sep: string
+    :param compression: 'gzip', 'bz2', 'xz' or None, 'infer' selects it from the file extension
+    :type compression: string
+    :param rows: Number of lines of the blocks
+    :type rows: integer
+    :param workers: Number of threads, None uses all cores
+    :type workers: integer
+    """
+    if compression == 'infer':
+        compression = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}.get(os.path.splitext(fname)[1].lower())
+
+    compress = {None: None, 'gzip': functools.partial(gzip.compress, compresslevel=1),
+                'bz2': bz2.compress, 'xz': lzma.compress}[compression]
+
+    names = list(series)
+    arrays = [np.asarray(series[name]) for name in names]
+    n = arrays[0].size if arrays else 0
+    if any(x.size != n for x in arrays):
+        raise ValueError('The time series differ in length!')
+
+    t0 = (pd.Timestamp(start) - pd.Timestamp(0)).total_seconds() if start is not None else np.nan
+    header = sep.join((['time'] if start is not None else []) + names) + '\n'
+
+    def block(a):
+        X = np.stack([x[a:a + rows] for x in arrays]).astype(np.float64, copy=False)
+        data = format_csv(X, t0 + a * dt, float(dt), decimals, ord(sep)).tobytes()
+        return compress(data) if compress else data
+
+    workers = workers or os.cpu_count() or 1
+
+    tmp = '%s.%d.tmp' % (fname, os.getpid())
+    with open(tmp, 'wb') as f, ThreadPoolExecutor(max_workers=workers) as executor:
+        f.write(compress(header.encode()) if compress else header.encode())
+
+        pending = collections.deque()
+        for a in range(0, n, rows):
+            pending.append(executor.submit(block, a))
+            while len(pending) > 2 * workers:
+                f.write(pending.popleft().result())
+        while pending:
+            f.write(pending.popleft().result())
+    os.replace(tmp, fname)
+
+
 def resample_data_frame(df):
     """Function for resampling data frames
 
@@ -2136,88 +4390,348 @@ def resample_data_frame(df):
     return df_rs
 
 
+@nb.jit([SIGNATURES['resample_steps'], SIGNATURES_SINGLE['resample_steps']], nopython=True, cache=True)
+def resample_steps(x, dt, dt_new, linear, out):
+    """Resamples a time series of mean values to another time step width
+
+    Every new time step is the mean of the overlapping time steps of the series weighted by
+    their overlap, so the energy of the series is conserved and a shorter last time step is
+    averaged over its own length. If the new time steps are shorter, they either hold the value
+    of the time step they lie in (equal to the mean) or, with linear, are interpolated linearly
+    between the centers of the time steps, which does not conserve the energy exactly.
+
+    :param x: time series
+    :type x: numpy array
+    :param dt: time step width of the series
+    :type dt: float
+    :param dt_new: new time step width
+    :type dt_new: float
+    :param linear: interpolate linearly if dt_new < dt
+    :type linear: bool
+    :param out: resampled time series of ceil(x.size * dt / dt_new) time steps
+    :type out: numpy array
+    """
+    n = x.size
+    T = n * dt
+
+    if linear and dt_new < dt:
+        for j in range(out.size):
+            # Position of the center of the new time step between the centers of the time steps
+            c = (j + 0.5) * dt_new / dt - 0.5
+            if c <= 0:
+                out[j] = x[0]
+            elif c >= n - 1:
+                out[j] = x[n - 1]
+            else:
+                i = int(c)
+                w = c - i
+                out[j] = x[i] * (1 - w) + x[i + 1] * w
+        return
+
+    i = 0
+    for j in range(out.size):
+        a = j * dt_new
+        b = min(a + dt_new, T)
+
+        # First time step that overlaps the new time step
+        while i < n - 1 and (i + 1) * dt <= a:
+            i += 1
+
+        if (i + 1) * dt >= b:
+            out[j] = x[i]
+            continue
+
+        s = 0.0
+        k = i
+        while k < n and k * dt < b:
+            s += x[k] * (min(b, (k + 1) * dt) - max(a, k * dt))
+            k += 1
+
+        out[j] = s / (b - a)
+
+
+@nb.jit([SIGNATURES['resample_steps_batch'], SIGNATURES_SINGLE['resample_steps_batch']], nopython=True, parallel=True, cache=True)
+def resample_steps_batch(X, dt, dt_new, linear, out):
+    """Resamples many time series of the same length at once, see :func:`resample_steps`
+
+    :param X: time series (series x time steps)
+    :type X: numpy array
+    :param dt: time step width of the series
+    :type dt: float
+    :param dt_new: new time step width
+    :type dt_new: float
+    :param linear: interpolate linearly if dt_new < dt
+    :type linear: bool
+    :param out: resampled time series (series x new time steps)
+    :type out: numpy array
+    """
+    for r in nb.prange(X.shape[0]):
+        resample_steps(X[r], dt, dt_new, linear, out[r])
+
+
+def resample(x, dt, dt_new, method='hold'):
+    """Function for resampling time series of mean values to any other time step width
+
+    Downsampling averages the overlapping time steps and conserves the energy, upsampling
+    holds the values ('hold', conserves the energy as well) or interpolates them linearly
+    ('linear'). Float32 series stay float32, the sums are computed in double precision.
+
+    :param x: time series, or many series of the same length in the rows of a 2-D array
+    :type x: numpy array
+    :param dt: time step width of the series in seconds
+    :type dt: float
+    :param dt_new: new time step width in seconds
+    :type dt_new: float
+    :param method: 'hold' or 'linear' for upsampling
+    :type method: string
+    :return: resampled time series
+    :rtype: numpy array
+    """
+    if method not in ('hold', 'linear'):
+        raise ValueError('Unknown resampling method %s!' % method)
+
+    x = np.asarray(x)
+    x = x.astype(np.float32 if x.dtype == np.float32 else np.float64, copy=False)
+
+    n = x.shape[-1]
+    m = int(np.ceil(round(n * dt / dt_new, 9)))
+    out = np.zeros(x.shape[:-1] + (m,), x.dtype)
+
+    if x.ndim == 1:
+        resample_steps(x, float(dt), float(dt_new), method == 'linear', out)
+    else:
+        resample_steps_batch(x, float(dt), float(dt_new), method == 'linear', out)
+
+    return out
+
+
+def resample_series(x, k):
+    """Function for resampling a time series to a k times larger time step width
+
+    Every k consecutive values are replaced by their mean, a shorter last block is
+    averaged over its own length. The mean is computed in double precision and
+    the data type of the series is kept.
+
+    :param x: time series
+    :type x: numpy array
+    :param k: number of time steps that are merged into one
+    :type k: integer
+    :return: resampled time series
+    :rtype: numpy array
+    """
+    x = np.asarray(x)
+    if k == 1:
+        return x
+
+    idx = np.arange(0, x.size, k)
+    n = np.diff(np.append(idx, x.size))
+
+    return (np.add.reduceat(x, idx, dtype=np.float64) / n).astype(x.dtype, copy=False)
+
+
+# Appliance groups of the synthetic household loads: power in W, mean duration of use in s,
+# uses per day and dependence on the activity of the residents (0 for cycling appliances)
+SYNTHETIC_APPLIANCES = np.array([
+    (100.0, 900.0, 32.0, 0.0),  # cooling
+    (150.0, 3600.0, 4.0, 1.0),  # lighting, entertainment
+    (2000.0, 180.0, 4.0, 1.0),  # kettle, microwave
+    (1500.0, 1800.0, 1.0, 1.0),  # cooking
+    (2000.0, 3600.0, 0.5, 1.0),  # washing machine, dishwasher
+])
+
+
+@nb.jit(SIGNATURES['synthetic_batch'], nopython=True, parallel=True, cache=True)
+def synthetic_batch(seeds, clear, activity, steps_day, dt, appliances, ppv, pl):
+    """Stochastic part of the synthetic PV and load profiles, see :func:`synthetic_profiles`
+
+    The random generator is seeded with the seed of each profile, so every profile is
+    reproducible regardless of the number of threads.
+
+    :param seeds: Seed of each profile
+    :type seeds: numpy array
+    :param clear: Normalized clear sky PV power in kW/kWp
+    :type clear: numpy array
+    :param activity: Activity of the residents, 1 on average
+    :type activity: numpy array
+    :param steps_day: Number of time steps per day
+    :type steps_day: integer
+    :param dt: time step width in seconds
+    :type dt: float
+    :param appliances: Appliance groups, see SYNTHETIC_APPLIANCES
+    :type appliances: numpy array
+    :param ppv: Normalized PV power of each profile in kW/kWp (profiles x time steps)
+    :type ppv: numpy array
+    :param pl: Load power of each profile in W (profiles x time steps)
+    :type pl: numpy array
+    """
+    n_app = appliances.shape[0]
+
+    # Mean duration of a cloud passage in seconds
+    tau_cloud = 900.0
+
+    for i in nb.prange(seeds.size):
+        np.random.seed(seeds[i])
+
+        # Clouds: two-state Markov chain with the cloud cover of the day as share of cloudy time
+        cloudy = False
+        k_cloud = 1.0
+        p_on = 0.0
+        p_off = 1 - np.exp(-dt / tau_cloud)
+
+        # Appliances: two-state Markov chains with the rate of uses following the activity
+        power = np.empty(n_app)
+        on = np.zeros(n_app, dtype=np.bool_)
+        for a in range(n_app):
+            power[a] = appliances[a, 0] * np.random.uniform(0.7, 1.3)
+        base = np.random.uniform(100.0, 300.0)
+
+        for t in range(clear.size):
+            if t % steps_day == 0:
+                c = np.random.beta(1.6, 0.9)
+                p_on = 1 - np.exp(-dt * c / (tau_cloud * max(1 - c, 1e-3)))
+
+            if cloudy:
+                if np.random.random() < p_off:
+                    cloudy = False
+            elif np.random.random() < p_on:
+                cloudy = True
+                k_cloud = np.random.uniform(0.1, 0.7)
+
+            ppv[i, t] = clear[t] * (k_cloud if cloudy else np.random.uniform(0.97, 1.03))
+
+            P = base
+            for a in range(n_app):
+                if on[a]:
+                    on[a] = np.random.random() >= 1 - np.exp(-dt / appliances[a, 1])
+                else:
+                    rate = appliances[a, 2] / 86400 * (1 - appliances[a, 3] + appliances[a, 3] * activity[t])
+                    on[a] = np.random.random() < 1 - np.exp(-dt * rate)
+                if on[a]:
+                    P += power[a]
+            pl[i, t] = P
+
+
+def synthetic_profiles(n, days=1, dt=60, start=0, seed=None, latitude=52.5, tilt=35.0, E_load=None, dtype=np.float64):
+    """Function for generating synthetic normalized PV profiles and household load profiles
+
+    The PV profiles are the clear sky power of a south facing PV generator, which is reduced
+    by passing clouds whose share of the time varies from day to day. The load profiles are
+    the sum of a base load and of appliance groups (SYNTHETIC_APPLIANCES) that are switched
+    on at random with a rate following the typical daily activity of the residents.
+
+    :param n: Number of profiles
+    :type n: integer
+    :param days: Length of the profiles in days
+    :type days: integer
+    :param dt: time step width in seconds, a divisor of one day
+    :type dt: integer
+    :param start: Day of the year of the first day, 0 for the 1st of January
+    :type start: integer
+    :param seed: Seed of the random generator, the same seed returns the same profiles
+    :type seed: integer
+    :param latitude: Latitude of the PV generator in degrees
+    :type latitude: float
+    :param tilt: Tilt angle of the PV generator in degrees
+    :type tilt: float
+    :param E_load: Annual load energy in kWh every load profile is scaled to, None keeps the
+        generated profiles (about 2000 to 3500 kWh per year)
+    :type E_load: float
+    :param dtype: Data type of the profiles
+    :type dtype: numpy dtype
+    :return: Normalized PV power in kW/kWp and load power in W (profiles x time steps)
+    :rtype: tuple
+    """
+    steps_day = 86400 // dt
+    t = (np.arange(days * steps_day) + 0.5) * dt
+
+    # Position of the sun in solar time
+    doy = start + t // 86400
+    hour = t % 86400 / 3600
+    decl = np.radians(23.45) * np.sin(2 * np.pi * (284 + doy + 1) / 365)
+    omega = np.radians(15 * (hour - 12))
+    phi = np.radians(latitude)
+    sin_h = np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(omega)
+    cos_theta = (np.sin(phi - np.radians(tilt)) * np.sin(decl)
+                 + np.cos(phi - np.radians(tilt)) * np.cos(decl) * np.cos(omega))
+
+    # Clear sky direct normal and diffuse irradiance in W/m2 and performance ratio of 0.85
+    am = 1 / np.maximum(sin_h, 0.01)
+    dni = np.where(sin_h > 0, 1353 * 0.7 ** (am ** 0.678), 0)
+    clear = 0.85 * (dni * np.maximum(cos_theta, 0) + 0.1 * dni) / 1000
+
+    # Daily activity of the residents with peaks in the morning, at noon and in the evening
+    activity = (0.2 + np.exp(-((hour - 7.5) / 1.2) ** 2) + 0.6 * np.exp(-((hour - 12.5) / 1.5) ** 2)
+                + 1.6 * np.exp(-((hour - 19.5) / 2.5) ** 2))
+    activity /= activity.mean()
+
+    seeds = np.random.default_rng(seed).integers(0, 2 ** 31 - 1, n)
+    ppv = np.zeros((n, t.size))
+    pl = np.zeros((n, t.size))
+
+    synthetic_batch(seeds, clear, activity, steps_day, float(dt), SYNTHETIC_APPLIANCES, ppv, pl)
+
+    if E_load is not None:
+        pl *= E_load * 1000 / (8760 * pl.mean(axis=1, keepdims=True))
+
+    return ppv.astype(dtype, copy=False), pl.astype(dtype, copy=False)
+
+
+def parameter_records(parameters, dtypes=PARAMETER_DTYPES):
+    """Function for building the parameter records of several systems with the same topology.
+
+    :param parameters: list of dicts of system parameters
+    :type parameters: list
+    :param dtypes: record layout of each topology, PARAMETER_DTYPES or PVINV_DTYPES
+    :type dtypes: dict
+    :return: structured array with one record per system, the parameters are accessed by name
+    :rtype: numpy array
+    """
+    tops = set(parameter['Top'] for parameter in parameters)
+    if len(tops) > 1:
+        raise ValueError('All systems of a batch must have the same topology!')
+
+    dtype = dtypes[tops.pop()]
+
+    return np.array([tuple(parameter[name] for name in dtype.names) for parameter in parameters], dtype=dtype)
+
+
 def transform_dict_to_array(parameter):
-    """Function for transforming a dict to an numpy array.
+    """Function for transforming a dict to the parameter array of the kernels.
+
+    The array is the float64 view of the record of the system, see PARAMETER_DTYPES.
+    The parameters are accessed by name with d.view(PARAMETER_DTYPES[parameter['Top']]).
 
     :param parameter: dict of system parameters
     :type parameter: dict
     :return: array of system parameters
     :rtype: numpy array
     """
-    if parameter['Top'] == 'AC':
-        d = np.array(parameter['E_BAT'])                # 0
-        d = np.append(d, parameter['eta_BAT'])          # 1
-        d = np.append(d, parameter['t_CONSTANT'])  # 2
-        d = np.append(d, parameter['P_SYS_SOC0_DC'])  # 3
-        d = np.append(d, parameter['P_SYS_SOC0_AC'])  # 4
-        d = np.append(d, parameter['P_SYS_SOC1_DC'])  # 5
-        d = np.append(d, parameter['P_SYS_SOC1_AC'])  # 6
-        d = np.append(d, parameter['AC2BAT_a_in'])  # 7
-        d = np.append(d, parameter['AC2BAT_b_in'])  # 8
-        d = np.append(d, parameter['AC2BAT_c_in'])  # 9
-        d = np.append(d, parameter['BAT2AC_a_out'])  # 10
-        d = np.append(d, parameter['BAT2AC_b_out'])  # 11
-        d = np.append(d, parameter['BAT2AC_c_out'])  # 12
-        d = np.append(d, parameter['P_AC2BAT_DEV'])  # 13
-        d = np.append(d, parameter['P_BAT2AC_DEV'])  # 14
-        d = np.append(d, parameter['P_BAT2AC_out'])  # 15
-        d = np.append(d, parameter['P_AC2BAT_in'])  # 16
-        d = np.append(d, parameter['t_DEAD'])  # 17
-        d = np.append(d, parameter['SOC_h'])  # 18
+    return parameter_records([parameter]).view(np.float64)
 
-    if parameter['Top'] == 'DC':
-        d = np.array(parameter['E_BAT'])  # 1
-        d = np.append(d, parameter['P_PV2AC_in'])  # 2
-        d = np.append(d, parameter['P_PV2AC_out'])  # 3
-        d = np.append(d, parameter['P_PV2BAT_in'])       # 4
-        d = np.append(d, parameter['P_BAT2AC_out'])       # 5
-        d = np.append(d, parameter['PV2AC_a_in'])          # 6
-        d = np.append(d, parameter['PV2AC_b_in'])           # 7
-        d = np.append(d, parameter['PV2AC_c_in'])            # 8
-        d = np.append(d, parameter['PV2BAT_a_in'])            # 9
-        d = np.append(d, parameter['PV2BAT_b_in'])  # 10
-        d = np.append(d, parameter['BAT2AC_a_out'])  # 11
-        d = np.append(d, parameter['BAT2AC_b_out'])  # 12
-        d = np.append(d, parameter['BAT2AC_c_out'])  # 13
-        d = np.append(d, parameter['eta_BAT'])  # 14
-        d = np.append(d, parameter['SOC_h'])  # 15
-        d = np.append(d, parameter['P_PV2BAT_DEV'])       # 16
-        d = np.append(d, parameter['P_BAT2AC_DEV'])  # 17
-        d = np.append(d, parameter['t_DEAD'])  # 18
-        d = np.append(d, parameter['t_CONSTANT'])          # 19
-        d = np.append(d, parameter['P_SYS_SOC1_DC'])  # 20
-        d = np.append(d, parameter['P_SYS_SOC0_AC'])  # 21
-        d = np.append(d, parameter['P_SYS_SOC0_DC'])  # 22
 
-    if parameter['Top'] == 'PV':
-        d = np.array(parameter['E_BAT'])
-        d = np.append(d, parameter['P_PV2AC_in'])
-        d = np.append(d, parameter['P_PV2AC_out'])
-        d = np.append(d, parameter['P_PV2BAT_in'])
-        d = np.append(d, parameter['P_BAT2PV_out'])
-        d = np.append(d, parameter['PV2AC_a_in'])
-        d = np.append(d, parameter['PV2AC_b_in'])
-        d = np.append(d, parameter['PV2AC_c_in'])
-        d = np.append(d, parameter['PV2BAT_a_in'])
-        d = np.append(d, parameter['PV2BAT_b_in'])
-        d = np.append(d, parameter['PV2BAT_c_in'])
-        d = np.append(d, parameter['PV2AC_a_out'])
-        d = np.append(d, parameter['PV2AC_b_out'])
-        d = np.append(d, parameter['PV2AC_c_out'])
-        d = np.append(d, parameter['BAT2PV_a_out'])
-        d = np.append(d, parameter['BAT2PV_b_out'])
-        d = np.append(d, parameter['BAT2PV_c_out'])
-        d = np.append(d, parameter['eta_BAT'])
-        d = np.append(d, parameter['SOC_h'])
-        d = np.append(d, parameter['P_PV2BAT_DEV'])
-        d = np.append(d, parameter['P_BAT2AC_DEV'])
-        d = np.append(d, parameter['P_SYS_SOC1_DC'])
-        d = np.append(d, parameter['P_SYS_SOC0_AC'])
-        d = np.append(d, parameter['P_SYS_SOC0_DC'])
-        d = np.append(d, parameter['t_DEAD'])
-        d = np.append(d, parameter['t_CONSTANT'])
-
-    return d
+def transform_dict_to_pvinv_array(parameter):
+    """Function for transforming the parameters of the PV inverter (PV2AC conversion pathway)
+    of AC- and DC-coupled systems to a numpy array for the fused kernels.
+
+    The array is the float64 view of the record of the PV inverter, see PVINV_DTYPES.
+
+    :param parameter: dict of system parameters
+    :type parameter: dict
+    :return: array of PV inverter parameters
+    :rtype: numpy array
+    """
+    return parameter_records([parameter], PVINV_DTYPES).view(np.float64)
+
+
+def transform_dicts_to_matrix(parameters):
+    """Function for stacking the parameter arrays of several systems into a matrix.
+
+    :param parameters: list of dicts of system parameters with the same topology
+    :type parameters: list
+    :return: matrix of system parameters (systems x parameters)
+    :rtype: numpy array
+    """
+    return parameter_records(parameters).view(np.float64).reshape(len(parameters), -1)
 
 
 def calculate_spi(_E_real, _E_ideal):
@@ -18,9 +18,69 @@ class View:
             print('{:<10} {:<10}'.format(name, round(value, 4)))
 
     @staticmethod
-    def plot(input):
-        
-        plt.plot(input)
+    def envelope(x, start, stop, bins):
+        """Min/max decimation of a part of a time series
+
+        The part is split into bins, each of which is represented by its minimum and its
+        maximum, so the plotted line covers the same range as the full series.
+
+        :param x: time series, e.g. memory-mapped, only the part is read
+        :type x: numpy array
+        :param start: first time step of the part
+        :type start: integer
+        :param stop: last time step of the part (excluded)
+        :type stop: integer
+        :param bins: number of bins, e.g. the width of the axes in pixels
+        :type bins: integer
+        :return: time steps and values of the decimated part
+        :rtype: tuple
+        """
+        if stop - start <= 2 * bins:
+            return np.arange(start, stop), np.asarray(x[start:stop])
+
+        edges = np.linspace(start, stop, bins + 1).astype(np.int64)[:-1]
+        part = x[start:stop]
+        idx = np.repeat(edges, 2)
+        idx[1::2] += np.diff(np.append(edges, stop)) // 2
+        y = np.empty(idx.size, part.dtype)
+        y[0::2] = np.minimum.reduceat(part, edges - start)
+        y[1::2] = np.maximum.reduceat(part, edges - start)
+
+        return idx, y
+
+    @staticmethod
+    def plot(input, dt=1, label=None):
+        """Plots a time series decimated to the resolution of the figure
+
+        Only the min/max envelope (see envelope) of the visible part is drawn, one bin per
+        pixel, and it is computed again whenever the visible part changes (zoom, pan), so
+        series of millions of time steps stay responsive.
+
+        :param input: time series, e.g. memory-mapped from a result file
+        :type input: numpy array
+        :param dt: time step width in seconds, the x-axis shows the time in seconds
+        :type dt: float
+        :param label: label of the series
+        :type label: string
+        """
+        fig, ax = plt.subplots()
+        line, = ax.plot([], [], label=label)
+        n = len(input)
+
+        def update(ax):
+            a, b = ax.get_xlim()
+            start = min(max(int(np.floor(a / dt)), 0), n)
+            stop = max(min(int(np.ceil(b / dt)) + 1, n), start)
+            idx, y = View.envelope(input, start, stop, max(int(ax.bbox.width), 1))
+            line.set_data(idx * dt, y)
+
+        ax.callbacks.connect('xlim_changed', update)
+        ax.set_xlim(0, max(n - 1, 1) * dt)
+        ax.relim()
+        ax.autoscale_view(scalex=False)
+
+        if label is not None:
+            ax.legend()
         plt.grid()
         plt.show()
 